@@ -6,15 +6,33 @@ Production-ready API с поддержкой различных типов ко
 
 from fastapi import FastAPI, HTTPException, BackgroundTasks, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any, Literal
+from typing import Optional, Dict, Any, List, Literal, Tuple
+import asyncio
+import json
 import logging
 import uuid
 from datetime import datetime
 import time
 
+from celery import group, states
+import redis
+
+from app.batches import read_batch, save_batch, summarize_batch
+from app.blob_store import blob_path, inline_report, iter_report
+from app.cancellation import request_cancel
+from app.heartbeat import read_heartbeats
 from app.config import settings
-from app.tasks import research_task, celery_app
+from app.progress import TERMINAL_STATES, event_from_meta, format_sse, progress_channel
+from app.redis_client import get_async_pubsub_redis, get_async_redis
+from app.crew_registry import get_crew_info, get_crew_spec, get_crew_types
+from app.coalescing import canonical_request_key, claim_inflight, release_inflight
+from app.result_store import get_fresh_result
+from app.sections import read_sections
+from app.task_index import ACTIVE_STATES, QUEUED_STATES, alive_workers, count_by_state, index_is_live, list_tasks
+from app.task_state import format_task_error, read_task_meta
+from app.tasks import PRIORITY_LEVELS, research_task, celery_app
 
 # Настройка логирования
 logging.basicConfig(level=getattr(logging, settings.log_level))
@@ -46,10 +64,10 @@ app.add_middleware(
 )
 
 # Модели данных
-class ResearchRequest(BaseModel):
-    """Модель запроса на исследование"""
+class ResearchSpec(BaseModel):
+    """Параметры исследования"""
     topic: str = Field(..., description="Тема для исследования", min_length=5, max_length=500)
-    crew_type: Literal["general", "business_analysis", "seo_content", "tech_research", "financial_analysis"] = Field(
+    crew_type: Literal[tuple(get_crew_types())] = Field(
         default="general", 
         description="Тип специализированной команды агентов"
     )
@@ -58,6 +76,27 @@ class ResearchRequest(BaseModel):
         default="standard", 
         description="Глубина анализа: basic (быстрый), standard (детальный), comprehensive (исчерпывающий)"
     )
+    force_refresh: bool = Field(default=False, description="Игнорировать сохраненный результат и запустить исследование заново")
+
+class ResearchRequest(ResearchSpec):
+    """Модель запроса на исследование"""
+    priority: Literal["low", "normal", "high"] = Field(default="normal", description="Приоритет задачи в очереди")
+
+class BatchResearchRequest(BaseModel):
+    """Модель запроса на пакет исследований"""
+    items: List[ResearchSpec] = Field(..., min_length=1, description="Исследования пакета")
+    priority: Literal["low", "normal", "high"] = Field(default="low", description="Приоритет задач пакета в очереди")
+
+class BatchResponse(BaseModel):
+    """Модель ответа при создании пакета исследований"""
+    batch_id: str = Field(..., description="Уникальный идентификатор пакета")
+    total: int = Field(..., description="Количество исследований в пакете")
+    enqueued: int = Field(..., description="Поставлено новых задач")
+    cached: int = Field(..., description="Отдано сохраненных результатов")
+    coalesced: int = Field(..., description="Присоединено к выполняющимся задачам")
+    duplicates: int = Field(..., description="Повторы внутри пакета")
+    created_at: datetime = Field(..., description="Время создания пакета")
+    items: List[Dict[str, Any]] = Field(..., description="Элементы пакета с task_id")
 
 class ResearchResponse(BaseModel):
     """Модель ответа при создании исследования"""
@@ -67,6 +106,9 @@ class ResearchResponse(BaseModel):
     estimated_time: str = Field(..., description="Примерное время выполнения")
     created_at: datetime = Field(..., description="Время создания задачи")
     crew_info: Dict[str, Any] = Field(..., description="Информация о команде агентов")
+    coalesced: bool = Field(default=False, description="Запрос присоединен к уже выполняющейся задаче")
+    cached: bool = Field(default=False, description="Возвращен сохраненный результат завершенного исследования")
+    result: Optional[Dict[str, Any]] = Field(default=None, description="Результат исследования (для cached)")
 
 class TaskResult(BaseModel):
     """Модель результата выполнения задачи"""
@@ -87,40 +129,189 @@ class SystemStatus(BaseModel):
     components: Dict[str, str]
     active_tasks: int
     completed_tasks: int
+    workers: Optional[List[Dict[str, Any]]] = None
 
-# Информация о типах команд
-CREW_TYPE_INFO = {
-    "general": {
-        "name": "Универсальная команда",
-        "description": "Команда из исследователя и технического писателя для общих задач",
-        "agents": ["Старший исследователь", "Технический писатель"],
-        "best_for": ["Общие исследования", "Обзорные анализы", "Простые темы"]
-    },
-    "business_analysis": {
-        "name": "Бизнес-аналитика",
-        "description": "Команда экспертов для глубокого анализа рынков и бизнеса",
-        "agents": ["Аналитик рынка", "Финансовый аналитик", "Стратегический консультант"],
-        "best_for": ["Анализ рынка", "Конкурентная разведка", "Бизнес-стратегии", "Инвестиционный анализ"]
-    },
-    "seo_content": {
-        "name": "SEO и контент-маркетинг",
-        "description": "Специалисты по поисковой оптимизации и контент-стратегиям",
-        "agents": ["SEO-эксперт", "Контент-стратег", "Digital-маркетолог"],
-        "best_for": ["SEO-аудит", "Контент-планы", "Digital-стратегии", "Продвижение сайтов"]
-    },
-    "tech_research": {
-        "name": "Технические исследования",
-        "description": "Команда для анализа технологий и архитектурных решений",
-        "agents": ["Технический исследователь", "Архитектор решений", "DevOps инженер"],
-        "best_for": ["Технологические тренды", "Архитектурные решения", "Техническая экспертиза"]
-    },
-    "financial_analysis": {
-        "name": "Финансовый анализ",
-        "description": "Эксперты по финансовому моделированию и инвестициям",
-        "agents": ["Финансовый аналитик", "Аналитик рисков", "Инвестиционный советник"],
-        "best_for": ["Финансовое моделирование", "Анализ рисков", "Инвестиционные решения"]
+# Информация о типах команд (стандартные команды из реестра)
+CREW_TYPE_INFO = get_crew_info("standard")
+
+def find_existing_submission(request_key: str, task_id: str,
+                             force_refresh: bool = False) -> Tuple[Dict[str, Any], Optional[str]]:
+    """
+    Ищет свежий сохраненный результат или выполняющуюся задачу для запроса
+
+    Если ни того ни другого нет, task_id регистрируется как выполняющий
+    запрос: вызывающий код должен поставить задачу в очередь или снять
+    регистрацию (release_inflight) при ошибке.
+
+    Returns:
+        (submission, inflight_key) - submission с ключами task_id, status,
+        coalesced, cached и result; inflight_key - ключ регистрации задачи
+    """
+    submission = {"task_id": task_id, "status": "PENDING", "coalesced": False, "cached": False, "result": None}
+
+    if settings.result_store_enabled and not force_refresh:
+        try:
+            record = get_fresh_result(request_key, max_age=settings.result_freshness_window)
+            if record:
+                logger.info(f"📦 Найден свежий результат задачи {record['task_id']}")
+                submission.update(
+                    task_id=record["task_id"],
+                    status="SUCCESS",
+                    cached=True,
+                    result=record["result"]
+                )
+                return submission, None
+
+        except redis.RedisError as e:
+            logger.warning(f"⚠️ Хранилище результатов недоступно: {e}")
+
+    inflight_key = None
+
+    if settings.request_coalescing_enabled:
+        inflight_key = request_key
+        inflight_ttl = settings.celery_task_timeout + 300
+
+        try:
+            existing_id = claim_inflight(request_key, task_id, ttl=inflight_ttl)
+
+            # Завершенная задача, не снявшая регистрацию (отмена, падение воркера)
+            if existing_id and celery_app.AsyncResult(existing_id).state in states.READY_STATES:
+                release_inflight(request_key, existing_id)
+                existing_id = claim_inflight(request_key, task_id, ttl=inflight_ttl)
+
+            if existing_id:
+                logger.info(f"🔗 Запрос присоединен к выполняющейся задаче {existing_id}")
+                submission.update(task_id=existing_id, coalesced=True)
+                return submission, None
+
+        except redis.RedisError as e:
+            logger.warning(f"⚠️ Реестр выполняемых задач недоступен: {e}")
+            inflight_key = None
+
+    return submission, inflight_key
+
+def research_kwargs(topic: str, crew_type: str, language: str, depth: str) -> Dict[str, str]:
+    """Аргументы research_task"""
+    return {
+        "topic": topic,
+        "crew_type": crew_type,
+        "language": language,
+        "depth": depth
     }
-}
+
+def submit_research(topic: str, crew_type: str, language: str, depth: str,
+                    force_refresh: bool = False, priority: str = "normal") -> Dict[str, Any]:
+    """
+    Ставит исследование в очередь, отдает свежий сохраненный результат
+    или присоединяет запрос к уже выполняющейся задаче
+
+    Очередь выбирает роутер app.tasks.route_task (по depth и crew_type),
+    priority задает порядок задач внутри очереди.
+
+    Returns:
+        dict с ключами task_id, status, coalesced, cached и result (для cached)
+    """
+    task_id = f"research_{uuid.uuid4().hex[:12]}"
+    request_key = canonical_request_key(topic, crew_type, language, depth)
+    submission, inflight_key = find_existing_submission(request_key, task_id, force_refresh)
+
+    if submission["cached"]:
+        # Хранилище результатов держит ссылку на вынесенный отчет
+        submission["result"] = inline_report(submission["result"])
+        return submission
+    if submission["coalesced"]:
+        return submission
+
+    try:
+        celery_task = research_task.apply_async(
+            kwargs=research_kwargs(topic, crew_type, language, depth),
+            task_id=task_id,
+            priority=PRIORITY_LEVELS[priority]
+        )
+    except Exception:
+        if inflight_key:
+            release_inflight(inflight_key, task_id)
+        raise
+
+    submission["task_id"] = celery_task.id
+    return submission
+
+def submit_batch(specs: List[ResearchSpec], priority: str = "low") -> Dict[str, Any]:
+    """
+    Ставит пакет исследований в очередь одной группой Celery
+
+    Одинаковые запросы внутри пакета выполняются одной задачей; свежие
+    сохраненные результаты и выполняющиеся задачи переиспользуются так же,
+    как в submit_research. Новые задачи отправляются одним group.apply_async,
+    каждая попадает в свою очередь через роутер app.tasks.route_task.
+
+    Returns:
+        dict с ключами batch_id, items (index, topic, crew_type, language,
+        depth, task_id, cached, coalesced, duplicate_of) и enqueued
+    """
+    batch_id = f"batch_{uuid.uuid4().hex[:12]}"
+    items = []
+    first_by_key: Dict[str, Dict[str, Any]] = {}
+    signatures = []
+    claimed = []
+
+    try:
+        for index, spec in enumerate(specs):
+            request_key = canonical_request_key(spec.topic, spec.crew_type, spec.language, spec.depth)
+            item = {
+                "index": index,
+                "topic": spec.topic,
+                "crew_type": spec.crew_type,
+                "language": spec.language,
+                "depth": spec.depth,
+                "duplicate_of": None
+            }
+
+            first = first_by_key.get(request_key)
+            if first:
+                item.update(
+                    task_id=first["task_id"],
+                    cached=first["cached"],
+                    coalesced=first["coalesced"],
+                    result=first["result"],
+                    duplicate_of=first["index"]
+                )
+                items.append(item)
+                continue
+
+            task_id = f"research_{uuid.uuid4().hex[:12]}"
+            submission, inflight_key = find_existing_submission(request_key, task_id, spec.force_refresh)
+            item.update(
+                task_id=submission["task_id"],
+                cached=submission["cached"],
+                coalesced=submission["coalesced"],
+                result=submission["result"]
+            )
+
+            if not (submission["cached"] or submission["coalesced"]):
+                signatures.append(research_task.signature(
+                    kwargs=research_kwargs(spec.topic, spec.crew_type, spec.language, spec.depth),
+                    task_id=task_id,
+                    priority=PRIORITY_LEVELS[priority]
+                ))
+                if inflight_key:
+                    claimed.append((inflight_key, task_id))
+
+            first_by_key[request_key] = item
+            items.append(item)
+
+        if signatures:
+            # task_id группы становится group_id каждой задачи пакета
+            group(signatures).apply_async(task_id=batch_id)
+
+    except Exception:
+        for inflight_key, task_id in claimed:
+            release_inflight(inflight_key, task_id)
+        raise
+
+    save_batch(batch_id, items, ttl=settings.batch_ttl)
+
+    return {"batch_id": batch_id, "items": items, "enqueued": len(signatures)}
 
 # Эндпоинты
 @app.get("/", summary="Статус системы")
@@ -134,17 +325,44 @@ async def root():
         "available_crews": list(CREW_TYPE_INFO.keys())
     }
 
-@app.get("/health", response_model=SystemStatus, summary="Детальный статус системы")
-async def health_check():
-    """Проверка здоровья всех компонентов системы"""
-    
-    # Проверка Celery
+def read_task_index() -> Optional[Dict[str, Any]]:
+    """
+    Воркеры и количество задач по состояниям из индекса событий Celery
+
+    Returns:
+        dict с ключами workers и counts или None, если потребитель
+        событий не запущен или Redis недоступен
+    """
+    if not settings.task_index_enabled:
+        return None
+
     try:
-        # Ping Celery workers
-        active_workers = celery_app.control.inspect().active() or {}
-        celery_status = "healthy" if active_workers else "no_workers"
-    except Exception:
-        celery_status = "unhealthy"
+        if not index_is_live():
+            return None
+        return {"workers": alive_workers(), "counts": count_by_state()}
+    except redis.RedisError as e:
+        logger.warning(f"⚠️ Индекс состояния задач недоступен: {e}")
+        return None
+
+def deep_health_check() -> SystemStatus:
+    """Полная проверка: индекс событий или inspect() и соединение с брокером"""
+    
+    # Воркеры и задачи из индекса событий; без него - один inspect()-запрос
+    task_index = read_task_index()
+    completed_tasks = 0
+    
+    if task_index is not None:
+        celery_status = "healthy" if task_index["workers"] else "no_workers"
+        active_tasks = task_index["counts"]["STARTED"]
+        completed_tasks = task_index["counts"]["SUCCESS"]
+    else:
+        try:
+            active_workers = celery_app.control.inspect().active() or {}
+            celery_status = "healthy" if active_workers else "no_workers"
+            active_tasks = sum(len(tasks) for tasks in active_workers.values())
+        except Exception:
+            celery_status = "unhealthy"
+            active_tasks = 0
     
     # Проверка Redis (через Celery broker)
     try:
@@ -153,13 +371,30 @@ async def health_check():
     except Exception:
         redis_status = "unhealthy"
     
-    # Подсчет активных задач (упрощенно)
-    try:
-        inspect = celery_app.control.inspect()
-        active_tasks = sum(len(tasks) for tasks in (inspect.active() or {}).values())
-    except:
-        active_tasks = 0
-    
+    return build_system_status(celery_status, redis_status, active_tasks, completed_tasks)
+
+def heartbeat_health_check() -> SystemStatus:
+    """
+    Быстрая проверка по heartbeats воркеров: несколько чтений из Redis,
+    без обращений к воркерам и соединений с брокером
+
+    Raises:
+        redis.RedisError: Redis недоступен
+    """
+    heartbeats = read_heartbeats()
+    task_index = read_task_index()
+    completed_tasks = task_index["counts"]["SUCCESS"] if task_index is not None else 0
+
+    return build_system_status(
+        "healthy" if heartbeats else "no_workers",
+        "healthy",
+        sum(heartbeat["active_tasks"] for heartbeat in heartbeats),
+        completed_tasks,
+        workers=heartbeats
+    )
+
+def build_system_status(celery_status: str, redis_status: str, active_tasks: int,
+                        completed_tasks: int, workers: Optional[List[Dict[str, Any]]] = None) -> SystemStatus:
     overall_status = "healthy" if all([
         celery_status != "unhealthy", 
         redis_status != "unhealthy"
@@ -176,9 +411,39 @@ async def health_check():
             "agents": "ready"
         },
         active_tasks=active_tasks,
-        completed_tasks=0  # Можно добавить реальную статистику
+        completed_tasks=completed_tasks,
+        workers=workers
     )
 
+# Результат быстрой проверки, общий для частых проб балансировщика и оркестратора
+_health_cache: Dict[str, Any] = {}
+
+# Обработчики с блокирующими вызовами объявлены через def: FastAPI выполняет их в пуле потоков
+@app.get("/health", response_model=SystemStatus, summary="Детальный статус системы")
+def health_check(deep: bool = False):
+    """
+    Проверка здоровья всех компонентов системы
+
+    По умолчанию статус вычисляется по heartbeats воркеров и кешируется
+    на HEALTH_CACHE_TTL секунд. deep=true - полная проверка с inspect()
+    и соединением с брокером, без кеша.
+    """
+    if deep:
+        return deep_health_check()
+
+    cached = _health_cache.get("status")
+    if cached is not None and time.monotonic() < _health_cache["expires"]:
+        return cached
+
+    try:
+        status = heartbeat_health_check()
+    except redis.RedisError as e:
+        logger.warning(f"⚠️ Heartbeats воркеров недоступны: {e}, полная проверка")
+        status = deep_health_check()
+
+    _health_cache.update(status=status, expires=time.monotonic() + settings.health_cache_ttl)
+    return status
+
 @app.get("/crews", summary="Информация о типах команд")
 async def get_crew_types():
     """Получить информацию о доступных типах команд агентов"""
@@ -189,7 +454,7 @@ async def get_crew_types():
     }
 
 @app.post("/research", response_model=ResearchResponse, summary="Запуск исследования")
-async def create_research(request: ResearchRequest):
+def create_research(request: ResearchRequest):
     """
     Запускает новое исследование с выбранной командой агентов
     
@@ -200,21 +465,21 @@ async def create_research(request: ResearchRequest):
     """
     
     try:
-        # Генерация уникального ID задачи
-        task_id = f"research_{uuid.uuid4().hex[:12]}"
-        
-        logger.info(f"🚀 Создание задачи {task_id}: {request.topic} (команда: {request.crew_type})")
+        logger.info(f"🚀 Создание задачи: {request.topic} (команда: {request.crew_type})")
         
-        # Запуск асинхронной задачи Celery
-        celery_task = research_task.delay(
+        # Запуск задачи Celery (или свежий результат / присоединение к выполняющейся)
+        submission = submit_research(
             topic=request.topic,
             crew_type=request.crew_type,
             language=request.language,
-            depth=request.depth
+            depth=request.depth,
+            force_refresh=request.force_refresh,
+            priority=request.priority
         )
+        task_id = submission["task_id"]
         
         # Получаем информацию о команде
-        crew_info = CREW_TYPE_INFO.get(request.crew_type, CREW_TYPE_INFO["general"])
+        crew_info = dict(get_crew_spec(request.crew_type).info)
         
         # Оценка времени выполнения
         time_estimates = {
@@ -223,13 +488,23 @@ async def create_research(request: ResearchRequest):
             "comprehensive": "10-15 минут"
         }
         
+        if submission["cached"]:
+            message = f"Исследование '{request.topic}' уже выполнено командой '{crew_info['name']}'"
+        elif submission["coalesced"]:
+            message = f"Исследование '{request.topic}' уже выполняется командой '{crew_info['name']}'"
+        else:
+            message = f"Исследование '{request.topic}' принято в работу командой '{crew_info['name']}'"
+        
         response = ResearchResponse(
-            task_id=celery_task.id,
-            status="PENDING",
-            message=f"Исследование '{request.topic}' принято в работу командой '{crew_info['name']}'",
-            estimated_time=time_estimates.get(request.depth, "5-10 минут"),
+            task_id=task_id,
+            status=submission["status"],
+            message=message,
+            estimated_time="0 минут" if submission["cached"] else time_estimates.get(request.depth, "5-10 минут"),
             created_at=datetime.now(),
-            crew_info=crew_info
+            crew_info=crew_info,
+            coalesced=submission["coalesced"],
+            cached=submission["cached"],
+            result=submission["result"]
         )
         
         logger.info(f"✅ Задача {task_id} создана успешно")
@@ -239,11 +514,100 @@ async def create_research(request: ResearchRequest):
         logger.error(f"❌ Ошибка создания задачи: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Ошибка запуска исследования: {str(e)}")
 
+@app.post("/research/batch", response_model=BatchResponse, summary="Запуск пакета исследований")
+def create_research_batch(request: BatchResearchRequest):
+    """
+    Ставит в очередь пакет исследований одной группой Celery
+
+    - **items**: список исследований (topic, crew_type, language, depth, force_refresh)
+    - **priority**: приоритет задач пакета (по умолчанию: low)
+
+    Прогресс пакета: GET /research/batch/{batch_id},
+    результаты: GET /research/batch/{batch_id}/result
+    """
+
+    if len(request.items) > settings.batch_max_items:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Слишком много исследований в пакете: {len(request.items)} (максимум {settings.batch_max_items})"
+        )
+
+    try:
+        logger.info(f"🚀 Создание пакета из {len(request.items)} исследований")
+        batch = submit_batch(request.items, priority=request.priority)
+        items = batch["items"]
+
+        response = BatchResponse(
+            batch_id=batch["batch_id"],
+            total=len(items),
+            enqueued=batch["enqueued"],
+            cached=sum(1 for item in items if item["cached"] and item["duplicate_of"] is None),
+            coalesced=sum(1 for item in items if item["coalesced"] and item["duplicate_of"] is None),
+            duplicates=sum(1 for item in items if item["duplicate_of"] is not None),
+            created_at=datetime.now(),
+            items=[
+                {key: value for key, value in item.items() if key != "result"}
+                for item in items
+            ]
+        )
+
+        logger.info(f"✅ Пакет {batch['batch_id']} создан: {batch['enqueued']} новых задач")
+        return response
+
+    except Exception as e:
+        logger.error(f"❌ Ошибка создания пакета: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Ошибка запуска пакета исследований: {str(e)}")
+
+async def read_batch_summary(batch_id: str) -> Dict[str, Any]:
+    """Сводное состояние пакета по метаданным его задач"""
+    batch = await read_batch(batch_id)
+    if batch is None:
+        raise HTTPException(status_code=404, detail=f"Пакет {batch_id} не найден")
+
+    task_ids = list({item["task_id"] for item in batch["items"] if not item.get("cached")})
+    metas = await asyncio.gather(*(read_task_meta(task_id) for task_id in task_ids))
+
+    return summarize_batch(batch, dict(zip(task_ids, metas)))
+
+@app.get("/research/batch/{batch_id}", summary="Прогресс пакета исследований")
+async def get_batch_status(batch_id: str):
+    """
+    Сводный прогресс пакета: количество задач по состояниям,
+    средний прогресс и состояние каждого элемента (без результатов)
+    """
+
+    summary = await read_batch_summary(batch_id)
+    summary["items"] = [
+        {key: value for key, value in item.items() if key != "result"}
+        for item in summary["items"]
+    ]
+    return summary
+
+@app.get("/research/batch/{batch_id}/result", summary="Результаты пакета исследований")
+async def get_batch_result(batch_id: str):
+    """
+    Результаты всех исследований пакета
+
+    Для незавершенных элементов result пуст; поле status пакета
+    равно completed, когда все задачи достигли финального состояния.
+    Вынесенные в хранилище blob отчеты подставляются в результаты.
+    """
+
+    summary = await read_batch_summary(batch_id)
+    summary["items"] = await asyncio.to_thread(
+        lambda items: [{**item, "result": inline_report(item["result"])} for item in items],
+        summary["items"]
+    )
+    return summary
+
 @app.get("/result/{task_id}", response_model=TaskResult, summary="Получение результата")
-async def get_result(task_id: str):
+async def get_result(task_id: str, include_report: bool = True):
     """
     Получает результат исследования по ID задачи
     
+    Большие отчеты хранятся вне Redis: с include_report=false результат
+    содержит только ссылку report_ref, сам отчет отдает /result/{task_id}/report
+    
     Возможные статусы:
     - **PENDING**: Задача в очереди
     - **PROCESSING**: Агенты работают над исследованием  
@@ -252,10 +616,10 @@ async def get_result(task_id: str):
     """
     
     try:
-        # Получение результата из Celery
-        celery_result = celery_app.AsyncResult(task_id)
+        # Читаем состояние напрямую из result backend, не блокируя event loop
+        meta = await read_task_meta(task_id)
         
-        status = celery_result.status
+        status = meta.get("status", "PENDING")
         progress = 0
         result_data = None
         error = None
@@ -265,21 +629,27 @@ async def get_result(task_id: str):
             progress = 0
         elif status == "PROGRESS":
             # Получаем прогресс из метаданных
-            meta = celery_result.info or {}
-            progress = meta.get('current', 0)
+            info = meta.get("result") or {}
+            progress = info.get('current', 0) if isinstance(info, dict) else 0
         elif status == "SUCCESS":
             progress = 100
-            result_data = celery_result.result
+            result_data = meta.get("result")
             processing_time = result_data.get('processing_time') if isinstance(result_data, dict) else None
+            if include_report:
+                result_data = await asyncio.to_thread(inline_report, result_data)
         elif status == "FAILURE":
             progress = 0
-            error = str(celery_result.info)
+            error = format_task_error(meta)
+        elif status == "REVOKED":
+            # Кооперативная отмена сохраняет результаты завершенных задач команды
+            info = meta.get("result")
+            result_data = info if isinstance(info, dict) and info.get("status") == "cancelled" else None
         
         return TaskResult(
             task_id=task_id,
             status=status,
             progress=progress,
-            result=result_data,
+            result=result_data if isinstance(result_data, dict) else None,
             error=error,
             processing_time=processing_time,
             created_at=datetime.now(),  # Можно улучшить, сохраняя реальное время
@@ -290,18 +660,169 @@ async def get_result(task_id: str):
         logger.error(f"❌ Ошибка получения результата {task_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Ошибка получения результата: {str(e)}")
 
+@app.get("/result/{task_id}/report", summary="Отчет исследования")
+async def get_report(task_id: str):
+    """
+    Отдает отчет завершенного исследования потоком (text/markdown)
+
+    Отчет из хранилища blob распаковывается по частям, не загружаясь
+    в память целиком.
+    """
+
+    meta = await read_task_meta(task_id)
+    result_data = meta.get("result")
+
+    if meta.get("status") != "SUCCESS" or not isinstance(result_data, dict):
+        raise HTTPException(status_code=404, detail=f"Отчет задачи {task_id} не готов")
+
+    ref = result_data.get("report_ref")
+    if ref and not blob_path(ref["digest"]).exists():
+        raise HTTPException(status_code=404, detail=f"Отчет задачи {task_id} удален из хранилища")
+
+    return StreamingResponse(iter_report(result_data), media_type="text/markdown; charset=utf-8")
+
+@app.get("/result/{task_id}/sections", summary="Промежуточные результаты агентов")
+async def get_sections(task_id: str):
+    """
+    Разделы отчета, готовые на текущий момент
+    
+    Результат каждой задачи команды (или подтемы map-reduce) доступен
+    сразу после ее завершения, не дожидаясь всей команды. О новых
+    разделах сообщают события section SSE-стрима /result/{task_id}/stream.
+    После успешного завершения разделы удаляются - полный отчет
+    доступен в GET /result/{task_id}.
+    """
+    
+    meta, sections = await asyncio.gather(read_task_meta(task_id), read_sections(task_id))
+    
+    return {
+        "task_id": task_id,
+        "status": meta.get("status", "PENDING"),
+        "sections": sections,
+        "completed": len(sections)
+    }
+
+async def read_task_event(task_id: str) -> Dict[str, Any]:
+    """Событие SSE по текущим метаданным задачи с отчетом из хранилища blob"""
+    event = event_from_meta(task_id, await read_task_meta(task_id))
+    if "result" in event:
+        event["result"] = await asyncio.to_thread(inline_report, event["result"])
+    return event
+
+# Открытые SSE-потоки процесса API (один event loop - без блокировок)
+_active_streams = 0
+
+def release_stream_slot() -> None:
+    """Освобождает слот SSE-потока, занятый в stream_result"""
+    global _active_streams
+    _active_streams -= 1
+
+class StreamSlotResponse(StreamingResponse):
+    """
+    StreamingResponse, освобождающий слот SSE-потока после отправки
+
+    Слот освобождается и тогда, когда тело ответа так и не читалось
+    (ошибка отправки заголовков, разрыв соединения до первого события).
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            release_stream_slot()
+
+@app.get("/result/{task_id}/stream", summary="Поток прогресса задачи (SSE)")
+async def stream_result(task_id: str, request: Request):
+    """
+    Server-Sent Events со сменой состояния и прогресса задачи
+    
+    Первое событие - текущее состояние задачи, далее события публикуются
+    воркером по мере выполнения. Финальное событие (success/failure)
+    содержит результат или ошибку, после чего поток закрывается.
+    Число одновременных потоков ограничено SSE_MAX_STREAMS.
+    """
+    global _active_streams
+    
+    if _active_streams >= settings.sse_max_streams:
+        raise HTTPException(
+            status_code=503,
+            detail="Слишком много открытых потоков прогресса, используйте GET /result/{task_id}",
+            headers={"Retry-After": "5"}
+        )
+    # Слот занимается сразу при проверке: иначе одновременные запросы
+    # проходят проверку до того, как их потоки начнут выполняться
+    _active_streams += 1
+    
+    async def event_stream():
+        pubsub = get_async_pubsub_redis().pubsub()
+        
+        try:
+            # Подписываемся до чтения состояния, чтобы не потерять события между ними
+            await pubsub.subscribe(progress_channel(task_id))
+            
+            event = await read_task_event(task_id)
+            yield format_sse(event)
+            if event["state"] in TERMINAL_STATES:
+                return
+            
+            last_sent = time.monotonic()
+            while not await request.is_disconnected():
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                
+                if message is None:
+                    # Комментарий SSE не дает прокси закрыть простаивающее соединение
+                    if time.monotonic() - last_sent > 15:
+                        yield ": keepalive\n\n"
+                        last_sent = time.monotonic()
+                    continue
+                
+                event = json.loads(message["data"])
+                if event["state"] in TERMINAL_STATES:
+                    event = await read_task_event(task_id)
+                
+                yield format_sse(event)
+                last_sent = time.monotonic()
+                
+                if event["state"] in TERMINAL_STATES:
+                    break
+        
+        finally:
+            await pubsub.unsubscribe(progress_channel(task_id))
+            await pubsub.aclose()
+    
+    return StreamSlotResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.delete("/task/{task_id}", summary="Отмена задачи")
-async def cancel_task(task_id: str):
-    """Отменяет выполнение задачи (если возможно)"""
+def cancel_task(task_id: str, terminate: bool = False):
+    """
+    Отменяет выполнение задачи
+    
+    Выполняющаяся задача останавливается кооперативно: воркер проверяет
+    флаг отмены между шагами агентов и завершает задачу в состоянии REVOKED
+    с частичным результатом, не теряя процесс. Задача в очереди не будет
+    запущена. terminate=true принудительно завершает процесс воркера
+    (для зависших задач).
+    """
     
     try:
-        celery_app.control.revoke(task_id, terminate=True)
-        logger.info(f"🚫 Задача {task_id} отменена")
+        try:
+            request_cancel(task_id, ttl=settings.celery_task_timeout)
+        except redis.RedisError as e:
+            # Без флага кооперативная отмена невозможна
+            logger.warning(f"⚠️ Не удалось поставить флаг отмены {task_id}: {e}")
+            terminate = True
+        
+        celery_app.control.revoke(task_id, terminate=terminate)
+        logger.info(f"🚫 Задача {task_id} отменена{' принудительно' if terminate else ''}")
         
         return {
             "task_id": task_id,
             "status": "cancelled",
-            "message": "Задача отменена"
+            "message": "Задача отменена" if terminate else "Задача будет остановлена на ближайшем шаге агента"
         }
         
     except Exception as e:
@@ -309,40 +830,151 @@ async def cancel_task(task_id: str):
         raise HTTPException(status_code=500, detail=f"Ошибка отмены задачи: {str(e)}")
 
 @app.get("/tasks", summary="Список активных задач")
-async def list_active_tasks():
-    """Получить список всех активных задач"""
+def list_active_tasks(limit: int = 100):
+    """Получить список выполняющихся и ожидающих задач (последние limit каждого вида)"""
     
     try:
+        task_index = read_task_index()
+        
+        if task_index is not None:
+            counts = task_index["counts"]
+            return {
+                "active_tasks": list_tasks(ACTIVE_STATES, limit),
+                "scheduled_tasks": list_tasks(QUEUED_STATES, limit),
+                "total_active": sum(counts[state] for state in ACTIVE_STATES),
+                "total_scheduled": sum(counts[state] for state in QUEUED_STATES),
+                "source": "index"
+            }
+        
+        # Потребитель событий не запущен: широковещательный запрос к воркерам
         inspect = celery_app.control.inspect()
-        active_tasks = inspect.active() or {}
-        scheduled_tasks = inspect.scheduled() or {}
+        active_tasks = [
+            {**task, "hostname": hostname}
+            for hostname, tasks in (inspect.active() or {}).items() for task in tasks
+        ]
+        scheduled_tasks = [
+            {**task, "hostname": hostname}
+            for hostname, tasks in (inspect.scheduled() or {}).items() for task in tasks
+        ]
         
         return {
-            "active_tasks": active_tasks,
-            "scheduled_tasks": scheduled_tasks,
-            "total_active": sum(len(tasks) for tasks in active_tasks.values()),
-            "total_scheduled": sum(len(tasks) for tasks in scheduled_tasks.values())
+            "active_tasks": active_tasks[:limit],
+            "scheduled_tasks": scheduled_tasks[:limit],
+            "total_active": len(active_tasks),
+            "total_scheduled": len(scheduled_tasks),
+            "source": "inspect"
         }
         
     except Exception as e:
         logger.error(f"❌ Ошибка получения списка задач: {str(e)}")
         raise HTTPException(status_code=500, detail="Ошибка получения списка задач")
 
+@app.get("/tasks/stats", summary="Статистика задач и воркеров")
+def get_task_statistics():
+    """Количество задач по состояниям и живые воркеры из индекса событий Celery"""
+    
+    task_index = read_task_index()
+    if task_index is None:
+        raise HTTPException(status_code=503, detail="Индекс состояния задач недоступен: запустите python -m app.task_index")
+    
+    return {
+        "states": task_index["counts"],
+        "workers": task_index["workers"],
+        "total_workers": len(task_index["workers"]),
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.get("/cache/stats", summary="Статистика кешей")
+def get_cache_statistics():
+    """Счетчики попаданий и промахов кешей, накопленные всеми воркерами"""
+
+    try:
+        from app.cache import get_cache_stats
+        return {"caches": get_cache_stats()}
+
+    except Exception as e:
+        logger.error(f"❌ Ошибка получения статистики кешей: {str(e)}")
+        raise HTTPException(status_code=500, detail="Ошибка получения статистики кешей")
+
+@app.get("/llm/rate-limit", summary="Статистика лимита запросов к LLM")
+def get_rate_limit_statistics():
+    """Лимиты Gemini, текущее время ожидания квоты и накопленная статистика ожиданий"""
+
+    from app.rate_limit import get_rate_limiter
+
+    limiter = get_rate_limiter()
+    if limiter is None:
+        return {"enabled": False}
+
+    try:
+        return {"enabled": True, **limiter.stats()}
+
+    except redis.RedisError as e:
+        logger.error(f"❌ Ошибка получения статистики лимита LLM: {str(e)}")
+        raise HTTPException(status_code=503, detail="Статистика лимита LLM недоступна")
+
+@app.get("/llm/stats", summary="Статистика вызовов LLM")
+def get_llm_statistics():
+    """Вызовы, повторы, хеджи и превышения дедлайна, перцентили задержки Gemini и состояние цепи каждой модели"""
+
+    from app.circuit_breaker import get_circuit_breaker
+    from app.llm_resilience import llm_stats
+    from app.model_routing import routed_models
+
+    try:
+        circuits = None
+        if settings.circuit_breaker_enabled:
+            # Без маршрутизации все агенты работают на GEMINI_MODEL
+            circuits = {model: get_circuit_breaker(model).status() for model in routed_models()}
+        return {
+            **llm_stats(),
+            "circuits": circuits,
+            "fallback_model": settings.gemini_fallback_model or None
+        }
+
+    except redis.RedisError as e:
+        logger.error(f"❌ Ошибка получения статистики LLM: {str(e)}")
+        raise HTTPException(status_code=503, detail="Статистика LLM недоступна")
+
+@app.get("/search/concurrency", summary="Статистика семафора поиска")
+def get_search_concurrency_statistics():
+    """Занятые слоты и очередь семафора Serper и распределение времени ожидания слота"""
+
+    from app.semaphore import get_search_semaphore
+
+    semaphore = get_search_semaphore()
+    if semaphore is None:
+        return {"enabled": False}
+
+    try:
+        return {"enabled": True, **semaphore.stats()}
+
+    except redis.RedisError as e:
+        logger.error(f"❌ Ошибка получения статистики семафора поиска: {str(e)}")
+        raise HTTPException(status_code=503, detail="Статистика семафора поиска недоступна")
+
 # Обработчики ошибок
 @app.exception_handler(404)
 async def not_found_handler(request: Request, exc: HTTPException):
-    return {
+    detail = getattr(exc, "detail", None)
+    return JSONResponse(status_code=404, content={
         "error": "Not Found",
-        "message": "Эндпоинт не найден",
+        "message": detail if detail and detail != "Not Found" else "Эндпоинт не найден",
         "available_endpoints": [
             "GET /",
             "GET /health", 
             "GET /crews",
             "POST /research",
+            "POST /research/batch",
+            "GET /research/batch/{batch_id}",
+            "GET /research/batch/{batch_id}/result",
             "GET /result/{task_id}",
+            "GET /result/{task_id}/report",
+            "GET /result/{task_id}/sections",
+            "GET /result/{task_id}/stream",
             "GET /docs"
         ]
-    }
+    })
 
 @app.exception_handler(500)
 async def internal_error_handler(request: Request, exc: Exception):
@@ -382,8 +1014,7 @@ async def get_showcase_teams():
     - Инвестиционный Советник - для анализа акций
     """
     try:
-        from app.main_crew import get_showcase_crew_info
-        showcase_info = get_showcase_crew_info()
+        showcase_info = get_crew_info("showcase")
         
         return {
             "status": "success",
@@ -428,7 +1059,7 @@ async def get_showcase_teams():
           tags=["🎯 Showcase Teams"],
           summary="Запуск showcase исследования",
           description="Специальный endpoint для запуска showcase команд с валидацией")
-async def create_showcase_research(
+def create_showcase_research(
     research_data: ResearchRequest,
     background_tasks: BackgroundTasks
 ):
@@ -441,8 +1072,7 @@ async def create_showcase_research(
     - investment_advisor: Инвестиционный анализ акций
     """
     try:
-        from app.main_crew import get_showcase_crew_info
-        showcase_crews = get_showcase_crew_info()
+        showcase_crews = get_crew_info("showcase")
         
         # Проверяем что это showcase команда
         if research_data.crew_type not in showcase_crews:
@@ -481,23 +1111,28 @@ async def create_showcase_research(
             research_data.topic = topic
         
         # Запускаем задачу через стандартный механизм
-        task = research_task.delay(
+        submission = submit_research(
             topic=research_data.topic,
             crew_type=research_data.crew_type,
             language=research_data.language,
-            depth=research_data.depth
+            depth=research_data.depth,
+            force_refresh=research_data.force_refresh,
+            priority=research_data.priority
         )
         
         return {
-            "task_id": task.id,
-            "status": "PENDING",
+            "task_id": submission["task_id"],
+            "status": submission["status"],
             "message": f"Showcase исследование '{crew_info['name']}' запущено",
             "crew_info": crew_info,
             "topic": research_data.topic,
             "estimated_time": crew_info["estimated_time"],
             "use_cases": crew_info["use_cases"],
             "created_at": datetime.utcnow().isoformat(),
-            "showcase": True
+            "showcase": True,
+            "coalesced": submission["coalesced"],
+            "cached": submission["cached"],
+            "result": submission["result"]
         }
         
     except HTTPException:
@@ -522,47 +1157,9 @@ async def get_enhanced_crews():
     с детальными описаниями и примерами использования
     """
     try:
-        # Стандартные команды
-        standard_crews = {
-            "general": {
-                "name": "Универсальные исследования",
-                "description": "Comprehensive исследования любых тем",
-                "estimated_time": "3-5 минут",
-                "category": "standard"
-            },
-            "business_analysis": {
-                "name": "Бизнес-аналитика", 
-                "description": "Анализ рынков и бизнес-возможностей",
-                "estimated_time": "5-8 минут",
-                "category": "standard"
-            },
-            "seo_content": {
-                "name": "SEO контент",
-                "description": "Создание SEO-оптимизированного контента", 
-                "estimated_time": "4-6 минут",
-                "category": "standard"
-            },
-            "tech_research": {
-                "name": "Техническое исследование",
-                "description": "Глубокий технический анализ",
-                "estimated_time": "6-10 минут", 
-                "category": "standard"
-            },
-            "financial_analysis": {
-                "name": "Финансовый анализ",
-                "description": "Финансовые исследования и анализ рисков",
-                "estimated_time": "5-8 минут",
-                "category": "standard"
-            }
-        }
-        
-        # Showcase команды
-        from app.main_crew import get_showcase_crew_info
-        showcase_crews = get_showcase_crew_info()
-        
-        # Добавляем категорию к showcase командам
-        for crew_key, crew_info in showcase_crews.items():
-            crew_info["category"] = "showcase"
+        # Стандартные и showcase команды из реестра
+        standard_crews = get_crew_info("standard")
+        showcase_crews = get_crew_info("showcase")
         
         # Объединяем все команды
         all_crews = {**standard_crews, **showcase_crews}
@@ -586,5 +1183,3 @@ async def get_enhanced_crews():
             status_code=500,
             detail="Ошибка получения информации о командах"
         )
-
-print("✅ API расширен поддержкой showcase команд")
@@ -0,0 +1,126 @@
+"""
+AI Agent Farm - Batch Research
+==============================
+Пакеты исследований: запись пакета (batch_id -> задачи Celery) и сводный прогресс
+"""
+
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from app.progress import TERMINAL_STATES
+from app.redis_client import get_async_redis, get_redis
+from app.task_state import format_task_error
+
+logger = logging.getLogger(__name__)
+
+BATCH_PREFIX = "batch:"
+
+def save_batch(batch_id: str, items: List[Dict[str, Any]], ttl: int) -> None:
+    """Сохраняет состав пакета: элементы с task_id и параметрами запроса"""
+    record = {
+        "batch_id": batch_id,
+        "created_at": time.time(),
+        "items": items
+    }
+    get_redis().set(
+        f"{BATCH_PREFIX}{batch_id}",
+        json.dumps(record, ensure_ascii=False),
+        ex=ttl
+    )
+
+def _parse_batch(batch_id: str, payload: Optional[str]) -> Optional[Dict[str, Any]]:
+    if payload is None:
+        return None
+
+    try:
+        return json.loads(payload)
+    except ValueError:
+        logger.warning(f"⚠️ Поврежденная запись пакета: {batch_id}")
+        return None
+
+async def read_batch(batch_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Возвращает запись пакета без блокировки event loop
+
+    Returns:
+        dict с ключами batch_id, created_at, items или None
+    """
+    payload = await get_async_redis().get(f"{BATCH_PREFIX}{batch_id}")
+    return _parse_batch(batch_id, payload)
+
+def item_state(item: Dict[str, Any], meta: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Состояние элемента пакета по метаданным его задачи
+
+    Элементы, отданные из хранилища результатов (cached), завершены
+    независимо от того, хранит ли еще result backend исходную задачу.
+    """
+    if item.get("cached"):
+        return {"status": "SUCCESS", "progress": 100, "result": item.get("result"), "error": None}
+
+    status = meta.get("status", "PENDING")
+    info = meta.get("result")
+    state = {"status": status, "progress": 0, "result": None, "error": None}
+
+    if status == "PROGRESS" and isinstance(info, dict):
+        state["progress"] = info.get("current", 0)
+    elif status == "SUCCESS":
+        state["progress"] = 100
+        state["result"] = info if isinstance(info, dict) else None
+    elif status == "REVOKED" and isinstance(info, dict) and info.get("status") == "cancelled":
+        # Кооперативная отмена: частичный результат
+        state["progress"] = 100
+        state["result"] = info
+        state["error"] = info.get("message")
+    elif status in TERMINAL_STATES:
+        # Завершенная с ошибкой задача не будет продвигаться дальше
+        state["progress"] = 100
+        state["error"] = format_task_error(meta)
+
+    return state
+
+def summarize_batch(batch: Dict[str, Any], metas: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Сводный прогресс пакета
+
+    Args:
+        batch: запись пакета из read_batch
+        metas: метаданные задач по task_id (как их отдает read_task_meta)
+    """
+    items = []
+    counts: Dict[str, int] = {}
+
+    for item in batch["items"]:
+        state = item_state(item, metas.get(item["task_id"], {}))
+        counts[state["status"]] = counts.get(state["status"], 0) + 1
+        items.append({
+            "index": item["index"],
+            "topic": item["topic"],
+            "crew_type": item["crew_type"],
+            "task_id": item["task_id"],
+            "cached": item.get("cached", False),
+            "coalesced": item.get("coalesced", False),
+            **state
+        })
+
+    total = len(items)
+    completed = sum(1 for item in items if item["status"] in TERMINAL_STATES)
+
+    if completed == total:
+        status = "completed"
+    elif counts.get("PENDING", 0) == total:
+        status = "pending"
+    else:
+        status = "running"
+
+    return {
+        "batch_id": batch["batch_id"],
+        "status": status,
+        "progress": int(sum(item["progress"] for item in items) / total) if total else 100,
+        "total": total,
+        "completed": completed,
+        "states": counts,
+        "items": items
+    }
@@ -0,0 +1,180 @@
+"""
+AI Agent Farm - Report Blob Store
+=================================
+Локальное content-addressed хранилище больших отчетов: отчет сжимается gzip
+и хранится на диске, а в result backend попадает только ссылка на него.
+
+Blob удаляется, если его не записывали дольше BLOB_STORE_MAX_AGE (не меньше
+RESULT_STORE_TTL - срока жизни ссылок в хранилище результатов). Очистка
+выполняется воркером при выносе отчета не чаще BLOB_PRUNE_INTERVAL.
+"""
+
+import gzip
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+BLOB_ENCODING = "gzip"
+CHUNK_SIZE = 64 * 1024
+
+# Период очистки устаревших blob в процессе воркера
+BLOB_PRUNE_INTERVAL = 3600
+
+def blob_path(digest: str) -> Path:
+    """Путь к blob: <dir>/<первые 2 символа sha256>/<sha256>.gz"""
+    return Path(settings.blob_store_dir) / digest[:2] / f"{digest}.gz"
+
+def put_blob(data: bytes) -> str:
+    """
+    Сохраняет данные в сжатом виде
+
+    Одинаковые данные хранятся один раз; запись атомарна (временный
+    файл + rename), поэтому читатели не видят недописанный blob.
+
+    Returns:
+        sha256 несжатых данных
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    path = blob_path(digest)
+
+    if path.exists():
+        # Повторная запись продлевает жизнь blob: на него ссылается новый результат
+        os.utime(path)
+        return digest
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+
+    try:
+        with os.fdopen(fd, "wb") as raw:
+            # mtime=0: одинаковые данные дают одинаковый файл
+            with gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as compressed:
+                compressed.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+    return digest
+
+def iter_blob(digest: str, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Читает blob с распаковкой по частям (FileNotFoundError, если blob удален)"""
+    with gzip.open(blob_path(digest), "rb") as blob:
+        while True:
+            chunk = blob.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+def read_blob(digest: str) -> bytes:
+    """Читает blob целиком"""
+    return b"".join(iter_blob(digest))
+
+def prune_blobs(max_age: int) -> int:
+    """
+    Удаляет blob, которые не записывались дольше max_age секунд
+
+    Returns:
+        количество удаленных blob
+    """
+    root = Path(settings.blob_store_dir)
+    if not root.is_dir():
+        return 0
+
+    cutoff = time.time() - max_age
+    removed = 0
+    for path in root.glob("*/*.gz"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except FileNotFoundError:
+            # Удален параллельно другим воркером
+            continue
+
+    if removed:
+        logger.info(f"🧹 Удалено устаревших blob: {removed}")
+    return removed
+
+_last_prune: Optional[float] = None
+
+def maybe_prune_blobs() -> None:
+    """Очищает хранилище, если с прошлой очистки в процессе прошло BLOB_PRUNE_INTERVAL"""
+    global _last_prune
+    if _last_prune is not None and time.monotonic() - _last_prune < BLOB_PRUNE_INTERVAL:
+        return
+
+    _last_prune = time.monotonic()
+    try:
+        prune_blobs(settings.blob_store_max_age)
+    except OSError as e:
+        logger.warning(f"⚠️ Не удалось очистить хранилище blob: {e}")
+
+def offload_report(response: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Выносит большой отчет из результата задачи в хранилище blob
+
+    Отчеты короче settings.blob_store_threshold байт остаются в результате.
+    Вместо вынесенного отчета result равен None, а report_ref содержит
+    sha256, размер и кодировку blob.
+    """
+    report = response.get("result")
+    if not settings.blob_store_enabled or not isinstance(report, str):
+        return response
+
+    data = report.encode("utf-8")
+    if len(data) < settings.blob_store_threshold:
+        return response
+
+    digest = put_blob(data)
+    maybe_prune_blobs()
+    logger.info(f"🗃️ Отчет ({len(data)} байт) сохранен в хранилище blob: {digest[:12]}")
+
+    return {
+        **response,
+        "result": None,
+        "report_ref": {
+            "digest": digest,
+            "size": len(data),
+            "encoding": BLOB_ENCODING
+        }
+    }
+
+def iter_report(response: Dict[str, Any]) -> Iterator[bytes]:
+    """Отчет из результата задачи по частям (из blob или из самого результата)"""
+    ref = response.get("report_ref")
+    if ref:
+        yield from iter_blob(ref["digest"])
+    else:
+        yield str(response.get("result") or "").encode("utf-8")
+
+def load_report(response: Dict[str, Any]) -> Dict[str, Any]:
+    """Возвращает результат задачи с отчетом, подставленным из blob"""
+    ref = response.get("report_ref")
+    if not ref:
+        return response
+
+    return {**response, "result": read_blob(ref["digest"]).decode("utf-8")}
+
+def inline_report(response: Any) -> Any:
+    """
+    Результат задачи с отчетом из blob для ответов API
+
+    Удаленный blob не делает результат недоступным: остается ссылка report_ref.
+    """
+    if not isinstance(response, dict) or not response.get("report_ref"):
+        return response
+
+    try:
+        return load_report(response)
+    except OSError as e:
+        logger.warning(f"⚠️ Отчет {response['report_ref']['digest'][:12]} недоступен в хранилище blob: {e}")
+        return response
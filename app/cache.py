@@ -0,0 +1,256 @@
+"""
+AI Agent Farm - Response Caches
+===============================
+Redis-кеши для ответов LLM и результатов поиска с TTL и счетчиками попаданий
+"""
+
+from contextlib import contextmanager
+import hashlib
+import logging
+import re
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional
+
+import redis
+from langchain_core.caches import BaseCache, RETURN_VAL_TYPE
+from langchain_core.load import dumps, loads
+
+from app.config import settings
+from app.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+STATS_KEY_PREFIX = "cache-stats:"
+
+
+class CacheStats:
+    """Счетчики попаданий и промахов кеша (локальные и общие для всей фермы)"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit: bool) -> None:
+        """Учитывает обращение к кешу"""
+        field = "hits" if hit else "misses"
+        setattr(self, field, getattr(self, field) + 1)
+
+        try:
+            get_redis().hincrby(f"{STATS_KEY_PREFIX}{self.name}", field, 1)
+        except redis.RedisError as e:
+            logger.debug(f"Не удалось обновить статистику кеша {self.name}: {e}")
+
+    def as_dict(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0
+        }
+
+
+class RedisLLMCache(BaseCache):
+    """
+    Кеш ответов LLM в Redis
+
+    Ключ строится из llm_string (модель, temperature и прочие параметры)
+    и полного текста промпта. Записи живут ttl секунд, а индекс в sorted set
+    ограничивает их количество: при переполнении вытесняются самые давно
+    использованные записи.
+    """
+
+    def __init__(self, ttl: int, max_entries: int, namespace: str = "llm-cache"):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.namespace = namespace
+        self.index_key = f"{namespace}:index"
+        self.stats = CacheStats(namespace)
+
+    def _key(self, prompt: str, llm_string: str) -> str:
+        digest = hashlib.sha256(f"{llm_string}\x00{prompt}".encode("utf-8")).hexdigest()
+        return f"{self.namespace}:{digest}"
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = self._key(prompt, llm_string)
+
+        try:
+            client = get_redis()
+            payload = client.get(key)
+            if payload is not None:
+                client.zadd(self.index_key, {key: time.time()})
+        except redis.RedisError as e:
+            logger.warning(f"⚠️ LLM-кеш недоступен: {e}")
+            return None
+
+        if payload is None:
+            self.stats.record(hit=False)
+            return None
+
+        try:
+            generations = loads(payload)
+        except Exception as e:
+            logger.warning(f"⚠️ Поврежденная запись LLM-кеша {key}: {e}")
+            self.stats.record(hit=False)
+            return None
+
+        self.stats.record(hit=True)
+        return generations
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        key = self._key(prompt, llm_string)
+
+        try:
+            client = get_redis()
+            pipe = client.pipeline()
+            pipe.set(key, dumps(list(return_val)), ex=self.ttl)
+            pipe.zadd(self.index_key, {key: time.time()})
+            pipe.zcard(self.index_key)
+            size = pipe.execute()[-1]
+
+            if size > self.max_entries:
+                self._evict(client, size - self.max_entries)
+        except redis.RedisError as e:
+            logger.warning(f"⚠️ Не удалось сохранить ответ в LLM-кеш: {e}")
+
+    def _evict(self, client: redis.Redis, count: int) -> None:
+        """Вытесняет самые давно использованные записи"""
+        evicted = client.zpopmin(self.index_key, count)
+        keys = [key for key, _ in evicted]
+        if keys:
+            client.delete(*keys)
+            logger.debug(f"🧹 Из LLM-кеша вытеснено записей: {len(keys)}")
+
+    def clear(self, **kwargs: Any) -> None:
+        client = get_redis()
+        keys = client.zrange(self.index_key, 0, -1)
+        if keys:
+            client.delete(*keys)
+        client.delete(self.index_key)
+
+
+_llm_cache: Optional[RedisLLMCache] = None
+
+def get_llm_cache() -> Optional[RedisLLMCache]:
+    """Возвращает общий LLM-кеш процесса (или None, если кеш отключен)"""
+    global _llm_cache
+
+    if not settings.llm_cache_enabled:
+        return None
+
+    if _llm_cache is None:
+        _llm_cache = RedisLLMCache(
+            ttl=settings.llm_cache_ttl,
+            max_entries=settings.llm_cache_max_entries
+        )
+
+    return _llm_cache
+
+
+def normalize_query(query: str) -> str:
+    """Приводит поисковый запрос к канонической форме для ключа кеша"""
+    query = re.sub(r"\s+", " ", query.strip().lower())
+    return query.strip(" ?!.,;:")
+
+
+class SearchCache:
+    """Общий для всех воркеров Redis-кеш результатов поиска"""
+
+    def __init__(self, ttl: int, namespace: str = "search-cache"):
+        self.ttl = ttl
+        self.namespace = namespace
+        self.stats = CacheStats(namespace)
+
+    def _key(self, query: str) -> str:
+        digest = hashlib.sha1(normalize_query(query).encode("utf-8")).hexdigest()
+        return f"{self.namespace}:{digest}"
+
+    def get(self, query: str) -> Optional[str]:
+        try:
+            result = get_redis().get(self._key(query))
+        except redis.RedisError as e:
+            logger.warning(f"⚠️ Кеш поиска недоступен: {e}")
+            return None
+
+        self.stats.record(hit=result is not None)
+        return result
+
+    def set(self, query: str, result: str) -> None:
+        try:
+            get_redis().set(self._key(query), result, ex=self.ttl)
+        except redis.RedisError as e:
+            logger.warning(f"⚠️ Не удалось сохранить результат поиска в кеш: {e}")
+
+
+class QueryMemo:
+    """
+    Мемо поисковых запросов в памяти процесса
+
+    Живет в пределах одного crew.kickoff(): последовательные агенты одной
+    команды часто повторяют почти одинаковые запросы.
+    """
+
+    def __init__(self, namespace: str = "search-memo"):
+        self._results: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.stats = CacheStats(namespace)
+
+    def get(self, query: str) -> Optional[str]:
+        with self._lock:
+            result = self._results.get(normalize_query(query))
+        self.stats.record(hit=result is not None)
+        return result
+
+    def set(self, query: str, result: str) -> None:
+        with self._lock:
+            self._results[normalize_query(query)] = result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._results.clear()
+
+
+_search_cache: Optional[SearchCache] = None
+query_memo = QueryMemo()
+
+def get_search_cache() -> Optional[SearchCache]:
+    """Возвращает общий кеш поиска процесса (или None, если кеш отключен)"""
+    global _search_cache
+
+    if not settings.search_cache_enabled:
+        return None
+
+    if _search_cache is None:
+        _search_cache = SearchCache(ttl=settings.search_cache_ttl)
+
+    return _search_cache
+
+
+@contextmanager
+def search_scope() -> Iterator[QueryMemo]:
+    """Ограничивает мемо поисковых запросов одним запуском команды"""
+    query_memo.clear()
+    try:
+        yield query_memo
+    finally:
+        query_memo.clear()
+
+
+def get_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Возвращает счетчики всех кешей, накопленные в Redis всеми процессами"""
+    client = get_redis()
+    stats = {}
+
+    for key in client.scan_iter(match=f"{STATS_KEY_PREFIX}*"):
+        counters = client.hgetall(key)
+        hits = int(counters.get("hits", 0))
+        misses = int(counters.get("misses", 0))
+        total = hits + misses
+        stats[key[len(STATS_KEY_PREFIX):]] = {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 4) if total else 0.0
+        }
+
+    return stats
@@ -0,0 +1,90 @@
+"""
+AI Agent Farm - Cooperative Cancellation
+========================================
+Кооперативная отмена исследований: API ставит флаг отмены в Redis,
+воркер проверяет его между шагами агентов и перед вызовами инструментов
+и завершает задачу сам, не теряя процесс prefork
+"""
+
+import logging
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from app.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+CANCEL_PREFIX = "cancel:"
+
+
+class TaskCancelled(Exception):
+    """Исследование отменено; partial_output - результаты завершенных задач команды"""
+
+    def __init__(self, task_id: str, partial_output: str = ""):
+        super().__init__(f"Задача {task_id} отменена")
+        self.task_id = task_id
+        self.partial_output = partial_output
+
+
+def request_cancel(task_id: str, ttl: int) -> None:
+    """Ставит флаг отмены задачи"""
+    get_redis().set(f"{CANCEL_PREFIX}{task_id}", "1", ex=ttl)
+
+def is_cancel_requested(task_id: str) -> bool:
+    """Проверяет флаг отмены задачи"""
+    return get_redis().exists(f"{CANCEL_PREFIX}{task_id}") > 0
+
+def clear_cancel(task_id: str) -> None:
+    """Снимает флаг отмены задачи"""
+    get_redis().delete(f"{CANCEL_PREFIX}{task_id}")
+
+
+class CancellationToken:
+    """
+    Флаг отмены одной задачи
+
+    Положительный ответ запоминается: после отмены Redis больше не опрашивается.
+    Ошибки Redis не прерывают исследование.
+    """
+
+    def __init__(self, task_id: str):
+        self.task_id = task_id
+        self.cancelled = False
+
+    def check(self) -> None:
+        """Бросает TaskCancelled, если запрошена отмена"""
+        if not self.cancelled:
+            try:
+                self.cancelled = is_cancel_requested(self.task_id)
+            except Exception as e:
+                logger.debug(f"Не удалось проверить флаг отмены {self.task_id}: {e}")
+
+        if self.cancelled:
+            raise TaskCancelled(self.task_id)
+
+
+# Токен задачи, выполняемой процессом (prefork: одна задача на процесс)
+_current_token: Optional[CancellationToken] = None
+
+@contextmanager
+def cancel_scope(token: CancellationToken) -> Iterator[CancellationToken]:
+    """Делает токен доступным контрольным точкам на время выполнения задачи"""
+    global _current_token
+    _current_token = token
+    try:
+        yield token
+    finally:
+        _current_token = None
+
+def check_cancelled() -> None:
+    """Контрольная точка: бросает TaskCancelled, если текущая задача отменена"""
+    if _current_token is not None:
+        _current_token.check()
+
+def checkpoint(callback=None):
+    """step_callback агента: передает шаг callback и проверяет флаг отмены"""
+    def on_step(step_output):
+        if callback is not None:
+            callback(step_output)
+        check_cancelled()
+    return on_step
@@ -0,0 +1,47 @@
+"""
+AI Agent Farm - Crew Checkpoints
+================================
+Контрольные точки исследований: результаты завершенных задач команды
+сохраняются по task_id Celery, и повторно доставленная задача
+(task_acks_late) продолжает работу с первой незавершенной задачи
+"""
+
+import logging
+from typing import Dict
+
+import redis
+
+from app.config import settings
+from app.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_PREFIX = "checkpoint:"
+
+def save_checkpoint(task_id: str, key: str, output: str) -> None:
+    """
+    Сохраняет результат шага исследования
+
+    Ошибки Redis не прерывают исследование: без контрольной точки
+    шаг просто будет выполнен заново при повторной доставке.
+    """
+    name = f"{CHECKPOINT_PREFIX}{task_id}"
+    try:
+        pipe = get_redis().pipeline()
+        pipe.hset(name, key, output)
+        pipe.expire(name, settings.checkpoint_ttl)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"⚠️ Не удалось сохранить контрольную точку {task_id}/{key}: {e}")
+
+def load_checkpoints(task_id: str) -> Dict[str, str]:
+    """Сохраненные результаты шагов исследования (ключ шага -> результат)"""
+    try:
+        return get_redis().hgetall(f"{CHECKPOINT_PREFIX}{task_id}")
+    except redis.RedisError as e:
+        logger.warning(f"⚠️ Контрольные точки {task_id} недоступны: {e}")
+        return {}
+
+def clear_checkpoints(task_id: str) -> None:
+    """Удаляет контрольные точки завершенного исследования"""
+    get_redis().delete(f"{CHECKPOINT_PREFIX}{task_id}")
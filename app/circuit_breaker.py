@@ -0,0 +1,248 @@
+"""
+AI Agent Farm - LLM Circuit Breaker
+===================================
+Общий для всех воркеров предохранитель вызовов LLM, отдельный для каждой
+модели Gemini (маршрутизация моделей): деградация одной модели не
+переключает на резервную вызовы остальных. Доля ошибок или
+медленных ответов за скользящее окно выше порога размыкает цепь: вызовы
+сразу уходят на резервную модель (GEMINI_FALLBACK_MODEL) или завершаются
+ошибкой, вместо того чтобы занимать воркер до таймаута задачи. Через
+CIRCUIT_OPEN_DURATION один пробный запрос проверяет, восстановился ли провайдер.
+Задержка считается только по запросу к провайдеру: предохранитель стоит
+под лимитером, ожидание квоты в нее не входит.
+
+Структуры (name - gemini:<модель>):
+    circuit:<name>                 hash state (open/half_open) и opened_at
+    circuit:<name>:probe           аренда пробного запроса
+    circuit:<name>:window:<bucket> hash calls/errors/slow за интервал окна
+"""
+
+import functools
+import logging
+import time
+from typing import Any, Dict, Optional
+
+import redis
+
+from app.config import settings
+from app.llm_resilience import is_transient
+from app.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+CIRCUIT_PREFIX = "circuit:"
+
+# Окно делится на интервалы: счетчики интервала живут, пока он в окне
+BUCKETS = 6
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Разрешения на вызов основной модели
+PERMIT_CLOSED = "closed"
+PERMIT_PROBE = "probe"
+
+
+class CircuitOpenError(Exception):
+    """Цепь разомкнута, резервная модель не настроена"""
+
+
+class CircuitBreaker:
+    """
+    Предохранитель с состоянием в Redis
+
+    Ошибки Redis не блокируют вызовы: предохранитель считается замкнутым.
+    """
+
+    def __init__(self, name: str, error_threshold: float, slow_call_threshold: float,
+                 slow_call_rate: float, min_calls: int, window: int, open_duration: float):
+        self.name = name
+        self.error_threshold = error_threshold
+        self.slow_call_threshold = slow_call_threshold
+        self.slow_call_rate = slow_call_rate
+        self.min_calls = min_calls
+        self.window = window
+        self.open_duration = open_duration
+        self.state_key = f"{CIRCUIT_PREFIX}{name}"
+        self.probe_key = f"{CIRCUIT_PREFIX}{name}:probe"
+
+    def _bucket_key(self, bucket: int) -> str:
+        return f"{CIRCUIT_PREFIX}{self.name}:window:{bucket}"
+
+    def _current_bucket(self) -> int:
+        return int(time.time() // (self.window / BUCKETS))
+
+    def allow(self) -> Optional[str]:
+        """
+        Можно ли вызвать основную модель
+
+        Returns:
+            PERMIT_CLOSED, PERMIT_PROBE (пробный запрос) или None - цепь разомкнута
+        """
+        try:
+            client = get_redis()
+            state = client.hgetall(self.state_key)
+            if not state:
+                return PERMIT_CLOSED
+
+            if time.time() - float(state.get("opened_at", 0)) < self.open_duration:
+                return None
+
+            # Пробный запрос один на всю ферму; аренда истекает, если пробующий процесс упал
+            if client.set(self.probe_key, "1", nx=True, ex=max(int(settings.llm_call_timeout), 1)):
+                client.hset(self.state_key, "state", HALF_OPEN)
+                logger.info(f"🟡 Цепь {self.name}: пробный запрос к основной модели")
+                return PERMIT_PROBE
+            return None
+        except redis.RedisError as e:
+            logger.debug(f"Состояние цепи {self.name} недоступно: {e}")
+            return PERMIT_CLOSED
+
+    def record(self, permit: str, success: bool, latency: float) -> None:
+        """Учитывает результат вызова основной модели"""
+        slow = latency > self.slow_call_threshold
+        try:
+            if permit == PERMIT_PROBE:
+                if success and not slow:
+                    self.close()
+                else:
+                    self.open("пробный запрос не удался")
+                return
+
+            key = self._bucket_key(self._current_bucket())
+            pipe = get_redis().pipeline()
+            pipe.hincrby(key, "calls", 1)
+            if not success:
+                pipe.hincrby(key, "errors", 1)
+            if slow:
+                pipe.hincrby(key, "slow", 1)
+            pipe.expire(key, self.window + int(self.window / BUCKETS) + 1)
+            pipe.execute()
+
+            if not success or slow:
+                self._evaluate()
+        except redis.RedisError as e:
+            logger.debug(f"Не удалось учесть вызов в цепи {self.name}: {e}")
+
+    def release_probe(self) -> None:
+        """Освобождает аренду пробного запроса, не давшего ответа о провайдере"""
+        try:
+            get_redis().delete(self.probe_key)
+        except redis.RedisError as e:
+            logger.debug(f"Не удалось освободить пробный запрос цепи {self.name}: {e}")
+
+    def window_counts(self) -> Dict[str, int]:
+        """Вызовы, ошибки и медленные ответы за окно"""
+        current = self._current_bucket()
+        pipe = get_redis().pipeline()
+        for bucket in range(current - BUCKETS + 1, current + 1):
+            pipe.hgetall(self._bucket_key(bucket))
+
+        totals = {"calls": 0, "errors": 0, "slow": 0}
+        for counters in pipe.execute():
+            for field in totals:
+                totals[field] += int(counters.get(field, 0))
+        return totals
+
+    def _evaluate(self) -> None:
+        counts = self.window_counts()
+        if counts["calls"] < self.min_calls:
+            return
+
+        error_rate = counts["errors"] / counts["calls"]
+        slow_rate = counts["slow"] / counts["calls"]
+        if error_rate >= self.error_threshold:
+            self.open(f"доля ошибок {error_rate:.0%} за {self.window}с")
+        elif slow_rate >= self.slow_call_rate:
+            self.open(f"доля ответов дольше {self.slow_call_threshold:.0f}с - {slow_rate:.0%}")
+
+    def open(self, reason: str) -> None:
+        """Размыкает цепь на open_duration"""
+        pipe = get_redis().pipeline()
+        pipe.hset(self.state_key, mapping={"state": OPEN, "opened_at": time.time(), "reason": reason})
+        pipe.delete(self.probe_key)
+        pipe.execute()
+        logger.warning(f"🔴 Цепь {self.name} разомкнута: {reason}")
+
+    def close(self) -> None:
+        """Замыкает цепь и сбрасывает окно"""
+        current = self._current_bucket()
+        get_redis().delete(
+            self.state_key, self.probe_key,
+            *[self._bucket_key(bucket) for bucket in range(current - BUCKETS + 1, current + 1)]
+        )
+        logger.info(f"🟢 Цепь {self.name} замкнута: основная модель отвечает")
+
+    def status(self) -> Dict[str, Any]:
+        """Состояние цепи и счетчики окна"""
+        state = get_redis().hgetall(self.state_key)
+        return {
+            "state": state.get("state", CLOSED),
+            "opened_at": float(state["opened_at"]) if "opened_at" in state else None,
+            "reason": state.get("reason"),
+            "window": self.window_counts()
+        }
+
+
+_circuit_breakers: Dict[str, CircuitBreaker] = {}
+
+def get_circuit_breaker(model: Optional[str] = None) -> Optional[CircuitBreaker]:
+    """Возвращает предохранитель модели Gemini (или None, если отключен)"""
+    if not settings.circuit_breaker_enabled:
+        return None
+
+    model = model or settings.gemini_model
+    breaker = _circuit_breakers.get(model)
+    if breaker is None:
+        breaker = CircuitBreaker(
+            f"gemini:{model}",
+            error_threshold=settings.circuit_error_threshold,
+            slow_call_threshold=settings.circuit_slow_call_threshold,
+            slow_call_rate=settings.circuit_slow_call_rate,
+            min_calls=settings.circuit_min_calls,
+            window=settings.circuit_window,
+            open_duration=settings.circuit_open_duration
+        )
+        _circuit_breakers[model] = breaker
+
+    return breaker
+
+
+@functools.lru_cache(maxsize=None)
+def protected(chat_model_class, fallback=None):
+    """
+    Подкласс чат-модели за предохранителем своей модели (self.model)
+
+    fallback - функция, возвращающая резервную модель; без нее при
+    разомкнутой цепи вызов сразу завершается CircuitOpenError.
+    """
+
+    class ProtectedChatModel(chat_model_class):
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+            breaker = get_circuit_breaker(self.model)
+            if breaker is None:
+                return super()._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+            permit = breaker.allow()
+            if permit is None:
+                if fallback is None:
+                    raise CircuitOpenError(f"Цепь {breaker.name} разомкнута, резервная модель не настроена")
+                logger.info(f"↪️ Цепь {breaker.name} разомкнута, запрос к резервной модели")
+                return fallback()._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+            started = time.monotonic()
+            try:
+                result = super()._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+            except Exception as exc:
+                # Ошибки запроса (не провайдера) и отмена задачи цепь не размыкают
+                if is_transient(exc):
+                    breaker.record(permit, success=False, latency=time.monotonic() - started)
+                elif permit == PERMIT_PROBE:
+                    breaker.release_probe()
+                raise
+            breaker.record(permit, success=True, latency=time.monotonic() - started)
+            return result
+
+    ProtectedChatModel.__name__ = f"Protected{chat_model_class.__name__}"
+    return ProtectedChatModel
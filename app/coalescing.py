@@ -0,0 +1,61 @@
+"""
+AI Agent Farm - Request Coalescing
+==================================
+Реестр выполняемых исследований: одинаковые запросы объединяются в одну задачу Celery
+"""
+
+import hashlib
+import json
+import logging
+import re
+from typing import Optional
+
+from app.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+INFLIGHT_PREFIX = "inflight:"
+
+# Удаляет ключ только если он все еще принадлежит указанной задаче
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+def canonical_request_key(topic: str, crew_type: str, language: str, depth: str) -> str:
+    """Строит канонический ключ запроса на исследование"""
+    normalized_topic = re.sub(r"\s+", " ", topic.strip()).casefold()
+    payload = json.dumps(
+        [normalized_topic, crew_type, language, depth],
+        ensure_ascii=False
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+def claim_inflight(request_key: str, task_id: str, ttl: int) -> Optional[str]:
+    """
+    Атомарно регистрирует задачу как выполняющую запрос
+
+    Returns:
+        None, если ключ захвачен этой задачей, иначе ID уже выполняющейся задачи
+    """
+    client = get_redis()
+    key = f"{INFLIGHT_PREFIX}{request_key}"
+
+    # Ключ может истечь между SET NX и GET, поэтому повторяем попытку
+    for _ in range(3):
+        if client.set(key, task_id, nx=True, ex=ttl):
+            return None
+
+        existing = client.get(key)
+        if existing is not None:
+            return existing
+
+    return None
+
+def release_inflight(request_key: str, task_id: str) -> bool:
+    """Снимает регистрацию запроса, если она принадлежит указанной задаче"""
+    client = get_redis()
+    released = client.eval(_RELEASE_SCRIPT, 1, f"{INFLIGHT_PREFIX}{request_key}", task_id)
+    return bool(released)
@@ -4,10 +4,14 @@ AI Agent Farm Configuration Module
 Централизованная конфигурация с переменными окружения
 """
 
+import logging
 import os
+from functools import lru_cache
 from typing import Optional
 from pydantic import BaseSettings
 
+logger = logging.getLogger(__name__)
+
 class Settings(BaseSettings):
     """Настройки приложения из переменных окружения"""
     
@@ -19,11 +23,66 @@ class Settings(BaseSettings):
     # 🗄️ Redis Configuration  
     redis_url: str = os.getenv("REDIS_URL", "redis://redis:6379/0")
     redis_max_connections: int = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+    sse_max_streams: int = int(os.getenv("SSE_MAX_STREAMS", "200"))
     
     # ⚙️ Celery Configuration
     celery_broker_url: str = os.getenv("CELERY_BROKER_URL", "redis://redis:6379/0") 
     celery_result_backend: str = os.getenv("CELERY_RESULT_BACKEND", "redis://redis:6379/0")
     celery_task_timeout: int = int(os.getenv("CELERY_TASK_TIMEOUT", "3600"))
+    research_fast_queue: str = os.getenv("RESEARCH_FAST_QUEUE", "research-fast")
+    research_heavy_queue: str = os.getenv("RESEARCH_HEAVY_QUEUE", "research-heavy")
+    request_coalescing_enabled: bool = os.getenv("REQUEST_COALESCING_ENABLED", "true").lower() == "true"
+    progress_min_interval: float = float(os.getenv("PROGRESS_MIN_INTERVAL", "2"))
+    crew_execution_mode: str = os.getenv("CREW_EXECUTION_MODE", "parallel")  # parallel | sequential
+    worker_warm_up: bool = os.getenv("WORKER_WARM_UP", "true").lower() == "true"
+
+    # 🗺️ Map-Reduce for comprehensive depth
+    map_reduce_enabled: bool = os.getenv("MAP_REDUCE_ENABLED", "true").lower() == "true"
+    map_reduce_max_subtopics: int = int(os.getenv("MAP_REDUCE_MAX_SUBTOPICS", "4"))
+    map_reduce_concurrency: int = int(os.getenv("MAP_REDUCE_CONCURRENCY", "3"))
+
+    # 📦 Completed Research Store
+    result_store_enabled: bool = os.getenv("RESULT_STORE_ENABLED", "true").lower() == "true"
+    result_freshness_window: int = int(os.getenv("RESULT_FRESHNESS_WINDOW", "86400"))
+    result_store_ttl: int = int(os.getenv("RESULT_STORE_TTL", "604800"))
+
+    # 📍 Crew Checkpoints (продолжение после повторной доставки задачи)
+    checkpoints_enabled: bool = os.getenv("CHECKPOINTS_ENABLED", "true").lower() == "true"
+    checkpoint_ttl: int = int(os.getenv("CHECKPOINT_TTL", "86400"))
+
+    # 📑 Report Sections (промежуточные результаты агентов)
+    sections_enabled: bool = os.getenv("SECTIONS_ENABLED", "true").lower() == "true"
+    sections_ttl: int = int(os.getenv("SECTIONS_TTL", "3600"))  # Продлевается каждым разделом; после SUCCESS разделы удаляются
+
+    # 🗃️ Report Blob Store
+    blob_store_enabled: bool = os.getenv("BLOB_STORE_ENABLED", "true").lower() == "true"
+    blob_store_dir: str = os.getenv("BLOB_STORE_DIR", "/code/data/blobs")
+    blob_store_threshold: int = int(os.getenv("BLOB_STORE_THRESHOLD", "16384"))
+    blob_store_max_age: int = int(os.getenv("BLOB_STORE_MAX_AGE", "691200"))
+
+    # 📚 Batch Research
+    batch_max_items: int = int(os.getenv("BATCH_MAX_ITEMS", "500"))
+    batch_ttl: int = int(os.getenv("BATCH_TTL", "604800"))
+    
+    # 🚦 Gemini Rate Limit (общий для всех воркеров)
+    llm_rate_limit_enabled: bool = os.getenv("LLM_RATE_LIMIT_ENABLED", "true").lower() == "true"
+    llm_requests_per_minute: int = int(os.getenv("LLM_REQUESTS_PER_MINUTE", "60"))
+    llm_tokens_per_minute: int = int(os.getenv("LLM_TOKENS_PER_MINUTE", "120000"))
+    
+    # ⏱️ LLM Deadlines & Hedging
+    llm_call_timeout: float = float(os.getenv("LLM_CALL_TIMEOUT", "120"))
+    llm_max_retries: int = int(os.getenv("LLM_MAX_RETRIES", "3"))
+    llm_hedging_enabled: bool = os.getenv("LLM_HEDGING_ENABLED", "true").lower() == "true"
+    llm_hedge_delay: float = float(os.getenv("LLM_HEDGE_DELAY", "30"))
+    
+    # 🔌 LLM Circuit Breaker (общий для всех воркеров)
+    circuit_breaker_enabled: bool = os.getenv("CIRCUIT_BREAKER_ENABLED", "true").lower() == "true"
+    circuit_error_threshold: float = float(os.getenv("CIRCUIT_ERROR_THRESHOLD", "0.5"))
+    circuit_slow_call_threshold: float = float(os.getenv("CIRCUIT_SLOW_CALL_THRESHOLD", "60"))
+    circuit_slow_call_rate: float = float(os.getenv("CIRCUIT_SLOW_CALL_RATE", "0.5"))
+    circuit_min_calls: int = int(os.getenv("CIRCUIT_MIN_CALLS", "10"))
+    circuit_window: int = int(os.getenv("CIRCUIT_WINDOW", "60"))
+    circuit_open_duration: float = float(os.getenv("CIRCUIT_OPEN_DURATION", "30"))
     
     # 🤖 AI API Keys
     google_api_key: Optional[str] = os.getenv("GOOGLE_API_KEY")
@@ -32,12 +91,36 @@ class Settings(BaseSettings):
     
     # 🧠 AI Model Configuration
     gemini_model: str = os.getenv("GEMINI_MODEL", "gemini-pro")
+    gemini_fallback_model: str = os.getenv("GEMINI_FALLBACK_MODEL", "")
+    # Маршрутизация моделей по агентам и глубине (пусто - GEMINI_MODEL)
+    model_routing_enabled: bool = os.getenv("MODEL_ROUTING_ENABLED", "true").lower() == "true"
+    gemini_fast_model: str = os.getenv("GEMINI_FAST_MODEL", "")
+    gemini_deep_model: str = os.getenv("GEMINI_DEEP_MODEL", "")
     gemini_temperature: float = float(os.getenv("GEMINI_TEMPERATURE", "0.1"))
     gemini_max_tokens: int = int(os.getenv("GEMINI_MAX_TOKENS", "8192"))
-    
+
+    # 💾 LLM Response Cache
+    llm_cache_enabled: bool = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    llm_cache_ttl: int = int(os.getenv("LLM_CACHE_TTL", "86400"))
+    llm_cache_max_entries: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+
+    # 🔍 Search Result Cache
+    search_cache_enabled: bool = os.getenv("SEARCH_CACHE_ENABLED", "true").lower() == "true"
+    search_cache_ttl: int = int(os.getenv("SEARCH_CACHE_TTL", "21600"))
+
+    # 🚥 Search Concurrency (общий семафор запросов к Serper, 0 - без ограничения)
+    search_max_concurrency: int = int(os.getenv("SEARCH_MAX_CONCURRENCY", "5"))
+    search_lease_ttl: float = float(os.getenv("SEARCH_LEASE_TTL", "30"))
+    search_queue_timeout: float = float(os.getenv("SEARCH_QUEUE_TIMEOUT", "120"))
+
     # 📊 Logging & Monitoring
     log_level: str = os.getenv("LOG_LEVEL", "INFO")
     enable_metrics: bool = os.getenv("ENABLE_METRICS", "false").lower() == "true"
+    task_index_enabled: bool = os.getenv("TASK_INDEX_ENABLED", "true").lower() == "true"
+    task_index_retention: int = int(os.getenv("TASK_INDEX_RETENTION", "86400"))
+    task_index_max_lag: float = float(os.getenv("TASK_INDEX_MAX_LAG", "10"))
+    heartbeat_interval: int = int(os.getenv("HEARTBEAT_INTERVAL", "10"))
+    health_cache_ttl: float = float(os.getenv("HEALTH_CACHE_TTL", "5"))
     
     # 🔒 Security Settings
     api_key_required: bool = os.getenv("API_KEY_REQUIRED", "false").lower() == "true"
@@ -68,9 +151,18 @@ def validate_required_settings():
     if errors:
         raise ValueError(f"Missing required configuration: {', '.join(errors)}")
 
-# Проверяем при импорте модуля
-try:
-    validate_required_settings()
-except ValueError as e:
-    print(f"⚠️  Configuration Warning: {e}")
-    print("💡 Please check your .env file and ensure all required API keys are set")
+@lru_cache(maxsize=None)
+def warn_missing_settings() -> bool:
+    """
+    Предупреждает об отсутствующих обязательных настройках (один раз на процесс)
+
+    Вызывается при первом создании LLM и инструментов, а не при импорте:
+    процессам без агентов (API, тесты) проверка не нужна.
+    """
+    try:
+        validate_required_settings()
+    except ValueError as e:
+        logger.warning(f"⚠️ Configuration Warning: {e}")
+        logger.warning("💡 Please check your .env file and ensure all required API keys are set")
+        return False
+    return True
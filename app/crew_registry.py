@@ -0,0 +1,178 @@
+"""
+AI Agent Farm - Crew Registry
+=============================
+Реестр команд, собранный один раз из декларативных определений
+(app.crew_definitions): поиск по crew_type за O(1), предкомпилированные
+шаблоны промптов и метаданные команд для API
+"""
+
+import inspect
+from dataclasses import dataclass
+from functools import lru_cache
+from string import Formatter
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.crew_definitions import CREW_DEFINITIONS, DEPTH_INSTRUCTIONS
+
+DEFAULT_CREW_TYPE = "general"
+
+# Классы моделей агентов (app.model_routing): fast - оформление и форматирование,
+# default - анализ (модель зависит от глубины исследования)
+MODEL_TIERS = ("fast", "default")
+
+# Значения, доступные в шаблонах задач
+TEMPLATE_FIELDS = {"topic", "topic_upper", "language", "depth", "depth_instruction"}
+
+def normalize_text(text: str) -> str:
+    """Убирает отступы многострочного текста из определения"""
+    return inspect.cleandoc(text)
+
+
+class PromptTemplate:
+    """
+    Шаблон промпта, разобранный при загрузке реестра
+
+    Разбор выполняется один раз; render() только склеивает готовые
+    фрагменты с подставленными значениями.
+    """
+
+    def __init__(self, template: str):
+        self.template = normalize_text(template)
+        self._parts: List[Tuple[str, Optional[str]]] = [
+            (literal, field) for literal, field, _, _ in Formatter().parse(self.template)
+        ]
+        self.fields = {field for _, field in self._parts if field is not None}
+
+        unknown = self.fields - TEMPLATE_FIELDS
+        if unknown:
+            raise ValueError(f"Unknown template fields: {sorted(unknown)}")
+
+    def render(self, values: Dict[str, str]) -> str:
+        return "".join(literal + (values[field] if field is not None else "") for literal, field in self._parts)
+
+
+@dataclass(frozen=True)
+class AgentSpec:
+    """Определение агента команды"""
+    role: str
+    goal: str
+    backstory: str
+    allow_delegation: bool = False
+    verbose: bool = True
+    model_tier: str = "default"
+
+
+@dataclass(frozen=True)
+class TaskSpec:
+    """Определение задачи команды"""
+    agent: int
+    description: PromptTemplate
+    expected_output: PromptTemplate
+
+
+@dataclass(frozen=True)
+class CrewSpec:
+    """Определение команды агентов"""
+    crew_type: str
+    category: str
+    agents: Tuple[AgentSpec, ...]
+    tasks: Tuple[TaskSpec, ...]
+    dependencies: Dict[int, List[int]]
+    tools: Tuple[str, ...]
+    verbose: Any
+    info: Dict[str, Any]
+
+    def render_tasks(self, topic: str, language: str, depth: str) -> List[Dict[str, Any]]:
+        """Подставляет параметры запроса в шаблоны задач"""
+        values = {
+            "topic": topic,
+            "topic_upper": topic.upper(),
+            "language": language,
+            "depth": depth,
+            "depth_instruction": DEPTH_INSTRUCTIONS.get(depth, DEPTH_INSTRUCTIONS["standard"])
+        }
+
+        return [
+            {
+                "agent": task.agent,
+                "description": task.description.render(values),
+                "expected_output": task.expected_output.render(values)
+            }
+            for task in self.tasks
+        ]
+
+
+def _build_spec(crew_type: str, definition: Dict[str, Any]) -> CrewSpec:
+    """Собирает CrewSpec из декларативного определения"""
+    agents = tuple(
+        AgentSpec(
+            role=agent["role"],
+            goal=agent["goal"],
+            backstory=normalize_text(agent["backstory"]),
+            allow_delegation=agent.get("allow_delegation", False),
+            verbose=agent.get("verbose", True),
+            model_tier=agent.get("model_tier", "default")
+        )
+        for agent in definition["agents"]
+    )
+    tasks = tuple(
+        TaskSpec(
+            agent=task["agent"],
+            description=PromptTemplate(task["description"]),
+            expected_output=PromptTemplate(task["expected_output"])
+        )
+        for task in definition["tasks"]
+    )
+
+    for agent in agents:
+        if agent.model_tier not in MODEL_TIERS:
+            raise ValueError(f"{crew_type}: unknown model tier {agent.model_tier!r} of {agent.role}")
+
+    for task in tasks:
+        if not 0 <= task.agent < len(agents):
+            raise ValueError(f"{crew_type}: task refers to missing agent {task.agent}")
+
+    # Метаданные для API: все поля определения, кроме исполняемой части
+    info = {
+        key: value for key, value in definition.items()
+        if key not in ("agents", "tasks", "dependencies", "tools", "verbose")
+    }
+    info["agents"] = [agent.role for agent in agents]
+
+    return CrewSpec(
+        crew_type=crew_type,
+        category=definition.get("category", "standard"),
+        agents=agents,
+        tasks=tasks,
+        dependencies=dict(definition.get("dependencies", {})),
+        tools=tuple(definition.get("tools", ())),
+        verbose=definition.get("verbose", True),
+        info=info
+    )
+
+@lru_cache(maxsize=None)
+def get_crew_registry() -> Dict[str, CrewSpec]:
+    """Реестр команд (собирается один раз на процесс)"""
+    return {
+        crew_type: _build_spec(crew_type, definition)
+        for crew_type, definition in CREW_DEFINITIONS.items()
+    }
+
+def get_crew_spec(crew_type: str) -> CrewSpec:
+    """Определение команды; неизвестный тип - универсальная команда"""
+    registry = get_crew_registry()
+    return registry.get(crew_type) or registry[DEFAULT_CREW_TYPE]
+
+def get_crew_types(category: Optional[str] = None) -> List[str]:
+    """Типы команд (все или одной категории) в порядке определения"""
+    return [
+        crew_type for crew_type, spec in get_crew_registry().items()
+        if category is None or spec.category == category
+    ]
+
+def get_crew_info(category: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """Метаданные команд для API (копии, их можно дополнять)"""
+    return {
+        crew_type: dict(get_crew_registry()[crew_type].info)
+        for crew_type in get_crew_types(category)
+    }
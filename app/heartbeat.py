@@ -0,0 +1,137 @@
+"""
+AI Agent Farm - Worker Heartbeats
+=================================
+Воркеры периодически записывают в Redis свое состояние (нагрузка, активные
+задачи, память); /health вычисляет статус по этим записям, не обращаясь
+к брокеру и воркерам
+"""
+
+import json
+import logging
+import os
+import resource
+import socket
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+from app.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_PREFIX = "heartbeat:"
+HEARTBEATS_KEY = "heartbeats"
+
+def _rss_bytes(pid: int) -> int:
+    """RSS процесса по /proc/<pid>/statm"""
+    with open(f"/proc/{pid}/statm") as statm:
+        return int(statm.read().split()[1]) * resource.getpagesize()
+
+def _children(pid: int) -> List[int]:
+    with open(f"/proc/{pid}/task/{pid}/children") as children:
+        return [int(child) for child in children.read().split()]
+
+def process_tree_memory_mb(pid: Optional[int] = None) -> float:
+    """
+    Память процесса воркера вместе с дочерними процессами пула, МБ
+
+    Без /proc (не Linux) - пиковая память текущего процесса.
+    """
+    pid = pid or os.getpid()
+    try:
+        total, pending = 0, [pid]
+        while pending:
+            current = pending.pop()
+            total += _rss_bytes(current)
+            pending.extend(_children(current))
+        return round(total / 1024 / 1024, 1)
+    except (OSError, ValueError):
+        # ru_maxrss в килобайтах (Linux)
+        return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+def write_heartbeat(hostname: str, active_tasks: int, concurrency: Optional[int] = None) -> Dict[str, Any]:
+    """Записывает heartbeat воркера: запись живет три интервала"""
+    now = time.time()
+    heartbeat = {
+        "hostname": hostname,
+        "timestamp": now,
+        "active_tasks": active_tasks,
+        "concurrency": concurrency,
+        "load": round(os.getloadavg()[0], 2),
+        "memory_mb": process_tree_memory_mb(),
+        "pid": os.getpid()
+    }
+
+    pipe = get_redis().pipeline()
+    pipe.set(f"{HEARTBEAT_PREFIX}{hostname}", json.dumps(heartbeat), ex=settings.heartbeat_interval * 3)
+    pipe.zadd(HEARTBEATS_KEY, {hostname: now})
+    pipe.execute()
+    return heartbeat
+
+def remove_heartbeat(hostname: str) -> None:
+    """Удаляет heartbeat остановленного воркера"""
+    pipe = get_redis().pipeline()
+    pipe.delete(f"{HEARTBEAT_PREFIX}{hostname}")
+    pipe.zrem(HEARTBEATS_KEY, hostname)
+    pipe.execute()
+
+def read_heartbeats(max_age: Optional[float] = None) -> List[Dict[str, Any]]:
+    """Heartbeats живых воркеров (не старше max_age секунд)"""
+    max_age = max_age or settings.heartbeat_interval * 3
+    client = get_redis()
+    now = time.time()
+
+    # Записи давно остановленных воркеров вычищаются при чтении
+    client.zremrangebyscore(HEARTBEATS_KEY, "-inf", now - 24 * 3600)
+    hostnames = client.zrangebyscore(HEARTBEATS_KEY, now - max_age, "+inf")
+    if not hostnames:
+        return []
+
+    payloads = client.mget([f"{HEARTBEAT_PREFIX}{hostname}" for hostname in hostnames])
+    return [json.loads(payload) for payload in payloads if payload]
+
+
+class HeartbeatThread(threading.Thread):
+    """Фоновый поток главного процесса воркера, записывающий heartbeats"""
+
+    def __init__(self, hostname: str, concurrency: Optional[int] = None):
+        super().__init__(name="heartbeat", daemon=True)
+        self.hostname = hostname
+        self.concurrency = concurrency
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        from celery.worker import state as worker_state
+
+        while not self._stopped.is_set():
+            try:
+                write_heartbeat(self.hostname, len(worker_state.active_requests), self.concurrency)
+            except Exception as e:
+                logger.warning(f"⚠️ Не удалось записать heartbeat {self.hostname}: {e}")
+            self._stopped.wait(settings.heartbeat_interval)
+
+    def stop(self) -> None:
+        self._stopped.set()
+        try:
+            remove_heartbeat(self.hostname)
+        except Exception as e:
+            logger.debug(f"Не удалось удалить heartbeat {self.hostname}: {e}")
+
+
+_heartbeat_thread: Optional[HeartbeatThread] = None
+
+def start_heartbeat(hostname: Optional[str] = None, concurrency: Optional[int] = None) -> HeartbeatThread:
+    """Запускает поток heartbeats (один на процесс)"""
+    global _heartbeat_thread
+    if _heartbeat_thread is None or not _heartbeat_thread.is_alive():
+        _heartbeat_thread = HeartbeatThread(hostname or socket.gethostname(), concurrency)
+        _heartbeat_thread.start()
+    return _heartbeat_thread
+
+def stop_heartbeat() -> None:
+    """Останавливает поток heartbeats и удаляет запись воркера"""
+    global _heartbeat_thread
+    if _heartbeat_thread is not None:
+        _heartbeat_thread.stop()
+        _heartbeat_thread = None
@@ -0,0 +1,432 @@
+"""
+AI Agent Farm - Resilient LLM Calls
+===================================
+Вызовы Gemini с дедлайном, хеджированием и повторами:
+
+- дедлайн вызова: не больше LLM_CALL_TIMEOUT и не дальше оставшегося
+  бюджета задачи (мягкий лимит времени Celery); отсчитывается с отправки
+  запроса - ожидание квоты лимитера в дедлайн и задержку не входит;
+- запрос к Gemini получает таймаут по дедлайну попытки, поэтому брошенная
+  попытка не занимает поток пула дольше дедлайна;
+- хеджирование: если ответа нет дольше p95 задержки фермы, отправляется
+  дублирующий запрос, используется первый ответ;
+- повторы временных ошибок с экспоненциальной задержкой и полным jitter;
+  повтор после дедлайна начинается только после завершения брошенной попытки.
+
+Каждый повтор, хедж и превышение дедлайна учитываются в Redis.
+"""
+
+import functools
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import redis
+
+from app.config import settings
+from app.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+STATS_KEY = "llm-stats:gemini"
+LATENCY_KEY = f"{STATS_KEY}:latency"
+
+# Сколько последних задержек хранится для перцентилей
+LATENCY_SAMPLES = 1000
+
+# p95 для задержки хеджа считается не меньше чем по стольким вызовам
+MIN_HEDGE_SAMPLES = 20
+MIN_HEDGE_DELAY = 1.0
+HEDGE_DELAY_REFRESH = 60
+
+# Пауза перед повторной проверкой квоты для отложенного хеджа
+HEDGE_RECHECK = 1.0
+
+# Как часто проверяется, дождалась ли попытка квоты лимитера
+WAIT_RECHECK = 1.0
+
+# Брошенная по дедлайну попытка завершается по таймауту запроса; столько
+# секунд сверх него повтор ждет ее завершения
+ABANDONED_GRACE = 5.0
+
+MIN_REQUEST_TIMEOUT = 1.0
+
+# Экспоненциальная задержка повторов: base * 2^attempt, не больше MAX_BACKOFF
+BACKOFF_BASE = 1.0
+MAX_BACKOFF = 30.0
+
+# Временные ошибки Gemini (google.api_core.exceptions) по имени класса:
+# клиент импортируется только в воркере
+TRANSIENT_ERRORS = {
+    "ResourceExhausted", "TooManyRequests", "ServiceUnavailable",
+    "InternalServerError", "DeadlineExceeded", "GatewayTimeout", "BadGateway"
+}
+
+
+class LLMDeadlineExceeded(TimeoutError):
+    """Ответ LLM не получен до дедлайна вызова"""
+
+    def __init__(self, message: str, abandoned=()):
+        super().__init__(message)
+        # Незавершенные попытки (futures), брошенные по дедлайну
+        self.abandoned = set(abandoned)
+
+
+def is_transient(exc: BaseException) -> bool:
+    """Ошибку имеет смысл повторить"""
+    return isinstance(exc, (TimeoutError, ConnectionError)) or type(exc).__name__ in TRANSIENT_ERRORS
+
+
+# Абсолютный дедлайн задачи, выполняемой процессом (time.time());
+# общий для потоков map-reduce
+_task_deadline: Optional[float] = None
+
+@contextmanager
+def task_deadline(deadline: float) -> Iterator[None]:
+    """Ограничивает вызовы LLM оставшимся бюджетом задачи"""
+    global _task_deadline
+    _task_deadline = deadline
+    try:
+        yield
+    finally:
+        _task_deadline = None
+
+def call_timeout() -> float:
+    """
+    Дедлайн очередного вызова в секундах
+
+    Raises:
+        LLMDeadlineExceeded: бюджет задачи исчерпан
+    """
+    timeout = settings.llm_call_timeout
+    if _task_deadline is not None:
+        remaining = _task_deadline - time.time()
+        if remaining <= 0:
+            raise LLMDeadlineExceeded("Бюджет времени задачи исчерпан")
+        timeout = min(timeout, remaining)
+    return timeout
+
+def budget_end() -> float:
+    """Конец бюджета задачи по time.monotonic() (inf без дедлайна задачи)"""
+    if _task_deadline is None:
+        return float("inf")
+    return time.monotonic() + _task_deadline - time.time()
+
+
+class Attempt:
+    """
+    Попытка вызова LLM в потоке пула
+
+    Дедлайн и задержка отсчитываются с отправки запроса: пока попытка ждет
+    квоту лимитера (quota_wait), ее ограничивает только бюджет задачи.
+    """
+
+    def __init__(self, timeout: float, budget_end: float, hedge: bool = False):
+        self.timeout = timeout
+        self.budget_end = budget_end
+        self.hedge = hedge
+        self.started = time.monotonic()
+        self.finished: Optional[float] = None
+        self.waiting = False
+
+    def deadline(self) -> float:
+        if self.waiting:
+            return self.budget_end
+        return min(self.started + self.timeout, self.budget_end)
+
+    def remaining(self) -> float:
+        return max(0.0, self.deadline() - time.monotonic())
+
+    @property
+    def latency(self) -> float:
+        return (self.finished or time.monotonic()) - self.started
+
+
+# Попытка, выполняемая текущим потоком пула
+_current = threading.local()
+
+def current_attempt() -> Optional[Attempt]:
+    return getattr(_current, "attempt", None)
+
+def run_attempt(call, attempt: Attempt):
+    """Выполняет call в потоке пула как попытку attempt"""
+    _current.attempt = attempt
+    try:
+        return call()
+    finally:
+        attempt.finished = time.monotonic()
+        _current.attempt = None
+
+@contextmanager
+def quota_wait() -> Iterator[None]:
+    """Ожидание квоты лимитера: не входит в дедлайн и задержку текущей попытки"""
+    attempt = current_attempt()
+    if attempt is None:
+        yield
+        return
+
+    attempt.waiting = True
+    try:
+        yield
+    finally:
+        attempt.started = time.monotonic()
+        attempt.waiting = False
+
+def request_timeout() -> float:
+    """Таймаут запроса к провайдеру: остаток дедлайна текущей попытки"""
+    attempt = current_attempt()
+    if attempt is None:
+        return call_timeout()
+    return max(attempt.remaining(), MIN_REQUEST_TIMEOUT)
+
+
+def record(**counters: int) -> None:
+    """Увеличивает счетчики вызовов LLM"""
+    try:
+        pipe = get_redis().pipeline()
+        for field, value in counters.items():
+            pipe.hincrby(STATS_KEY, field, value)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.debug(f"Не удалось обновить статистику LLM: {e}")
+
+def record_latency(latency: float) -> None:
+    try:
+        pipe = get_redis().pipeline()
+        pipe.lpush(LATENCY_KEY, round(latency, 3))
+        pipe.ltrim(LATENCY_KEY, 0, LATENCY_SAMPLES - 1)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.debug(f"Не удалось сохранить задержку LLM: {e}")
+
+def latency_percentiles() -> Dict[str, float]:
+    """p50/p95/p99 задержки последних вызовов всех воркеров"""
+    samples = sorted(float(sample) for sample in get_redis().lrange(LATENCY_KEY, 0, -1))
+    if not samples:
+        return {"samples": 0}
+
+    percentiles = {
+        name: samples[min(len(samples) - 1, int(len(samples) * fraction))]
+        for name, fraction in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))
+    }
+    percentiles["samples"] = len(samples)
+    return percentiles
+
+
+# Задержка хеджа процесса: (значение, время обновления)
+_hedge_delay: Optional[Tuple[float, float]] = None
+
+def hedge_delay() -> float:
+    """Задержка перед хеджем: p95 задержки фермы, пока выборка мала - LLM_HEDGE_DELAY"""
+    global _hedge_delay
+    if _hedge_delay is not None and time.monotonic() - _hedge_delay[1] < HEDGE_DELAY_REFRESH:
+        return _hedge_delay[0]
+
+    delay = settings.llm_hedge_delay
+    try:
+        percentiles = latency_percentiles()
+        if percentiles.get("samples", 0) >= MIN_HEDGE_SAMPLES:
+            delay = max(MIN_HEDGE_DELAY, percentiles["p95"])
+    except redis.RedisError as e:
+        logger.debug(f"Задержки LLM недоступны: {e}")
+
+    _hedge_delay = (delay, time.monotonic())
+    return delay
+
+
+# Пул потоков вызовов LLM создается по PID: после fork потоки не наследуются
+_executors: Dict[int, ThreadPoolExecutor] = {}
+
+def get_executor() -> ThreadPoolExecutor:
+    pid = os.getpid()
+    executor = _executors.get(pid)
+    if executor is None:
+        executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="llm-call")
+        _executors.clear()
+        _executors[pid] = executor
+    return executor
+
+
+def quota_available() -> bool:
+    """Хедж не отправляется, пока запросы ждут квоту: дубликат только удлинит очередь"""
+    from app.rate_limit import get_rate_limiter
+
+    limiter = get_rate_limiter()
+    if limiter is None:
+        return True
+    try:
+        return limiter.current_wait() == 0
+    except redis.RedisError:
+        return True
+
+
+def hedged_call(call, timeout: float, delay: Optional[float]):
+    """
+    Выполняет call с дедлайном; через delay секунд без ответа - дублирующий вызов
+
+    Дедлайн и задержка хеджа отсчитываются с отправки запроса первой попытки.
+
+    Returns:
+        (результат, выигравшая попытка)
+
+    Raises:
+        LLMDeadlineExceeded: незавершенные попытки - в abandoned
+    """
+    executor = get_executor()
+    primary = Attempt(timeout, budget_end())
+    attempts = {executor.submit(run_attempt, call, primary): primary}
+    pending = set(attempts)
+    hedge = None
+    hedge_not_before = 0.0
+    errors = []
+
+    while pending:
+        now = time.monotonic()
+        deadline = primary.deadline()
+        if now >= deadline:
+            raise LLMDeadlineExceeded(f"Нет ответа LLM за {timeout:.0f}с", abandoned=pending)
+
+        hedge_at = float("inf")
+        if hedge is None and delay is not None and not primary.waiting:
+            hedge_at = max(primary.started + delay, hedge_not_before)
+
+        wake_at = min(deadline, hedge_at)
+        if primary.waiting:
+            wake_at = min(wake_at, now + WAIT_RECHECK)
+        done, pending = wait(pending, timeout=max(0.0, wake_at - now), return_when=FIRST_COMPLETED)
+
+        for future in done:
+            if future.exception() is None:
+                return future.result(), attempts[future]
+            errors.append(future.exception())
+
+        if pending and time.monotonic() >= hedge_at:
+            if quota_available():
+                logger.info(f"🔀 Ответа LLM нет {delay:.1f}с, отправлен дублирующий запрос")
+                record(hedges=1)
+                hedge = Attempt(primary.remaining(), primary.budget_end, hedge=True)
+                future = executor.submit(run_attempt, call, hedge)
+                attempts[future] = hedge
+                pending.add(future)
+            else:
+                hedge_not_before = time.monotonic() + HEDGE_RECHECK
+
+    raise errors[-1]
+
+
+def wait_abandoned(futures) -> bool:
+    """
+    Ждет завершения попыток, брошенных по дедлайну
+
+    Их запросы ограничены таймаутом попытки, поэтому ожидание короткое.
+
+    Returns:
+        True, если все попытки завершились
+    """
+    if not futures:
+        return True
+
+    _, not_done = wait(futures, timeout=ABANDONED_GRACE)
+    if not_done:
+        logger.warning(f"⏳ Брошенный запрос к LLM не завершился за {ABANDONED_GRACE:.0f}с после дедлайна")
+    return not not_done
+
+
+def call_llm(call):
+    """Вызов LLM с дедлайном, хеджированием и повторами временных ошибок"""
+    max_retries = settings.llm_max_retries
+
+    for attempt in range(max_retries + 1):
+        timeout = call_timeout()
+        delay = hedge_delay() if settings.llm_hedging_enabled else None
+
+        try:
+            result, winner = hedged_call(call, timeout, delay)
+        except Exception as exc:
+            if isinstance(exc, LLMDeadlineExceeded):
+                record(deadline_exceeded=1)
+            if not is_transient(exc) or attempt == max_retries:
+                record(calls=1, failures=1)
+                raise
+
+            # Повтор не отправляется, пока брошенный запрос еще выполняется
+            if isinstance(exc, LLMDeadlineExceeded) and not wait_abandoned(exc.abandoned):
+                record(calls=1, failures=1)
+                raise
+
+            backoff = random.uniform(0, min(MAX_BACKOFF, BACKOFF_BASE * 2 ** attempt))
+            if _task_deadline is not None and time.time() + backoff >= _task_deadline:
+                record(calls=1, failures=1)
+                raise
+            logger.warning(f"🔁 Ошибка LLM ({type(exc).__name__}: {exc}), повтор {attempt + 1}/{max_retries} через {backoff:.1f}с")
+            record(retries=1)
+            time.sleep(backoff)
+            continue
+
+        record(calls=1, hedge_wins=int(winner.hedge))
+        record_latency(winner.latency)
+        if delay is not None and winner.latency > delay:
+            logger.warning(f"🐢 Медленный ответ LLM: {winner.latency:.1f}с (порог хеджа {delay:.1f}с)")
+        return result
+
+
+def llm_stats() -> Dict[str, Any]:
+    """Счетчики вызовов, повторов и хеджей и перцентили задержки"""
+    counters = {field: int(value) for field, value in get_redis().hgetall(STATS_KEY).items()}
+    return {
+        "counters": counters,
+        "latency": latency_percentiles(),
+        "hedging_enabled": settings.llm_hedging_enabled,
+        "hedge_delay": hedge_delay()
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def resilient(chat_model_class):
+    """Подкласс чат-модели, вызовы API которой идут через call_llm"""
+
+    class ResilientChatModel(chat_model_class):
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+            parent = super()._generate
+            return call_llm(lambda: parent(messages, stop=stop, run_manager=run_manager, **kwargs))
+
+    ResilientChatModel.__name__ = f"Resilient{chat_model_class.__name__}"
+    return ResilientChatModel
+
+
+@functools.lru_cache(maxsize=None)
+def single_request(chat_model_class):
+    """
+    Подкласс ChatGoogleGenerativeAI: один запрос к API с таймаутом попытки
+
+    Клиент langchain-google-genai 1.0.x сам повторяет ошибки API (tenacity,
+    до 10 попыток) и не передает таймаут в запрос чата: брошенная по дедлайну
+    попытка занимала бы поток пула еще минуты. Запрос отправляется через
+    GenerativeModel.generate_content с таймаутом request_timeout() и без
+    повторов клиента - повторяет call_llm.
+    """
+
+    class SingleRequestChatModel(chat_model_class):
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+            from google.generativeai.types import content_types
+            from langchain_google_genai.chat_models import _response_to_result
+
+            params, chat, message = self._prepare_chat(messages, stop=stop, **kwargs)
+            content = content_types.to_content(message)
+            if not content.role:
+                content.role = "user"
+
+            response = chat.model.generate_content(
+                contents=[*chat.history, content],
+                **params,
+                request_options={"timeout": request_timeout(), "retry": None}
+            )
+            return _response_to_result(response)
+
+    SingleRequestChatModel.__name__ = f"SingleRequest{chat_model_class.__name__}"
+    return SingleRequestChatModel
@@ -0,0 +1,206 @@
+"""
+AI Agent Farm - Map-Reduce Research
+===================================
+Comprehensive-исследование: планировщик делит тему на подтемы,
+подтемы исследуются параллельно, итоговый агент команды сводит результаты
+"""
+
+import json
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Optional
+
+from crewai import Crew, Process, Task
+
+from app import main_crew
+from app.cache import search_scope
+from app.cancellation import TaskCancelled, check_cancelled
+from app.checkpoints import load_checkpoints, save_checkpoint
+from app.config import settings
+from app.model_routing import SYNTHESIS_TIER, select_model
+from app.sections import save_section
+
+logger = logging.getLogger(__name__)
+
+# Ключ контрольной точки плана подтем
+PLAN_CHECKPOINT = "plan"
+
+# Нумерация и маркеры списков в ответе планировщика: "1.", "2)", "-", "*", "•"
+_LIST_MARKER = re.compile(r"^\s*(?:\d+[.)]|[-*•])\s*")
+
+def parse_subtopics(text: str, limit: int) -> List[str]:
+    """Извлекает подтемы из ответа планировщика (по одной на строку)"""
+    subtopics = []
+    seen = set()
+
+    for line in text.splitlines():
+        subtopic = _LIST_MARKER.sub("", line).strip().strip('"')
+        if not subtopic or subtopic.casefold() in seen:
+            continue
+        seen.add(subtopic.casefold())
+        subtopics.append(subtopic)
+        if len(subtopics) >= limit:
+            break
+
+    return subtopics
+
+def plan_subtopics(topic: str, crew_type: str, language: str, limit: Optional[int] = None) -> List[str]:
+    """
+    Разбивает тему на независимые подтемы одним запросом к LLM
+
+    Если планировщик не вернул ни одной подтемы, исследуется исходная тема.
+    """
+    limit = limit or settings.map_reduce_max_subtopics
+    prompt = f"""
+    Разбейте тему исследования на {limit} независимых подтем для параллельного анализа.
+    Тема: {topic}
+    Тип исследования: {crew_type}
+
+    Подтемы не должны пересекаться и вместе должны покрывать тему целиком.
+    Ответ: только список подтем, по одной на строку, без пояснений. Язык: {language}
+    """
+
+    response = main_crew.get_llm(select_model(SYNTHESIS_TIER, "comprehensive")).invoke(prompt)
+    subtopics = parse_subtopics(getattr(response, "content", str(response)), limit)
+
+    return subtopics or [topic]
+
+def research_subtopic(subtopic: str, topic: str, crew_type: str, language: str) -> str:
+    """Map: исследование одной подтемы исследователем команды"""
+    researcher = main_crew.create_agent(crew_type, 0, "comprehensive")
+    task = Task(
+        description=f"""
+        Проведите детальный анализ подтемы "{subtopic}" в рамках исследования: {topic}
+
+        Ваша задача:
+        1. Найдите актуальные факты, данные и источники по подтеме
+        2. Выделите ключевые тренды и игроков
+        3. Сформулируйте выводы, важные для общей темы
+
+        Результат на языке: {language}
+        """,
+        agent=researcher,
+        expected_output=f"Структурированные выводы по подтеме: {subtopic}"
+    )
+
+    crew = Crew(agents=[researcher], tasks=[task], process=Process.sequential, verbose=True)
+    return str(crew.kickoff())
+
+def reduce_findings(topic: str, crew_type: str, language: str, findings: List[tuple]) -> str:
+    """
+    Reduce: итоговый агент команды сводит результаты подтем в отчет
+
+    Сведение - аналитическая работа: агент получает модель класса default,
+    даже если в команде он агент оформления.
+    """
+    synthesizer = main_crew.create_agent(crew_type, -1, "comprehensive", model_tier=SYNTHESIS_TIER)
+    sections = "\n\n".join(f"### {subtopic}\n{result}" for subtopic, result in findings)
+    task = Task(
+        description=f"""
+        Подготовьте исчерпывающий итоговый отчет по теме: {topic}
+
+        Используйте результаты параллельного исследования подтем:
+
+        {sections}
+
+        Ваша задача:
+        1. Объедините выводы, устранив повторы и противоречия
+        2. Выделите сквозные тренды и взаимосвязи между подтемами
+        3. Сформулируйте итоговые выводы и рекомендации
+
+        Результат на языке: {language}
+        """,
+        agent=synthesizer,
+        expected_output="Итоговый отчет, объединяющий исследование всех подтем"
+    )
+
+    crew = Crew(agents=[synthesizer], tasks=[task], process=Process.sequential, verbose=True)
+    return str(crew.kickoff())
+
+def subtopic_checkpoint_key(subtopic: str) -> str:
+    """Ключ контрольной точки подтемы"""
+    return f"subtopic:{subtopic}"
+
+def run_map_reduce_research(topic: str, crew_type: str = "general", language: str = "ru", progress=None,
+                            task_id: Optional[str] = None) -> str:
+    """
+    Запускает comprehensive-исследование в режиме map-reduce
+
+    Подтемы исследуются в пуле потоков размером settings.map_reduce_concurrency;
+    ошибка отдельной подтемы не прерывает исследование, если остальные успешны.
+    При отмене TaskCancelled содержит уже исследованные подтемы.
+    С task_id план и результаты подтем сохраняются как контрольные точки
+    (повторный запуск исследует только оставшиеся подтемы), а результаты
+    подтем публикуются как разделы отчета.
+    """
+    logger.info(f"🗺️ Map-reduce исследование: {topic} (тип: {crew_type})")
+
+    def report(current: int, status: str, **extra) -> None:
+        if progress is not None:
+            progress({'current': current, 'total': 100, 'status': status, **extra}, force=True)
+
+    checkpoints_enabled = task_id is not None and settings.checkpoints_enabled
+    saved = load_checkpoints(task_id) if checkpoints_enabled else {}
+    subtopics = []
+    findings = {}
+
+    def ordered_findings() -> List[tuple]:
+        return [(subtopic, findings[subtopic]) for subtopic in subtopics if subtopic in findings]
+
+    try:
+        with search_scope():
+            if PLAN_CHECKPOINT in saved:
+                subtopics = json.loads(saved[PLAN_CHECKPOINT])
+                findings = {
+                    subtopic: saved[subtopic_checkpoint_key(subtopic)]
+                    for subtopic in subtopics if subtopic_checkpoint_key(subtopic) in saved
+                }
+                logger.info(f"♻️ Продолжение задачи {task_id}: исследовано {len(findings)}/{len(subtopics)} подтем")
+            else:
+                subtopics = plan_subtopics(topic, crew_type, language)
+                if checkpoints_enabled:
+                    save_checkpoint(task_id, PLAN_CHECKPOINT, json.dumps(subtopics, ensure_ascii=False))
+            logger.info(f"📋 Подтемы ({len(subtopics)}): {subtopics}")
+            report(30, f'Исследование {len(subtopics)} подтем...', subtopics=subtopics)
+
+            with ThreadPoolExecutor(max_workers=max(settings.map_reduce_concurrency, 1)) as executor:
+                futures = {
+                    executor.submit(research_subtopic, subtopic, topic, crew_type, language): subtopic
+                    for subtopic in subtopics if subtopic not in findings
+                }
+                for future in as_completed(futures):
+                    subtopic = futures[future]
+                    try:
+                        findings[subtopic] = future.result()
+                        if checkpoints_enabled:
+                            save_checkpoint(task_id, subtopic_checkpoint_key(subtopic), findings[subtopic])
+                        if task_id is not None and settings.sections_enabled:
+                            save_section(task_id, subtopics.index(subtopic), subtopic, findings[subtopic])
+                    except TaskCancelled:
+                        # Еще не начатые подтемы не запускаются, начатые остановятся на контрольной точке
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        raise
+                    except Exception as e:
+                        logger.warning(f"⚠️ Подтема '{subtopic}' не исследована: {e}")
+                        continue
+
+                    done = len(findings)
+                    report(
+                        30 + int(50 * done / len(subtopics)),
+                        f'Подтема исследована: {subtopic} ({done}/{len(subtopics)})'
+                    )
+
+            if not findings:
+                raise RuntimeError(f"Не удалось исследовать ни одной подтемы по теме: {topic}")
+
+            check_cancelled()
+            report(85, 'Сведение результатов подтем...')
+            result = reduce_findings(topic, crew_type, language, ordered_findings())
+
+    except TaskCancelled as exc:
+        exc.partial_output = "\n\n".join(f"### {subtopic}\n{finding}" for subtopic, finding in ordered_findings())
+        raise
+
+    logger.info(f"✅ Map-reduce исследование завершено: {len(findings)}/{len(subtopics)} подтем")
+    return result
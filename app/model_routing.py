@@ -0,0 +1,84 @@
+"""
+AI Agent Farm - Model Routing
+=============================
+Выбор модели Gemini для агента по его классу (model_tier из определения
+команды) и глубине исследования:
+
+- basic и агенты оформления (fast) - GEMINI_FAST_MODEL;
+- аналитические агенты comprehensive-исследования - GEMINI_DEEP_MODEL;
+- остальные - GEMINI_MODEL.
+
+Незаданная модель класса заменяется на GEMINI_MODEL.
+
+В map-reduce исследовании планировщик и агент, сводящий подтемы, выполняют
+анализ: они получают модель класса default (SYNTHESIS_TIER), даже если
+последний агент команды - агент оформления.
+"""
+
+from typing import Dict, List
+
+from app.config import settings
+from app.crew_registry import get_crew_spec
+
+# Класс модели планировщика и сведения подтем map-reduce
+SYNTHESIS_TIER = "default"
+
+# Записи карты моделей результата, не являющиеся агентами команды
+PLANNER_ROLE = "Планировщик подтем"
+FALLBACK_ROLE = "Резервная модель"
+
+
+def select_model(model_tier: str, depth: str) -> str:
+    """Модель для агента класса model_tier при глубине depth"""
+    if not settings.model_routing_enabled:
+        return settings.gemini_model
+
+    if model_tier == "fast" or depth == "basic":
+        return settings.gemini_fast_model or settings.gemini_model
+    if depth == "comprehensive":
+        return settings.gemini_deep_model or settings.gemini_model
+    return settings.gemini_model
+
+def uses_map_reduce(crew_type: str, depth: str) -> bool:
+    """
+    Исследование выполняется в режиме map-reduce
+
+    Только comprehensive-исследование стандартных команд: showcase команды
+    принимают не тему, а компанию, репозиторий или тикер.
+    """
+    return (
+        depth == "comprehensive"
+        and settings.map_reduce_enabled
+        and get_crew_spec(crew_type).category == "standard"
+    )
+
+def routed_models() -> List[str]:
+    """Модели, между которыми распределяются агенты (у каждой своя цепь предохранителя)"""
+    return sorted({
+        select_model(model_tier, depth)
+        for model_tier in ("default", "fast")
+        for depth in ("basic", "standard", "comprehensive")
+    })
+
+def agent_models(crew_type: str, depth: str) -> Dict[str, str]:
+    """
+    Модели исследования (роль -> модель) для результата задачи
+
+    В map-reduce выполняются только исследователь подтем, планировщик
+    и агент, сводящий подтемы: остальные агенты команды не запускаются.
+    Резервная модель указывается, только если она задана.
+    """
+    agents = get_crew_spec(crew_type).agents
+
+    if uses_map_reduce(crew_type, depth):
+        models = {
+            agents[0].role: select_model(agents[0].model_tier, depth),
+            PLANNER_ROLE: select_model(SYNTHESIS_TIER, depth),
+            agents[-1].role: select_model(SYNTHESIS_TIER, depth)
+        }
+    else:
+        models = {agent.role: select_model(agent.model_tier, depth) for agent in agents}
+
+    if settings.gemini_fallback_model:
+        models[FALLBACK_ROLE] = settings.gemini_fallback_model
+    return models
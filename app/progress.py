@@ -0,0 +1,177 @@
+"""
+AI Agent Farm - Task Progress Events
+====================================
+Прогресс задач: события из callbacks CrewAI и их публикация через Redis pub/sub
+"""
+
+import json
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import redis
+
+from app.redis_client import get_redis
+from app.task_state import format_task_error
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_CHANNEL_PREFIX = "task-progress:"
+
+# Состояния, после которых событий по задаче больше не будет
+TERMINAL_STATES = {"SUCCESS", "FAILURE", "REVOKED"}
+
+def progress_channel(task_id: str) -> str:
+    """Имя pub/sub канала событий задачи"""
+    return f"{PROGRESS_CHANNEL_PREFIX}{task_id}"
+
+def build_event(task_id: str, state: str, meta: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Формирует событие прогресса в формате SSE-стрима"""
+    meta = meta or {}
+    progress = meta.get("current", 100 if state == "SUCCESS" else 0)
+
+    return {
+        "task_id": task_id,
+        "state": state,
+        "progress": progress,
+        "status": meta.get("status"),
+        "meta": meta,
+        "timestamp": time.time()
+    }
+
+def publish_progress(task_id: str, state: str, meta: Optional[Dict[str, Any]] = None) -> None:
+    """Публикует событие прогресса задачи (ошибки Redis не прерывают задачу)"""
+    event = build_event(task_id, state, meta)
+
+    try:
+        get_redis().publish(progress_channel(task_id), json.dumps(event, ensure_ascii=False))
+    except redis.RedisError as e:
+        logger.debug(f"Не удалось опубликовать прогресс задачи {task_id}: {e}")
+
+def event_from_meta(task_id: str, meta: Dict[str, Any]) -> Dict[str, Any]:
+    """Строит событие из метаданных result backend (включая результат для завершенных задач)"""
+    state = meta.get("status", "PENDING")
+    info = meta.get("result")
+    event = build_event(task_id, state, info if isinstance(info, dict) and state == "PROGRESS" else None)
+
+    if state == "SUCCESS":
+        event["result"] = info
+    elif state == "REVOKED" and isinstance(info, dict) and info.get("status") == "cancelled":
+        event["result"] = info
+    elif state == "FAILURE":
+        event["error"] = format_task_error(meta)
+
+    return event
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """Сериализует событие в формат text/event-stream"""
+    data = json.dumps(event, ensure_ascii=False)
+    return f"event: {event['state'].lower()}\ndata: {data}\n\n"
+
+
+class CrewProgressTracker:
+    """
+    Преобразует callbacks CrewAI в события прогресса
+
+    step_callback вызывается после каждого шага агента (мысль, вызов
+    инструмента), task_callback - после завершения задачи. Прогресс
+    распределяется между задачами команды в диапазоне [start, end].
+    """
+
+    def __init__(self, sink, tasks: list, start: int = 25, end: int = 90):
+        self.sink = sink
+        self.start = start
+        self.end = end
+        self.total_tasks = max(len(tasks), 1)
+        self.completed_tasks = 0
+        self.steps_since_completion = 0
+        self.timings = []
+        self._task_roles = {task.description: task.agent.role for task in tasks}
+        self._task_index = {task.description: index for index, task in enumerate(tasks)}
+        self._last_completed_at = time.time()
+        self._lock = threading.Lock()
+
+    def _percent(self) -> int:
+        # Каждый шаг продвигает текущую задачу на 10%, но не дальше 90% ее доли
+        partial = min(self.steps_since_completion * 0.1, 0.9)
+        fraction = min((self.completed_tasks + partial) / self.total_tasks, 1.0)
+        return int(self.start + (self.end - self.start) * fraction)
+
+    def step_callback_for(self, role: str):
+        """Возвращает step_callback для агента с указанной ролью"""
+        def on_step(step_output):
+            with self._lock:
+                self.steps_since_completion += 1
+                meta = {
+                    'current': self._percent(),
+                    'total': 100,
+                    'status': f'{role}: шаг {self.steps_since_completion}',
+                    'agent': role,
+                    'tool': _step_tool_name(step_output),
+                    'tasks_completed': self.completed_tasks,
+                    'tasks_total': self.total_tasks
+                }
+            self.sink(meta)
+        return on_step
+
+    def on_task_complete(self, task_output) -> None:
+        """task_callback команды: фиксирует время выполнения задачи"""
+        now = time.time()
+        description = getattr(task_output, "description", "")
+        role = self._task_roles.get(description)
+
+        with self._lock:
+            self.completed_tasks += 1
+            self.timings.append({
+                'task_index': self._task_index.get(description),
+                'agent': role,
+                'duration': round(now - self._last_completed_at, 2),
+                'steps': self.steps_since_completion
+            })
+            self.steps_since_completion = 0
+            self._last_completed_at = now
+            meta = {
+                'current': self._percent(),
+                'total': 100,
+                'status': f'{role or "Агент"}: задача завершена ({self.completed_tasks}/{self.total_tasks})',
+                'agent': role,
+                'tasks_completed': self.completed_tasks,
+                'tasks_total': self.total_tasks,
+                'timings': list(self.timings)
+            }
+        self.sink(meta, force=True)
+
+
+def _step_tool_name(step_output) -> Optional[str]:
+    """Имя инструмента из шага агента (AgentAction или список (action, observation))"""
+    if isinstance(step_output, list) and step_output:
+        step_output = step_output[0]
+        if isinstance(step_output, tuple):
+            step_output = step_output[0]
+    return getattr(step_output, "tool", None)
+
+
+class ProgressThrottle:
+    """
+    Ограничивает частоту записи прогресса в result backend
+
+    last накапливает все поля последних событий (в т.ч. timings),
+    даже если само событие было пропущено.
+    """
+
+    def __init__(self, sink, min_interval: float):
+        self.sink = sink
+        self.min_interval = min_interval
+        self.last = {}
+        self._last_sent = 0.0
+        self._lock = threading.Lock()
+
+    def __call__(self, meta: Dict[str, Any], force: bool = False) -> None:
+        with self._lock:
+            self.last.update(meta)
+            now = time.monotonic()
+            if not force and now - self._last_sent < self.min_interval:
+                return
+            self._last_sent = now
+        self.sink(meta)
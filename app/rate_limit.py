@@ -0,0 +1,219 @@
+"""
+AI Agent Farm - Gemini Rate Limiter
+===================================
+Общий для всех воркеров лимит запросов к Gemini: token bucket в Redis
+одновременно по запросам в минуту и токенам в минуту. Вызов LLM ждет
+свободной квоты вместо 429 и повторных попыток.
+"""
+
+import functools
+import logging
+import random
+import time
+from typing import Any, Dict, Optional
+
+import redis
+
+from app.cancellation import check_cancelled
+from app.config import settings
+from app.llm_resilience import quota_wait
+from app.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_PREFIX = "rate-limit:"
+STATS_KEY_PREFIX = "rate-limit-stats:"
+
+# Средняя длина токена Gemini в символах (оценка без запроса countTokens)
+CHARS_PER_TOKEN = 4
+
+# Максимальная пауза между попытками: квота могла освободиться раньше расчетного
+MAX_SLEEP = 2.0
+
+# Атомарная проверка всех bucket: квота списывается только если ее хватает
+# во всех bucket (mode=acquire), списывается в долг (charge) или не списывается (peek).
+# Время берется из Redis, чтобы часы воркеров не влияли на лимит.
+_BUCKET_SCRIPT = """
+local mode = ARGV[1]
+local now_parts = redis.call('time')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local wait = 0
+local levels = {}
+
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 3 - 1])
+    local rate = tonumber(ARGV[i * 3])
+    local cost = tonumber(ARGV[i * 3 + 1])
+    local state = redis.call('hmget', key, 'tokens', 'updated')
+    local tokens = tonumber(state[1]) or capacity
+    local updated = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+    levels[i] = tokens
+    if tokens < cost then
+        wait = math.max(wait, (cost - tokens) / rate)
+    end
+end
+
+if mode == 'charge' or (mode == 'acquire' and wait == 0) then
+    for i, key in ipairs(KEYS) do
+        local capacity = tonumber(ARGV[i * 3 - 1])
+        local rate = tonumber(ARGV[i * 3])
+        redis.call('hset', key, 'tokens', levels[i] - tonumber(ARGV[i * 3 + 1]), 'updated', now)
+        redis.call('expire', key, math.ceil(capacity / rate) + 60)
+    end
+end
+
+return tostring(wait)
+"""
+
+def estimate_tokens(text: str) -> int:
+    """Оценка количества токенов текста"""
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+class RateLimiter:
+    """
+    Token bucket в Redis по запросам и токенам в минуту
+
+    Ошибки Redis не блокируют вызовы LLM: лимитер пропускает запрос
+    с предупреждением в логе.
+    """
+
+    def __init__(self, name: str, requests_per_minute: int, tokens_per_minute: int):
+        self.name = name
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.keys = [f"{RATE_LIMIT_PREFIX}{name}:requests", f"{RATE_LIMIT_PREFIX}{name}:tokens"]
+        self.stats_key = f"{STATS_KEY_PREFIX}{name}"
+        self._script = None
+
+    def _run(self, mode: str, requests: int, tokens: int) -> float:
+        client = get_redis()
+        if self._script is None:
+            self._script = client.register_script(_BUCKET_SCRIPT)
+
+        args = [mode]
+        for per_minute, cost in ((self.requests_per_minute, requests), (self.tokens_per_minute, tokens)):
+            args.extend([per_minute, per_minute / 60, cost])
+        # Клиент передается явно: после fork у процесса свое соединение
+        return float(self._script(keys=self.keys, args=args, client=client))
+
+    def acquire(self, tokens: int) -> float:
+        """
+        Ждет квоты на один запрос с tokens токенами
+
+        Returns:
+            Время ожидания в секундах
+        """
+        # Запрос больше минутной квоты токенов иначе ждал бы бесконечно
+        tokens = min(tokens, self.tokens_per_minute)
+        started = time.monotonic()
+        throttled = False
+
+        while True:
+            try:
+                wait = self._run("acquire", 1, tokens)
+            except redis.RedisError as e:
+                logger.warning(f"⚠️ Лимитер {self.name} недоступен, запрос без ограничения: {e}")
+                return 0.0
+
+            if wait == 0:
+                break
+
+            # Ожидающая задача остается отменяемой
+            check_cancelled()
+            throttled = True
+            time.sleep(min(wait, MAX_SLEEP) + random.uniform(0, 0.1))
+
+        waited = time.monotonic() - started if throttled else 0.0
+        self._record(waited)
+        return waited
+
+    def charge(self, tokens: int) -> None:
+        """Списывает токены ответа, которые не были известны до запроса (допускает долг)"""
+        if tokens <= 0:
+            return
+        try:
+            self._run("charge", 0, tokens)
+        except redis.RedisError as e:
+            logger.debug(f"Не удалось списать токены лимитера {self.name}: {e}")
+
+    def current_wait(self) -> float:
+        """Сколько секунд сейчас ждал бы новый запрос"""
+        return self._run("peek", 1, 0)
+
+    def _record(self, waited: float) -> None:
+        try:
+            pipe = get_redis().pipeline()
+            pipe.hincrby(self.stats_key, "acquired", 1)
+            if waited:
+                pipe.hincrby(self.stats_key, "throttled", 1)
+                pipe.hincrbyfloat(self.stats_key, "wait_seconds", waited)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.debug(f"Не удалось обновить статистику лимитера {self.name}: {e}")
+        if waited > 1:
+            logger.info(f"🚦 Запрос к LLM ждал квоту {waited:.1f}с")
+
+    def stats(self) -> Dict[str, Any]:
+        """Лимиты, текущее ожидание и накопленная статистика всех воркеров"""
+        counters = get_redis().hgetall(self.stats_key)
+        acquired = int(counters.get("acquired", 0))
+        throttled = int(counters.get("throttled", 0))
+        wait_seconds = float(counters.get("wait_seconds", 0))
+        return {
+            "requests_per_minute": self.requests_per_minute,
+            "tokens_per_minute": self.tokens_per_minute,
+            "current_wait_seconds": round(self.current_wait(), 3),
+            "acquired": acquired,
+            "throttled": throttled,
+            "wait_seconds_total": round(wait_seconds, 3),
+            "avg_wait_seconds": round(wait_seconds / acquired, 3) if acquired else 0.0
+        }
+
+
+_rate_limiter: Optional[RateLimiter] = None
+
+def get_rate_limiter() -> Optional[RateLimiter]:
+    """Возвращает лимитер Gemini (или None, если лимит отключен)"""
+    global _rate_limiter
+
+    if not settings.llm_rate_limit_enabled:
+        return None
+
+    if _rate_limiter is None:
+        _rate_limiter = RateLimiter(
+            "gemini",
+            requests_per_minute=settings.llm_requests_per_minute,
+            tokens_per_minute=settings.llm_tokens_per_minute
+        )
+
+    return _rate_limiter
+
+
+def _message_text(messages) -> str:
+    return "\n".join(str(message.content) for message in messages)
+
+@functools.lru_cache(maxsize=None)
+def rate_limited(chat_model_class):
+    """
+    Подкласс чат-модели, вызовы API которой проходят через лимитер
+
+    Переопределен _generate: ответы из LLM-кеша квоту не расходуют.
+    """
+
+    class RateLimitedChatModel(chat_model_class):
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+            limiter = get_rate_limiter()
+            if limiter is None:
+                return super()._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+            # Ожидание квоты не входит в дедлайн и задержку попытки вызова
+            with quota_wait():
+                limiter.acquire(estimate_tokens(_message_text(messages)))
+            result = super()._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+            limiter.charge(sum(estimate_tokens(generation.text) for generation in result.generations))
+            return result
+
+    RateLimitedChatModel.__name__ = f"RateLimited{chat_model_class.__name__}"
+    return RateLimitedChatModel
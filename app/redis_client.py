@@ -0,0 +1,79 @@
+"""
+AI Agent Farm - Redis Connections
+=================================
+Общий пул подключений к Redis для кешей и служебных структур и отдельный
+пул для подписок SSE
+"""
+
+import os
+from typing import Optional
+
+import redis
+import redis.asyncio as aioredis
+
+from app.config import settings
+
+# Клиенты кешируются по PID: после fork дочерний процесс создает свой пул
+_clients = {}
+_async_clients = {}
+
+def get_redis() -> redis.Redis:
+    """Возвращает Redis-клиент с пулом соединений (один на процесс)"""
+    pid = os.getpid()
+    client = _clients.get(pid)
+
+    if client is None:
+        client = redis.Redis.from_url(
+            settings.redis_url,
+            max_connections=settings.redis_max_connections,
+            decode_responses=True
+        )
+        _clients.clear()
+        _clients[pid] = client
+
+    return client
+
+def get_async_redis(url: Optional[str] = None) -> aioredis.Redis:
+    """
+    Возвращает асинхронный Redis-клиент для event loop API
+
+    Пул ограничен settings.redis_max_connections; при исчерпании пула
+    запросы ждут освобождения соединения, а не получают ошибку.
+    """
+    url = url or settings.redis_url
+    key = (os.getpid(), url)
+    client = _async_clients.get(key)
+
+    if client is None:
+        pool = aioredis.BlockingConnectionPool.from_url(
+            url,
+            max_connections=settings.redis_max_connections,
+            timeout=5,
+            decode_responses=True
+        )
+        client = aioredis.Redis(connection_pool=pool)
+        _async_clients[key] = client
+
+    return client
+
+def get_async_pubsub_redis() -> aioredis.Redis:
+    """
+    Возвращает асинхронный Redis-клиент для подписок SSE
+
+    Подписка держит соединение все время потока, поэтому у подписок свой
+    пул (settings.sse_max_streams): открытые потоки не занимают соединения
+    общего пула, нужные остальным запросам API.
+    """
+    key = (os.getpid(), settings.redis_url, "pubsub")
+    client = _async_clients.get(key)
+
+    if client is None:
+        pool = aioredis.ConnectionPool.from_url(
+            settings.redis_url,
+            max_connections=settings.sse_max_streams,
+            decode_responses=True
+        )
+        client = aioredis.Redis(connection_pool=pool)
+        _async_clients[key] = client
+
+    return client
@@ -0,0 +1,51 @@
+"""
+AI Agent Farm - Research Result Store
+=====================================
+Хранилище завершенных исследований по каноническому ключу запроса
+"""
+
+import json
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from app.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+RESULT_PREFIX = "result-store:"
+
+def save_result(request_key: str, task_id: str, result: Dict[str, Any], ttl: int) -> None:
+    """Сохраняет результат завершенного исследования"""
+    record = {
+        "task_id": task_id,
+        "stored_at": time.time(),
+        "result": result
+    }
+    get_redis().set(
+        f"{RESULT_PREFIX}{request_key}",
+        json.dumps(record, ensure_ascii=False),
+        ex=ttl
+    )
+
+def get_fresh_result(request_key: str, max_age: int) -> Optional[Dict[str, Any]]:
+    """
+    Возвращает сохраненный результат, если он моложе max_age секунд
+
+    Returns:
+        dict с ключами task_id, stored_at, result или None
+    """
+    payload = get_redis().get(f"{RESULT_PREFIX}{request_key}")
+    if payload is None:
+        return None
+
+    try:
+        record = json.loads(payload)
+    except ValueError:
+        logger.warning(f"⚠️ Поврежденная запись в хранилище результатов: {request_key}")
+        return None
+
+    if time.time() - record.get("stored_at", 0) > max_age:
+        return None
+
+    return record
@@ -0,0 +1,70 @@
+"""
+AI Agent Farm - Report Sections
+===============================
+Промежуточные результаты исследования: результат каждой задачи команды
+(или подтемы map-reduce) сохраняется как раздел отчета сразу после
+завершения и публикуется в SSE-стрим задачи
+"""
+
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+import redis
+
+from app.config import settings
+from app.progress import progress_channel
+from app.redis_client import get_async_redis, get_redis
+
+logger = logging.getLogger(__name__)
+
+SECTIONS_PREFIX = "sections:"
+
+# Состояние SSE-события о готовом разделе
+SECTION_STATE = "SECTION"
+
+def save_section(task_id: str, index: int, title: str, output: str, agent: Optional[str] = None) -> None:
+    """
+    Сохраняет раздел отчета и уведомляет подписчиков SSE
+
+    Ошибки Redis не прерывают исследование.
+    """
+    section = {
+        "index": index,
+        "title": title,
+        "agent": agent,
+        "output": output,
+        "completed_at": time.time()
+    }
+    event = {
+        "task_id": task_id,
+        "state": SECTION_STATE,
+        "status": f"Готов раздел: {title}",
+        "section": {key: value for key, value in section.items() if key != "output"},
+        "timestamp": section["completed_at"]
+    }
+    name = f"{SECTIONS_PREFIX}{task_id}"
+
+    try:
+        pipe = get_redis().pipeline()
+        pipe.hset(name, str(index), json.dumps(section, ensure_ascii=False))
+        pipe.expire(name, settings.sections_ttl)
+        pipe.publish(progress_channel(task_id), json.dumps(event, ensure_ascii=False))
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"⚠️ Не удалось сохранить раздел {index} задачи {task_id}: {e}")
+
+def clear_sections(task_id: str) -> None:
+    """Удаляет разделы завершенного исследования: полный отчет уже в результате задачи"""
+    get_redis().delete(f"{SECTIONS_PREFIX}{task_id}")
+
+def parse_sections(payload: Dict[str, str]) -> List[Dict[str, Any]]:
+    """Разделы в порядке задач команды"""
+    sections = [json.loads(value) for value in payload.values()]
+    return sorted(sections, key=lambda section: section["index"])
+
+async def read_sections(task_id: str) -> List[Dict[str, Any]]:
+    """Готовые разделы отчета без блокировки event loop"""
+    payload = await get_async_redis().hgetall(f"{SECTIONS_PREFIX}{task_id}")
+    return parse_sections(payload)
@@ -0,0 +1,234 @@
+"""
+AI Agent Farm - Distributed Semaphore
+=====================================
+Ограничение одновременных запросов к внешнему API по всей ферме: семафор
+в Redis со справедливой очередью (FIFO по номеру билета) и арендой слотов,
+которые освобождаются сами, если процесс-владелец упал.
+
+Структуры:
+    semaphore:<name>:holders  sorted set lease_id -> время окончания аренды
+    semaphore:<name>:queue    sorted set lease_id -> номер билета
+    semaphore:<name>:waiters  sorted set lease_id -> время последней попытки
+    semaphore:<name>:tickets  счетчик билетов
+"""
+
+import logging
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+import redis
+
+from app.cancellation import TaskCancelled, check_cancelled
+from app.config import settings
+from app.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+SEMAPHORE_PREFIX = "semaphore:"
+STATS_KEY_PREFIX = "semaphore-stats:"
+
+# Сколько последних ожиданий хранится для перцентилей
+WAIT_SAMPLES = 1000
+
+# Интервал опроса очереди ожидающим процессом
+POLL_INTERVAL = 0.05
+MAX_POLL_INTERVAL = 0.5
+
+# Ожидающий, который не опрашивал очередь столько секунд, считается ушедшим
+WAITER_TTL = 5
+
+# Попытка занять слот. Вытесняются истекшие аренды и ожидающие, которые
+# перестали опрашивать очередь; слот получают только первые по билету.
+_ACQUIRE_SCRIPT = """
+local holders, queue, waiters = KEYS[1], KEYS[2], KEYS[3]
+local lease_id = ARGV[1]
+local limit = tonumber(ARGV[2])
+local lease_ttl = tonumber(ARGV[3])
+local waiter_ttl = tonumber(ARGV[4])
+local now_parts = redis.call('time')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+
+redis.call('zremrangebyscore', holders, '-inf', now)
+local stale = redis.call('zrangebyscore', waiters, '-inf', now - waiter_ttl)
+for _, waiter in ipairs(stale) do
+    redis.call('zrem', queue, waiter)
+    redis.call('zrem', waiters, waiter)
+end
+
+if not redis.call('zscore', queue, lease_id) then
+    redis.call('zadd', queue, redis.call('incr', KEYS[4]), lease_id)
+end
+redis.call('zadd', waiters, now, lease_id)
+
+local free = limit - redis.call('zcard', holders)
+local position = redis.call('zrank', queue, lease_id)
+if position < free then
+    redis.call('zrem', queue, lease_id)
+    redis.call('zrem', waiters, lease_id)
+    redis.call('zadd', holders, now + lease_ttl, lease_id)
+    return -1
+end
+return position
+"""
+
+
+class DistributedSemaphore:
+    """
+    Семафор на limit одновременных владельцев по всей ферме
+
+    Ошибки Redis не блокируют вызовы: семафор пропускает запрос
+    с предупреждением в логе.
+    """
+
+    def __init__(self, name: str, limit: int, lease_ttl: float, timeout: float):
+        self.name = name
+        self.limit = limit
+        self.lease_ttl = lease_ttl
+        self.timeout = timeout
+        prefix = f"{SEMAPHORE_PREFIX}{name}"
+        self.holders_key = f"{prefix}:holders"
+        self.keys = [self.holders_key, f"{prefix}:queue", f"{prefix}:waiters", f"{prefix}:tickets"]
+        self.stats_key = f"{STATS_KEY_PREFIX}{name}"
+        self.waits_key = f"{STATS_KEY_PREFIX}{name}:waits"
+        self._script = None
+
+    def _try_acquire(self, lease_id: str) -> int:
+        """-1 - слот получен, иначе позиция в очереди"""
+        client = get_redis()
+        if self._script is None:
+            self._script = client.register_script(_ACQUIRE_SCRIPT)
+        return int(self._script(
+            keys=self.keys,
+            args=[lease_id, self.limit, self.lease_ttl, WAITER_TTL],
+            client=client
+        ))
+
+    def acquire(self) -> Optional[str]:
+        """
+        Ждет свободного слота в порядке очереди
+
+        Returns:
+            Идентификатор аренды или None, если Redis недоступен
+
+        Raises:
+            TimeoutError: слот не освободился за timeout секунд
+        """
+        lease_id = uuid.uuid4().hex
+        started = time.monotonic()
+        interval = POLL_INTERVAL
+
+        while True:
+            try:
+                position = self._try_acquire(lease_id)
+            except redis.RedisError as e:
+                logger.warning(f"⚠️ Семафор {self.name} недоступен, запрос без ограничения: {e}")
+                return None
+
+            if position < 0:
+                break
+
+            waited = time.monotonic() - started
+            if waited > self.timeout:
+                self._leave_queue(lease_id)
+                raise TimeoutError(f"Нет свободного слота {self.name} за {waited:.0f}с (позиция в очереди {position})")
+
+            try:
+                check_cancelled()
+            except TaskCancelled:
+                self._leave_queue(lease_id)
+                raise
+            time.sleep(interval)
+            interval = min(interval * 1.5, MAX_POLL_INTERVAL)
+
+        self._record(time.monotonic() - started)
+        return lease_id
+
+    def release(self, lease_id: Optional[str]) -> None:
+        """Освобождает слот"""
+        if lease_id is None:
+            return
+        try:
+            get_redis().zrem(self.holders_key, lease_id)
+        except redis.RedisError as e:
+            logger.warning(f"⚠️ Не удалось освободить слот {self.name} (освободится через {self.lease_ttl}с): {e}")
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Занимает слот на время блока"""
+        lease_id = self.acquire()
+        try:
+            yield
+        finally:
+            self.release(lease_id)
+
+    def _leave_queue(self, lease_id: str) -> None:
+        try:
+            pipe = get_redis().pipeline()
+            pipe.zrem(self.keys[1], lease_id)
+            pipe.zrem(self.keys[2], lease_id)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.debug(f"Не удалось покинуть очередь {self.name}: {e}")
+
+    def _record(self, waited: float) -> None:
+        try:
+            pipe = get_redis().pipeline()
+            pipe.hincrby(self.stats_key, "acquired", 1)
+            pipe.hincrbyfloat(self.stats_key, "wait_seconds", waited)
+            pipe.lpush(self.waits_key, round(waited, 4))
+            pipe.ltrim(self.waits_key, 0, WAIT_SAMPLES - 1)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.debug(f"Не удалось обновить статистику семафора {self.name}: {e}")
+        if waited > 1:
+            logger.info(f"🚥 Запрос {self.name} ждал слот {waited:.1f}с")
+
+    def stats(self) -> Dict[str, Any]:
+        """Занятые слоты, очередь и распределение ожиданий по последним вызовам"""
+        client = get_redis()
+        pipe = client.pipeline()
+        pipe.zcount(self.holders_key, time.time(), "+inf")
+        pipe.zcard(self.keys[1])
+        pipe.hgetall(self.stats_key)
+        pipe.lrange(self.waits_key, 0, -1)
+        in_flight, queued, counters, samples = pipe.execute()
+
+        waits = sorted(float(sample) for sample in samples)
+        acquired = int(counters.get("acquired", 0))
+        wait_seconds = float(counters.get("wait_seconds", 0))
+
+        def percentile(fraction: float) -> float:
+            return waits[min(len(waits) - 1, int(len(waits) * fraction))] if waits else 0.0
+
+        return {
+            "limit": self.limit,
+            "in_flight": in_flight,
+            "queued": queued,
+            "acquired": acquired,
+            "avg_wait_seconds": round(wait_seconds / acquired, 4) if acquired else 0.0,
+            "p50_wait_seconds": percentile(0.5),
+            "p95_wait_seconds": percentile(0.95),
+            "max_wait_seconds": waits[-1] if waits else 0.0
+        }
+
+
+_search_semaphore: Optional[DistributedSemaphore] = None
+
+def get_search_semaphore() -> Optional[DistributedSemaphore]:
+    """Возвращает семафор запросов к Serper (или None, если ограничение отключено)"""
+    global _search_semaphore
+
+    if settings.search_max_concurrency <= 0:
+        return None
+
+    if _search_semaphore is None:
+        _search_semaphore = DistributedSemaphore(
+            "serper",
+            limit=settings.search_max_concurrency,
+            lease_ttl=settings.search_lease_ttl,
+            timeout=settings.search_queue_timeout
+        )
+
+    return _search_semaphore
@@ -0,0 +1,218 @@
+"""
+AI Agent Farm - Task State Index
+================================
+Индекс состояния задач и воркеров в Redis, который поддерживает потребитель
+событий Celery. API читает его за O(log n) вместо широковещательных
+inspect()-запросов ко всем воркерам.
+
+Структуры:
+    task-index:state:<STATE>  sorted set task_id -> время перехода в состояние
+    task-index:task:<task_id> hash имя, состояние, воркер и отметки времени
+    task-index:workers        sorted set hostname -> время последнего heartbeat
+    task-index:consumer       время последнего обработанного события
+
+Незавершенные задачи, не получавшие событий дольше CELERY_TASK_TIMEOUT +
+STALE_MARGIN (потерянное событие завершения, убитый воркер), удаляются из
+sorted set незавершенных состояний, завершенные - через TASK_INDEX_RETENTION.
+
+Запуск потребителя:
+    python -m app.task_index
+"""
+
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+from app.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+INDEX_PREFIX = "task-index:"
+WORKERS_KEY = f"{INDEX_PREFIX}workers"
+CONSUMER_KEY = f"{INDEX_PREFIX}consumer"
+
+# Событие Celery -> состояние задачи в индексе
+EVENT_STATES = {
+    "task-sent": "PENDING",
+    "task-received": "RECEIVED",
+    "task-started": "STARTED",
+    "task-succeeded": "SUCCESS",
+    "task-failed": "FAILURE",
+    "task-rejected": "REJECTED",
+    "task-revoked": "REVOKED",
+    "task-retried": "RETRY",
+}
+TERMINAL_STATES = {"SUCCESS", "FAILURE", "REJECTED", "REVOKED"}
+ACTIVE_STATES = ("STARTED",)
+QUEUED_STATES = ("PENDING", "RECEIVED", "RETRY")
+
+# Запас сверх лимита времени задачи, после которого незавершенная задача
+# считается потерянной, и период очистки (heartbeats приходят и без задач)
+STALE_MARGIN = 3600
+TRIM_INTERVAL = 60
+
+# Переход задачи между sorted set состояний. Завершенная задача не возвращается
+# в незавершенное состояние: события разных процессов могут прийти не по порядку.
+_TRANSITION_SCRIPT = """
+local prefix = ARGV[1]
+local task_id = ARGV[2]
+local state = ARGV[3]
+local timestamp = tonumber(ARGV[4])
+local ttl = tonumber(ARGV[5])
+local new_is_terminal = ARGV[6] == '1'
+
+local previous = redis.call('hget', KEYS[1], 'state')
+if previous and redis.call('hget', KEYS[1], 'terminal') == '1' and not new_is_terminal then
+    return 0
+end
+if previous then
+    redis.call('zrem', prefix .. 'state:' .. previous, task_id)
+end
+redis.call('zadd', prefix .. 'state:' .. state, timestamp, task_id)
+
+redis.call('hset', KEYS[1], 'state', state, 'updated', ARGV[4], 'terminal', new_is_terminal and '1' or '0')
+for i = 7, #ARGV, 2 do
+    redis.call('hset', KEYS[1], ARGV[i], ARGV[i + 1])
+end
+redis.call('expire', KEYS[1], ttl)
+
+if new_is_terminal then
+    redis.call('zremrangebyscore', prefix .. 'state:' .. state, '-inf', timestamp - ttl)
+end
+return 1
+"""
+
+def state_key(state: str) -> str:
+    return f"{INDEX_PREFIX}state:{state}"
+
+def task_key(task_id: str) -> str:
+    return f"{INDEX_PREFIX}task:{task_id}"
+
+
+class TaskIndexWriter:
+    """Обработчик событий Celery, обновляющий индекс"""
+
+    def __init__(self, client=None):
+        self.client = client or get_redis()
+        self._transition = self.client.register_script(_TRANSITION_SCRIPT)
+        self._last_trim = 0.0
+
+    def on_event(self, event: Dict[str, Any]) -> None:
+        event_type = event.get("type", "")
+        timestamp = event.get("timestamp") or time.time()
+
+        if event_type in EVENT_STATES:
+            self.on_task_event(event_type, event, timestamp)
+        elif event_type in ("worker-online", "worker-heartbeat"):
+            self.client.zadd(WORKERS_KEY, {event["hostname"]: timestamp})
+        elif event_type == "worker-offline":
+            self.client.zrem(WORKERS_KEY, event["hostname"])
+
+        self.client.set(CONSUMER_KEY, time.time())
+
+        if time.monotonic() - self._last_trim >= TRIM_INTERVAL:
+            self.trim_stale()
+
+    def trim_stale(self, now: Optional[float] = None) -> None:
+        """Удаляет из незавершенных состояний задачи без событий дольше лимита задачи с запасом"""
+        cutoff = (now or time.time()) - settings.celery_task_timeout - STALE_MARGIN
+        pipe = self.client.pipeline()
+        for state in (*QUEUED_STATES, *ACTIVE_STATES):
+            pipe.zremrangebyscore(state_key(state), "-inf", cutoff)
+        removed = sum(pipe.execute())
+        self._last_trim = time.monotonic()
+
+        if removed:
+            logger.info(f"🧹 Из индекса удалено потерянных задач: {removed}")
+
+    def on_task_event(self, event_type: str, event: Dict[str, Any], timestamp: float) -> None:
+        state = EVENT_STATES[event_type]
+        fields = {"hostname": event.get("hostname")}
+
+        if event_type == "task-sent":
+            fields["sent"] = timestamp
+        elif event_type == "task-received":
+            fields["name"] = event.get("name")
+            fields["received"] = timestamp
+        elif event_type == "task-started":
+            fields["started"] = timestamp
+        elif event_type == "task-succeeded":
+            fields["runtime"] = event.get("runtime")
+
+        if event.get("name"):
+            fields["name"] = event["name"]
+
+        args = []
+        for field, value in fields.items():
+            if value is not None:
+                args.extend([field, value])
+
+        self._transition(
+            keys=[task_key(event["uuid"])],
+            args=[
+                INDEX_PREFIX, event["uuid"], state, timestamp,
+                settings.task_index_retention, "1" if state in TERMINAL_STATES else "0",
+                *args
+            ]
+        )
+
+
+def index_is_live(max_age: Optional[float] = None) -> bool:
+    """Потребитель событий работает и индекс актуален"""
+    max_age = max_age or settings.task_index_max_lag
+    updated = get_redis().get(CONSUMER_KEY)
+    return updated is not None and time.time() - float(updated) <= max_age
+
+def count_by_state(states=None) -> Dict[str, int]:
+    """Количество задач в каждом состоянии (ZCARD, O(1) на состояние)"""
+    states = states or [*QUEUED_STATES, *ACTIVE_STATES, *sorted(TERMINAL_STATES)]
+    pipe = get_redis().pipeline()
+    for state in states:
+        pipe.zcard(state_key(state))
+    return dict(zip(states, pipe.execute()))
+
+def list_tasks(states, limit: int = 100) -> List[Dict[str, Any]]:
+    """Последние задачи в указанных состояниях (новые первыми)"""
+    client = get_redis()
+    entries = []
+    for state in states:
+        entries.extend(client.zrevrange(state_key(state), 0, limit - 1, withscores=True))
+    entries = sorted(entries, key=lambda entry: entry[1], reverse=True)[:limit]
+
+    pipe = client.pipeline()
+    for task_id, _ in entries:
+        pipe.hgetall(task_key(task_id))
+
+    return [
+        {"id": task_id, **details}
+        for (task_id, _), details in zip(entries, pipe.execute())
+    ]
+
+def alive_workers(max_age: Optional[float] = None) -> List[str]:
+    """Воркеры, приславшие heartbeat за последние max_age секунд"""
+    max_age = max_age or settings.task_index_max_lag
+    return get_redis().zrangebyscore(WORKERS_KEY, time.time() - max_age, "+inf")
+
+
+def run_consumer() -> None:
+    """Потребляет события Celery и обновляет индекс (переподключается при ошибках)"""
+    from app.tasks import celery_app
+
+    writer = TaskIndexWriter()
+    logger.info("📡 Потребитель событий Celery запущен")
+
+    while True:
+        try:
+            with celery_app.connection() as connection:
+                receiver = celery_app.events.Receiver(connection, handlers={"*": writer.on_event})
+                receiver.capture(limit=None, timeout=None, wakeup=True)
+        except (KeyboardInterrupt, SystemExit):
+            raise
+        except Exception as e:
+            logger.warning(f"⚠️ Потребитель событий отключился: {e}, переподключение через 5с")
+            time.sleep(5)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=getattr(logging, settings.log_level))
+    run_consumer()
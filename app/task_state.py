@@ -0,0 +1,45 @@
+"""
+AI Agent Farm - Task State Reader
+=================================
+Неблокирующее чтение состояния задач Celery напрямую из Redis result backend
+"""
+
+import json
+import logging
+from typing import Any, Dict
+
+from app.config import settings
+from app.redis_client import get_async_redis
+
+logger = logging.getLogger(__name__)
+
+# Формат ключей Redis backend Celery
+CELERY_META_PREFIX = "celery-task-meta-"
+
+async def read_task_meta(task_id: str) -> Dict[str, Any]:
+    """
+    Читает метаданные задачи из result backend без блокировки event loop
+
+    Returns:
+        dict с ключами status и result (как в AsyncResult.status/.info)
+    """
+    client = get_async_redis(settings.celery_result_backend)
+    payload = await client.get(f"{CELERY_META_PREFIX}{task_id}")
+
+    # Celery не хранит неизвестные и ожидающие задачи: это PENDING
+    if payload is None:
+        return {"task_id": task_id, "status": "PENDING", "result": None}
+
+    return json.loads(payload)
+
+def format_task_error(meta: Dict[str, Any]) -> str:
+    """Восстанавливает текст ошибки, как его отдает str(AsyncResult.info)"""
+    error = meta.get("result")
+
+    if isinstance(error, dict) and "exc_message" in error:
+        args = error["exc_message"]
+        if isinstance(args, (list, tuple)):
+            return str(args[0]) if len(args) == 1 else str(tuple(args))
+        return str(args)
+
+    return str(error)
@@ -4,8 +4,17 @@ AI Agent Farm - Enhanced Celery Tasks
 Асинхронные задачи с поддержкой различных команд агентов
 """
 
-from celery import Celery
+from celery import Celery, states
+from celery.exceptions import Ignore
+from celery.signals import task_postrun, worker_init, worker_process_init, worker_ready, worker_shutdown
+from kombu import Queue
+from app.cancellation import CancellationToken, TaskCancelled, cancel_scope, clear_cancel
 from app.config import settings
+from app.crew_registry import get_crew_spec
+from app.heartbeat import start_heartbeat, stop_heartbeat
+from app.llm_resilience import task_deadline
+from app.model_routing import agent_models
+from app.progress import ProgressThrottle, publish_progress
 import logging
 import time
 
@@ -21,6 +30,27 @@ celery_app = Celery(
     include=['app.tasks']
 )
 
+# Приоритет запроса -> приоритет сообщения в Redis (0 - наивысший)
+PRIORITY_LEVELS = {"high": 0, "normal": 5, "low": 9}
+
+def research_queue(crew_type: str, depth: str) -> str:
+    """
+    Очередь исследования по глубине и типу команды
+
+    Comprehensive-исследования и showcase команды (8-18 минут) идут в
+    отдельную очередь, чтобы короткие интерактивные запросы не ждали их.
+    """
+    if depth == "comprehensive" or get_crew_spec(crew_type).category == "showcase":
+        return settings.research_heavy_queue
+    return settings.research_fast_queue
+
+def route_task(name, args, kwargs, options, task=None, **kw):
+    """Celery router: исследования распределяются по очередям, остальное - в очередь по умолчанию"""
+    if name == 'app.tasks.research_task':
+        kwargs = kwargs or {}
+        return {'queue': research_queue(kwargs.get('crew_type', 'general'), kwargs.get('depth', 'standard'))}
+    return None
+
 # ⚙️ Конфигурация Celery
 celery_app.conf.update(
     task_serializer='json',
@@ -32,9 +62,64 @@ celery_app.conf.update(
     task_soft_time_limit=settings.celery_task_timeout - 300,  # 5 минут до жесткого лимита
     worker_prefetch_multiplier=1,
     task_acks_late=True,
+    # Задача умершего процесса возвращается в очередь и продолжается с контрольных точек
+    task_reject_on_worker_lost=True,
     worker_max_tasks_per_child=1000,
+    # Очереди: воркер без -Q слушает все, с -Q - только указанные
+    task_queues=(
+        Queue('celery', routing_key='celery'),
+        Queue(settings.research_fast_queue, routing_key=settings.research_fast_queue),
+        Queue(settings.research_heavy_queue, routing_key=settings.research_heavy_queue),
+    ),
+    task_routes=(route_task,),
+    # Приоритеты внутри очереди (Redis: отдельный список на каждый уровень)
+    broker_transport_options={
+        'priority_steps': list(range(10)),
+        'sep': ':',
+        # Неподтвержденная задача доставляется повторно не раньше лимита времени задачи
+        'visibility_timeout': settings.celery_task_timeout + 600,
+    },
+    task_default_priority=PRIORITY_LEVELS['normal'],
+    # События задач для индекса состояния (app.task_index)
+    worker_send_task_events=True,
+    task_send_sent_event=True,
 )
 
+@worker_init.connect
+def preload_crew_modules(**kwargs):
+    """Импортирует CrewAI в главном процессе воркера до fork дочерних процессов"""
+    if settings.worker_warm_up:
+        import app.main_crew  # noqa: F401
+
+@worker_ready.connect
+def start_worker_heartbeat(sender=None, **kwargs):
+    """Запускает heartbeats главного процесса воркера для /health"""
+    controller = getattr(sender, "controller", None)
+    start_heartbeat(getattr(sender, "hostname", None), getattr(controller, "concurrency", None))
+
+@worker_shutdown.connect
+def stop_worker_heartbeat(**kwargs):
+    """Удаляет heartbeat остановленного воркера"""
+    stop_heartbeat()
+
+@worker_process_init.connect
+def warm_up_worker_process(**kwargs):
+    """Прогревает дочерний процесс: клиенты LLM и инструменты"""
+    if not settings.worker_warm_up:
+        return
+
+    try:
+        from app.main_crew import warm_up
+        warm_up()
+    except Exception as e:
+        # Без прогрева клиенты и инструменты создаются при первой задаче, как раньше
+        logger.warning(f"⚠️ Прогрев процесса воркера не удался: {e}")
+
+def report_progress(task, meta: dict) -> None:
+    """Сохраняет прогресс в result backend и публикует его подписчикам SSE"""
+    task.update_state(state='PROGRESS', meta=meta)
+    publish_progress(task.request.id, 'PROGRESS', meta)
+
 @celery_app.task(bind=True)
 def research_task(self, topic: str, crew_type: str = "general", language: str = "ru", depth: str = "standard"):
     """
@@ -48,16 +133,23 @@ def research_task(self, topic: str, crew_type: str = "general", language: str =
     
     Returns:
         dict: Результат исследования
+    
+    Отмена (DELETE /task/{task_id}) проверяется между шагами агентов:
+    задача завершается в состоянии REVOKED с результатами готовых задач команды.
     """
     start_time = time.time()
+    cancel_token = CancellationToken(self.request.id)
     
     try:
+        # Задача могла быть отменена, пока ждала в очереди
+        cancel_token.check()
+        
         logger.info(f"🔍 Начинаем исследование: {topic} (команда: {crew_type}, язык: {language}, глубина: {depth})")
         
         # Обновляем прогресс
-        self.update_state(
-            state='PROGRESS', 
-            meta={
+        report_progress(
+            self,
+            {
                 'current': 10, 
                 'total': 100, 
                 'status': f'Инициализация команды {crew_type}...',
@@ -69,9 +161,9 @@ def research_task(self, topic: str, crew_type: str = "general", language: str =
         from app.main_crew import run_research
         
         # Обновляем прогресс
-        self.update_state(
-            state='PROGRESS', 
-            meta={
+        report_progress(
+            self,
+            {
                 'current': 25, 
                 'total': 100, 
                 'status': 'Поиск и анализ информации...',
@@ -79,18 +171,28 @@ def research_task(self, topic: str, crew_type: str = "general", language: str =
             }
         )
         
-        # Запускаем исследование с выбранной командой
-        result = run_research(
-            topic=topic,
-            crew_type=crew_type, 
-            language=language,
-            depth=depth
+        # Шаги агентов и завершение задач команды, не чаще progress_min_interval
+        progress = ProgressThrottle(
+            lambda meta: report_progress(self, {**meta, 'crew_type': crew_type}),
+            settings.progress_min_interval
         )
         
+        # Запускаем исследование с выбранной командой
+        # Вызовы LLM не выходят за мягкий лимит времени задачи
+        with cancel_scope(cancel_token), task_deadline(start_time + celery_app.conf.task_soft_time_limit):
+            result = run_research(
+                topic=topic,
+                crew_type=crew_type, 
+                language=language,
+                depth=depth,
+                progress=progress,
+                task_id=self.request.id
+            )
+        
         # Обновляем прогресс 
-        self.update_state(
-            state='PROGRESS', 
-            meta={
+        report_progress(
+            self,
+            {
                 'current': 90, 
                 'total': 100, 
                 'status': 'Финализация отчета...',
@@ -102,7 +204,7 @@ def research_task(self, topic: str, crew_type: str = "general", language: str =
         
         logger.info(f"✅ Исследование завершено: {topic} ({processing_time:.2f}s)")
         
-        return {
+        response = {
             'status': 'completed',
             'result': result,
             'topic': topic,
@@ -110,9 +212,69 @@ def research_task(self, topic: str, crew_type: str = "general", language: str =
             'language': language,
             'depth': depth,
             'processing_time': processing_time,
+            'timings': progress.last.get('timings', []),
+            'models': agent_models(crew_type, depth),
             'message': f'Исследование успешно завершено командой {crew_type}'
         }
         
+        # Большой отчет хранится сжатым вне Redis, в результате остается ссылка
+        try:
+            from app.blob_store import offload_report
+            response = offload_report(response)
+        except OSError as e:
+            logger.warning(f"⚠️ Не удалось сохранить отчет {self.request.id} в хранилище blob: {e}")
+        
+        # Сохраняем результат для повторных запросов с теми же параметрами
+        if settings.result_store_enabled:
+            try:
+                from app.coalescing import canonical_request_key
+                from app.result_store import save_result
+                save_result(
+                    canonical_request_key(topic, crew_type, language, depth),
+                    self.request.id,
+                    response,
+                    ttl=settings.result_store_ttl
+                )
+            except Exception as e:
+                logger.warning(f"⚠️ Не удалось сохранить результат {self.request.id}: {e}")
+        
+        # Разделы нужны только пока отчет не готов
+        if settings.sections_enabled:
+            try:
+                from app.sections import clear_sections
+                clear_sections(self.request.id)
+            except Exception as e:
+                logger.warning(f"⚠️ Не удалось удалить разделы {self.request.id}: {e}")
+        
+        return response
+        
+    except TaskCancelled as exc:
+        processing_time = time.time() - start_time
+        logger.info(f"🛑 Исследование отменено: {topic} ({processing_time:.2f}s)")
+        
+        response = {
+            'status': 'cancelled',
+            'result': exc.partial_output or None,
+            'topic': topic,
+            'crew_type': crew_type,
+            'language': language,
+            'depth': depth,
+            'processing_time': processing_time,
+            'message': 'Исследование отменено'
+        }
+        
+        # Частичный результат сохраняется как состояние REVOKED; процесс воркера остается в пуле
+        self.update_state(state=states.REVOKED, meta=response)
+        publish_progress(self.request.id, states.REVOKED, {'status': response['message']})
+        
+        # Ignore не порождает событие завершения задачи: без него индекс
+        # состояния (app.task_index) держал бы задачу в STARTED
+        try:
+            self.send_event('task-revoked', terminated=False, expired=False)
+        except Exception as e:
+            logger.warning(f"⚠️ Не удалось отправить событие отмены {self.request.id}: {e}")
+        raise Ignore()
+        
     except Exception as exc:
         processing_time = time.time() - start_time
         logger.error(f"❌ Ошибка в исследовании {topic}: {str(exc)}")
@@ -130,6 +292,43 @@ def research_task(self, topic: str, crew_type: str = "general", language: str =
         
         raise exc
 
+    finally:
+        # Контрольные точки нужны только для повторной доставки после потери воркера
+        if settings.checkpoints_enabled:
+            try:
+                from app.checkpoints import clear_checkpoints
+                clear_checkpoints(self.request.id)
+            except Exception as e:
+                logger.warning(f"⚠️ Не удалось удалить контрольные точки {self.request.id}: {e}")
+        
+        if cancel_token.cancelled:
+            try:
+                clear_cancel(self.request.id)
+            except Exception as e:
+                logger.warning(f"⚠️ Не удалось снять флаг отмены {self.request.id}: {e}")
+        
+        # Снимаем регистрацию запроса, чтобы новые запросы ставились в очередь
+        if settings.request_coalescing_enabled:
+            try:
+                from app.coalescing import canonical_request_key, release_inflight
+                release_inflight(canonical_request_key(topic, crew_type, language, depth), self.request.id)
+            except Exception as e:
+                logger.warning(f"⚠️ Не удалось снять регистрацию запроса {self.request.id}: {e}")
+
+@task_postrun.connect(sender=research_task)
+def publish_final_state(task_id=None, state=None, retval=None, **kwargs):
+    """Публикует финальное состояние после записи результата в backend"""
+    if state == states.IGNORED:
+        # Отмененная задача уже опубликовала состояние REVOKED
+        return
+
+    if state == 'SUCCESS' and isinstance(retval, dict):
+        meta = {'current': 100, 'total': 100, 'status': retval.get('message')}
+    else:
+        meta = {'status': str(retval)}
+
+    publish_progress(task_id, state, meta)
+
 @celery_app.task
 def health_check():
     """Проверка работоспособности Celery worker"""
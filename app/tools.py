@@ -0,0 +1,57 @@
+"""
+AI Agent Farm - Agent Tools
+===========================
+Инструменты агентов с кешированием результатов поиска
+"""
+
+import logging
+from typing import Any
+
+from crewai_tools import SerperDevTool
+
+from app.cache import get_search_cache, query_memo
+from app.cancellation import check_cancelled
+from app.semaphore import get_search_semaphore
+
+logger = logging.getLogger(__name__)
+
+
+class CachedSerperDevTool(SerperDevTool):
+    """
+    SerperDevTool с двумя уровнями кеша
+
+    1. Мемо в памяти процесса в пределах одного запуска команды
+    2. Общий Redis-кеш с TTL по нормализованному запросу
+
+    Запросы к API проходят через общий семафор фермы (SEARCH_MAX_CONCURRENCY).
+    """
+
+    def _run(self, search_query: str, **kwargs: Any) -> Any:
+        # Отмененная задача не тратит запросы к поиску
+        check_cancelled()
+
+        result = query_memo.get(search_query)
+        if result is not None:
+            return result
+
+        search_cache = get_search_cache()
+        if search_cache is not None:
+            result = search_cache.get(search_query)
+            if result is not None:
+                query_memo.set(search_query, result)
+                return result
+
+        semaphore = get_search_semaphore()
+        if semaphore is not None:
+            with semaphore.slot():
+                result = super()._run(search_query=search_query, **kwargs)
+        else:
+            result = super()._run(search_query=search_query, **kwargs)
+
+        # Кешируем только текстовую выдачу: dict означает ответ API без результатов
+        if isinstance(result, str):
+            query_memo.set(search_query, result)
+            if search_cache is not None:
+                search_cache.set(search_query, result)
+
+        return result
@@ -320,6 +320,62 @@ def start_showcase_research(crew_type, topic, language, depth, team_info):
         except Exception as e:
             st.error(f"❌ Ошибка: {str(e)}")
 
+def iter_task_events(task_id):
+    """События прогресса задачи из SSE-стрима (с откатом на опрос /result)"""
+    
+    try:
+        with requests.get(f"{API_BASE_URL}/result/{task_id}/stream", stream=True, timeout=(5, 60)) as response:
+            response.raise_for_status()
+            for line in response.iter_lines(decode_unicode=True):
+                if line and line.startswith("data: "):
+                    yield json.loads(line[len("data: "):])
+        return
+    except requests.RequestException:
+        pass
+    
+    # API без поддержки SSE: опрашиваем результат
+    while True:
+        response = requests.get(f"{API_BASE_URL}/result/{task_id}")
+        response.raise_for_status()
+        data = response.json()
+        
+        yield {
+            "state": data["status"],
+            "progress": data.get("progress", 0),
+            "result": data.get("result"),
+            "error": data.get("error")
+        }
+        
+        if data["status"] in ("SUCCESS", "FAILURE"):
+            return
+        
+        time.sleep(10)
+
+def fetch_report(task_id):
+    """Текст отчета завершенной задачи (большие отчеты хранятся вне результата)"""
+    
+    try:
+        response = requests.get(f"{API_BASE_URL}/result/{task_id}/report", timeout=(5, 60))
+        if response.status_code == 200:
+            return response.text
+    except requests.RequestException:
+        pass
+    return None
+
+def show_section(task_id, section):
+    """Показать готовый раздел отчета"""
+    
+    try:
+        response = requests.get(f"{API_BASE_URL}/result/{task_id}/sections", timeout=(5, 30))
+        response.raise_for_status()
+    except requests.RequestException:
+        return
+    
+    for item in response.json()["sections"]:
+        if item["index"] == section["index"]:
+            with st.expander(f"📑 {item['title']}", expanded=False):
+                st.markdown(item["output"])
+
 def monitor_task_progress(task_id, team_name):
     """Мониторинг прогресса выполнения задачи"""
     
@@ -331,67 +387,65 @@ def monitor_task_progress(task_id, team_name):
     
     start_time = time.time()
     
-    while True:
-        try:
-            response = requests.get(f"{API_BASE_URL}/result/{task_id}")
+    try:
+        for event in iter_task_events(task_id):
+            status = event["state"]
             
-            if response.status_code == 200:
-                data = response.json()
-                status = data["status"]
-                progress = data.get("progress", 0)
-                
-                progress_bar.progress(progress / 100)
+            # Раздел отчета готов раньше всей команды: показываем его сразу
+            if status == "SECTION":
+                show_section(task_id, event["section"])
+                continue
+            
+            progress = event.get("progress") or 0
+            
+            progress_bar.progress(progress / 100)
+            
+            elapsed_time = int(time.time() - start_time)
+            status_placeholder.info(f"🔄 Статус: {status} | Прошло времени: {elapsed_time}с")
+            
+            if status == "SUCCESS":
+                st.success(f"🎉 {team_name} завершен успешно!")
                 
-                elapsed_time = int(time.time() - start_time)
-                status_placeholder.info(f"🔄 Статус: {status} | Прошло времени: {elapsed_time}с")
+                # Отображаем результат
+                result = fetch_report(task_id) or event.get("result") or "Результат недоступен"
                 
-                if status == "SUCCESS":
-                    st.success(f"🎉 {team_name} завершен успешно!")
-                    
-                    # Отображаем результат
-                    result = data.get("result", "Результат недоступен")
+                with result_placeholder.container():
+                    st.markdown('<div class="result-container">', unsafe_allow_html=True)
+                    st.subheader("📋 Результат анализа")
+                    st.markdown(result)
+                    st.markdown('</div>', unsafe_allow_html=True)
                     
-                    with result_placeholder.container():
-                        st.markdown('<div class="result-container">', unsafe_allow_html=True)
-                        st.subheader("📋 Результат анализа")
-                        st.markdown(result)
-                        st.markdown('</div>', unsafe_allow_html=True)
-                        
-                        # Кнопки действий
-                        col1, col2, col3 = st.columns(3)
-                        with col1:
-                            if st.button("📥 Скачать результат"):
-                                st.download_button(
-                                    label="📄 Скачать как текст",
-                                    data=result,
-                                    file_name=f"{team_name}_{task_id}.txt",
-                                    mime="text/plain"
-                                )
-                        with col2:
-                            if st.button("🔄 Новое исследование"):
-                                st.rerun()
-                        with col3:
-                            if st.button("📊 Статистика"):
-                                show_task_statistics(data)
-                    
-                    break
-                    
-                elif status == "FAILURE":
-                    st.error(f"❌ {team_name} завершен с ошибкой")
-                    error_info = data.get("error", "Неизвестная ошибка")
-                    st.error(f"Ошибка: {error_info}")
-                    break
-                
-                # Обновляем каждые 10 секунд
-                time.sleep(10)
+                    # Кнопки действий
+                    col1, col2, col3 = st.columns(3)
+                    with col1:
+                        if st.button("📥 Скачать результат"):
+                            st.download_button(
+                                label="📄 Скачать как текст",
+                                data=result,
+                                file_name=f"{team_name}_{task_id}.txt",
+                                mime="text/plain"
+                            )
+                    with col2:
+                        if st.button("🔄 Новое исследование"):
+                            st.rerun()
+                    with col3:
+                        if st.button("📊 Статистика"):
+                            show_task_statistics({
+                                "status": status,
+                                "progress": progress,
+                                "processing_time": result.get("processing_time", 0) if isinstance(result, dict) else 0
+                            })
                 
-            else:
-                st.error("❌ Ошибка получения статуса задачи")
                 break
                 
-        except Exception as e:
-            st.error(f"❌ Ошибка мониторинга: {str(e)}")
-            break
+            elif status == "FAILURE":
+                st.error(f"❌ {team_name} завершен с ошибкой")
+                error_info = event.get("error") or "Неизвестная ошибка"
+                st.error(f"Ошибка: {error_info}")
+                break
+            
+    except Exception as e:
+        st.error(f"❌ Ошибка мониторинга: {str(e)}")
 
 def show_task_statistics(task_data):
     """Показать статистику выполненной задачи"""
@@ -0,0 +1,63 @@
+"""
+AI Agent Farm - Import Time Benchmark
+=====================================
+Измеряет холодный старт модулей приложения: каждый импорт выполняется
+в новом интерпретаторе, как при запуске API, воркера или дочернего процесса.
+
+    python benchmarks/bench_import_time.py --runs 5
+    python benchmarks/bench_import_time.py --modules app.main_crew --top 15
+
+--top печатает самые медленные модули по данным python -X importtime.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+DEFAULT_MODULES = ["app.config", "app.api", "app.tasks", "app.main_crew"]
+
+def time_import(module: str) -> float:
+    """Время импорта модуля в новом процессе, секунды"""
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", f"import {module}"], check=True, capture_output=True)
+    return time.perf_counter() - started
+
+def slowest_imports(module: str, top: int) -> list:
+    """Самые медленные вложенные импорты (cumulative, микросекунды)"""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        check=True, capture_output=True, text=True
+    )
+
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), name.strip()))
+
+    return sorted(rows, reverse=True)[:top]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cold import time")
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=0)
+    args = parser.parse_args()
+
+    # Baseline: запуск пустого интерпретатора
+    baseline = statistics.median(time_import("sys") for _ in range(args.runs))
+    print(f"{'python':>16}: {baseline * 1000:8.1f} ms (baseline)")
+
+    for module in args.modules:
+        samples = [time_import(module) for _ in range(args.runs)]
+        median = statistics.median(samples)
+        print(f"{module:>16}: {median * 1000:8.1f} ms (+{(median - baseline) * 1000:.1f} ms, runs={args.runs})")
+
+        for cumulative, name in slowest_imports(module, args.top) if args.top else []:
+            print(f"{'':>18}{cumulative / 1000:8.1f} ms  {name}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+AI Agent Farm - /result Endpoint Benchmark
+==========================================
+Сравнивает пропускную способность GET /result/{task_id} до и после перехода
+на асинхронный Redis-клиент.
+
+"legacy" воспроизводит прежний обработчик: async def с синхронными вызовами
+celery_app.AsyncResult(...).status/.result, блокирующими event loop.
+"async" - текущий обработчик app.api.get_result.
+
+Требуется запущенный Redis (REDIS_URL / CELERY_RESULT_BACKEND):
+
+    python benchmarks/bench_result_endpoint.py --concurrency 50 --duration 10
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from app.api import app as api_app
+from app.redis_client import get_redis
+from app.tasks import celery_app
+
+TASK_ID = "bench-result-task"
+
+legacy_app = FastAPI()
+
+@legacy_app.get("/result/{task_id}")
+async def legacy_get_result(task_id: str):
+    """Прежняя реализация: синхронные обращения к backend внутри event loop"""
+    celery_result = celery_app.AsyncResult(task_id)
+    status = celery_result.status
+    result = celery_result.result if status == "SUCCESS" else None
+    return {"task_id": task_id, "status": status, "result": result}
+
+def seed_result():
+    """Записывает завершенную задачу в result backend"""
+    meta = {
+        "task_id": TASK_ID,
+        "status": "SUCCESS",
+        "result": {"status": "completed", "result": "x" * 4096, "processing_time": 1.0}
+    }
+    get_redis().set(f"celery-task-meta-{TASK_ID}", json.dumps(meta))
+
+async def run_load(app, concurrency: int, duration: float) -> float:
+    """Возвращает число запросов в секунду при заданной конкурентности"""
+    transport = httpx.ASGITransport(app=app)
+    completed = 0
+    deadline = time.perf_counter() + duration
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker():
+            nonlocal completed
+            while time.perf_counter() < deadline:
+                response = await client.get(f"/result/{TASK_ID}")
+                response.raise_for_status()
+                completed += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return completed / elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark GET /result/{task_id}")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    seed_result()
+
+    for name, app in (("legacy", legacy_app), ("async", api_app)):
+        rps = asyncio.run(run_load(app, args.concurrency, args.duration))
+        print(f"{name:>8}: {rps:8.1f} req/s (concurrency={args.concurrency})")
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,7 @@ from typing import Generator, Dict, Any
 from unittest.mock import Mock, patch, MagicMock
 from fastapi.testclient import TestClient
 import tempfile
+import json
 import os
 
 # Импорты для тестирования
@@ -44,9 +45,10 @@ def mock_celery():
         mock_task.id = "test-task-id-123"
         mock.AsyncResult.return_value = mock_task
         
-        # Настройка mock для research_task.delay
+        # Настройка mock для research_task.delay / apply_async
         with patch('app.api.research_task') as mock_research:
             mock_research.delay.return_value = mock_task
+            mock_research.apply_async.return_value = mock_task
             yield mock
 
 
@@ -139,6 +141,36 @@ def mock_redis():
         yield mock_instance
 
 
+@pytest.fixture
+def fake_redis():
+    """In-memory Redis для тестов кешей и служебных структур"""
+    import fakeredis
+    from app import redis_client
+
+    server = fakeredis.FakeServer()
+    client = fakeredis.FakeRedis(server=server, decode_responses=True)
+    async_client = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    async_clients = {
+        (os.getpid(), settings.redis_url): async_client,
+        (os.getpid(), settings.celery_result_backend): async_client,
+        (os.getpid(), settings.redis_url, "pubsub"): async_client,
+    }
+
+    with patch.dict(redis_client._clients, {os.getpid(): client}, clear=True), \
+         patch.dict(redis_client._async_clients, async_clients, clear=True):
+        yield client
+
+
+@pytest.fixture(autouse=True)
+def clear_health_cache():
+    """Сбрасывает кеш /health между тестами"""
+    from app import api
+
+    api._health_cache.clear()
+    yield
+    api._health_cache.clear()
+
+
 @pytest.fixture(scope="session")
 def event_loop():
     """Создает event loop для асинхронных тестов"""
@@ -161,6 +193,14 @@ class TestHelpers:
         mock_result.info = {"progress": 100}
         return mock_result
     
+    @staticmethod
+    def store_task_meta(redis_client, task_id: str, status: str, result=None):
+        """Записывает метаданные задачи в формате Redis backend Celery"""
+        redis_client.set(
+            f"celery-task-meta-{task_id}",
+            json.dumps({"task_id": task_id, "status": status, "result": result})
+        )
+    
     @staticmethod
     def create_sample_crew_response():
         """Создает образец ответа от команды агентов"""
@@ -14,7 +14,7 @@ import json
 class TestCompleteResearchWorkflow:
     """Сквозные тесты полного цикла исследований"""
     
-    def test_complete_workflow_mock(self, client, mock_celery, mock_crew, helpers):
+    def test_complete_workflow_mock(self, client, mock_celery, mock_crew, fake_redis, helpers):
         """Тест полного workflow с моками"""
         
         # 1. Проверяем статус системы
@@ -36,10 +36,9 @@ class TestCompleteResearchWorkflow:
         task_id = create_data["task_id"]
         assert task_id is not None
         
-        # 3. Мокаем результат как SUCCESS
+        # 3. Записываем результат SUCCESS в result backend
         success_result = helpers.create_sample_crew_response()
-        mock_result = helpers.create_mock_task_result("SUCCESS", success_result)
-        mock_celery.AsyncResult.return_value = mock_result
+        helpers.store_task_meta(fake_redis, task_id, "SUCCESS", success_result)
         
         # 4. Получаем результат
         result_response = client.get(f"/result/{task_id}")
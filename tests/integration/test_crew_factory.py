@@ -6,7 +6,12 @@ Integration Tests - Crew Factory
 
 import pytest
 from unittest.mock import Mock, patch, MagicMock
-from app.main_crew import CrewFactory, run_research, create_dynamic_tasks
+from app import main_crew
+from app.crew_registry import get_crew_spec, get_crew_types
+from app.main_crew import (
+    CrewFactory, run_research, create_dynamic_tasks, apply_task_dependencies,
+    attach_checkpoints, attach_sections, restore_checkpoints
+)
 
 
 @pytest.mark.integration
@@ -38,6 +43,20 @@ class TestCrewFactory:
         mock_crew_class.assert_called_once()
         assert crew == mock_crew_instance
     
+    @patch('app.main_crew.Agent')
+    @patch('app.main_crew.Crew')
+    def test_agents_get_routed_models(self, mock_crew_class, mock_agent_class, mock_tools):
+        """Тест что агент оформления получает быструю модель, а аналитик - по глубине"""
+        factory = CrewFactory()
+
+        with patch('app.main_crew.get_llm') as get_llm, \
+             patch.object(main_crew.settings, "model_routing_enabled", True), \
+             patch.object(main_crew.settings, "gemini_fast_model", "flash"), \
+             patch.object(main_crew.settings, "gemini_deep_model", "pro"):
+            factory.create("general", depth="comprehensive")
+
+        assert [call.args[0] for call in get_llm.call_args_list] == ["pro", "flash"]
+    
     @patch('app.main_crew.Agent')
     @patch('app.main_crew.Crew')
     def test_create_business_analysis_crew(self, mock_crew_class, mock_agent_class, mock_llm, mock_tools):
@@ -81,6 +100,51 @@ class TestCrewFactory:
             assert mock_crew_class.called
 
 
+@pytest.mark.integration
+class TestWorkerWarmUp:
+    """Тесты прогрева процесса воркера"""
+
+    @patch('app.main_crew.Agent')
+    @patch('app.main_crew.Crew')
+    def test_warm_up_creates_clients_without_crews(self, mock_crew_class, mock_agent_class, mock_tools):
+        """Тест что прогрев создает клиентов всех моделей и инструменты, но не команды"""
+        with patch('app.main_crew.get_llm') as get_llm, \
+             patch.object(main_crew.settings, "model_routing_enabled", True), \
+             patch.object(main_crew.settings, "gemini_model", "standard"), \
+             patch.object(main_crew.settings, "gemini_fast_model", "flash"), \
+             patch.object(main_crew.settings, "gemini_deep_model", "pro"):
+            warmed = main_crew.warm_up()
+
+        assert warmed["models"] == ["flash", "pro", "standard"]
+        assert sorted(call.args[0] for call in get_llm.call_args_list) == warmed["models"]
+        mock_agent_class.assert_not_called()
+        mock_crew_class.assert_not_called()
+
+
+@pytest.mark.integration
+class TestCrewRegistry:
+    """Тесты сборки команд из декларативного реестра"""
+
+    @patch('app.main_crew.Agent')
+    @patch('app.main_crew.Crew')
+    def test_showcase_crew_from_registry(self, mock_crew_class, mock_agent_class, mock_llm, mock_tools):
+        """Тест что showcase команда собирается тем же путем, что и стандартные"""
+        main_crew.create_crew("swot_analysis")
+
+        roles = [call.kwargs["role"] for call in mock_agent_class.call_args_list]
+        assert roles == get_crew_spec("swot_analysis").info["agents"]
+        assert mock_crew_class.call_args.kwargs["verbose"] == 2
+
+    def test_showcase_tasks_use_topic_templates(self, mock_crew):
+        """Тест подстановки тикера в задачи инвестиционной команды"""
+        mock_crew.agents = [Mock(), Mock(), Mock()]
+
+        tasks = create_dynamic_tasks(mock_crew, "aapl", "investment_advisor", "ru", "standard")
+
+        assert len(tasks) == 3
+        assert all("AAPL" in task.description for task in tasks)
+
+
 @pytest.mark.integration
 class TestDynamicTasks:
     """Тесты создания динамических задач"""
@@ -147,6 +211,90 @@ class TestDynamicTasks:
                 elif depth == "comprehensive":
                     assert "исчерпывающий анализ" in task.description
 
+    def test_independent_tasks_run_async(self):
+        """Тест что независимые задачи запускаются параллельно, а синтез ждет их результатов"""
+        tasks = [Mock(context=None, async_execution=False) for _ in range(3)]
+
+        apply_task_dependencies(tasks, {2: [0, 1]}, mode="parallel")
+
+        # Задача 0 выполняется в фоне, пока синхронно идет задача 1
+        assert tasks[0].async_execution is True
+        assert tasks[1].async_execution is False
+        assert tasks[2].async_execution is False
+        assert tasks[2].context == [tasks[0], tasks[1]]
+
+    def test_dependent_chain_stays_sequential(self):
+        """Тест что цепочка зависимых задач выполняется последовательно"""
+        tasks = [Mock(context=None, async_execution=False) for _ in range(3)]
+
+        apply_task_dependencies(tasks, {1: [0], 2: [0, 1]}, mode="parallel")
+
+        assert not any(task.async_execution for task in tasks)
+        assert tasks[1].context == [tasks[0]]
+
+    def test_sequential_mode_keeps_tasks_unchanged(self):
+        """Тест что режим sequential не меняет задачи"""
+        tasks = [Mock(context=None, async_execution=False) for _ in range(3)]
+
+        apply_task_dependencies(tasks, {2: [0, 1]}, mode="sequential")
+
+        assert tasks[2].context is None
+        assert tasks[0].async_execution is False
+
+
+@pytest.mark.integration
+class TestCheckpointResume:
+    """Тесты продолжения исследования с контрольных точек"""
+    
+    def make_tasks(self, count):
+        return [Mock(description=f"Задача {index}", context=None, async_execution=False, output=None) for index in range(count)]
+    
+    def test_restore_skips_completed_tasks(self):
+        """Тест что завершенные задачи не запускаются, а их результат передается дальше"""
+        tasks = self.make_tasks(3)
+        tasks[0].async_execution = True
+        crew = Mock()
+        
+        remaining = restore_checkpoints(crew, tasks, {"task:0": "Собранные данные"})
+        
+        assert remaining == tasks[1:]
+        assert crew.tasks == tasks[1:]
+        assert tasks[0].output.raw_output == "Собранные данные"
+        assert tasks[0].async_execution is False
+        assert tasks[1].context == [tasks[0]]
+    
+    def test_completed_tasks_are_saved(self, fake_redis):
+        """Тест что результат завершенной задачи сохраняется и передается прогрессу"""
+        from crewai.tasks.task_output import TaskOutput
+        from app.checkpoints import load_checkpoints
+        
+        tasks = self.make_tasks(2)
+        progress_callback = Mock()
+        crew = Mock(task_callback=progress_callback)
+        
+        attach_checkpoints(crew, tasks, "task-1")
+        crew.task_callback(TaskOutput(description="Задача 1", raw_output="Анализ"))
+        
+        assert load_checkpoints("task-1") == {"task:1": "Анализ"}
+        progress_callback.assert_called_once()
+    
+    def test_completed_tasks_become_sections(self, fake_redis):
+        """Тест что результат завершенной задачи сразу доступен как раздел отчета"""
+        from crewai.tasks.task_output import TaskOutput
+        from app.sections import parse_sections, SECTIONS_PREFIX
+        
+        tasks = self.make_tasks(2)
+        tasks[1].agent.role = "Бизнес-аналитик"
+        crew = Mock(task_callback=None)
+        
+        attach_sections(crew, tasks, "task-1")
+        crew.task_callback(TaskOutput(description="Задача 1", raw_output="Анализ рынка"))
+        
+        sections = parse_sections(fake_redis.hgetall(f"{SECTIONS_PREFIX}task-1"))
+        assert sections[0]["index"] == 1
+        assert sections[0]["title"] == "Бизнес-аналитик"
+        assert sections[0]["output"] == "Анализ рынка"
+
 
 @pytest.mark.integration
 class TestResearchExecution:
@@ -158,7 +306,7 @@ class TestResearchExecution:
         # Мокаем фабрику и команду
         mock_crew = Mock()
         mock_crew.kickoff.return_value = "Test research result"
-        mock_factory.create_general_crew.return_value = mock_crew
+        mock_factory.create.return_value = mock_crew
         
         result = run_research(
             topic="Test research topic",
@@ -168,15 +316,16 @@ class TestResearchExecution:
         )
         
         assert result == "Test research result"
-        mock_factory.create_general_crew.assert_called_once()
+        mock_factory.create.assert_called_once_with("general")
         mock_crew.kickoff.assert_called_once()
     
+    @patch('app.main_crew.settings.map_reduce_enabled', False)
     @patch('app.main_crew.crew_factory')
     def test_run_research_business_analysis(self, mock_factory, mock_llm, mock_tools):
         """Тест запуска бизнес-анализа"""
         mock_crew = Mock()
         mock_crew.kickoff.return_value = "Business analysis result"
-        mock_factory.create_business_analysis_crew.return_value = mock_crew
+        mock_factory.create.return_value = mock_crew
         
         result = run_research(
             topic="Market analysis",
@@ -186,14 +335,14 @@ class TestResearchExecution:
         )
         
         assert result == "Business analysis result"
-        mock_factory.create_business_analysis_crew.assert_called_once()
+        mock_factory.create.assert_called_once_with("business_analysis")
     
     @patch('app.main_crew.crew_factory')
     def test_run_research_invalid_crew_type(self, mock_factory, mock_llm, mock_tools):
         """Тест запуска с недопустимым типом команды"""
         mock_crew = Mock()
         mock_crew.kickoff.return_value = "Default crew result"
-        mock_factory.create_general_crew.return_value = mock_crew
+        mock_factory.create.return_value = mock_crew
         
         result = run_research(
             topic="Test topic",
@@ -202,14 +351,37 @@ class TestResearchExecution:
         
         # Должна использоваться общая команда по умолчанию
         assert result == "Default crew result"
-        mock_factory.create_general_crew.assert_called_once()
+        mock_factory.create.assert_called_once_with("general")
     
     @patch('app.main_crew.crew_factory')
     def test_run_research_error_handling(self, mock_factory, mock_llm, mock_tools):
         """Тест обработки ошибок при выполнении исследования"""
         mock_crew = Mock()
         mock_crew.kickoff.side_effect = Exception("Research execution failed")
-        mock_factory.create_general_crew.return_value = mock_crew
+        mock_factory.create.return_value = mock_crew
         
         with pytest.raises(Exception, match="Research execution failed"):
             run_research(topic="Test topic")
+    
+    @patch('app.main_crew.crew_factory')
+    def test_run_research_cancelled_keeps_partial_output(self, mock_factory, mock_llm, mock_tools):
+        """Тест что отмена возвращает результаты завершенных задач"""
+        from crewai.tasks.task_output import TaskOutput
+        from app.cancellation import TaskCancelled
+        
+        mock_crew = Mock()
+        mock_crew.tasks = [Mock(output=None), Mock(output=None)]  # Сбор данных + отчет
+        
+        def kickoff():
+            first = mock_crew.tasks[0]
+            first.output = TaskOutput(description="Сбор данных", raw_output="Собранные данные")
+            raise TaskCancelled("task-1")
+        
+        mock_crew.kickoff.side_effect = kickoff
+        mock_factory.create.return_value = mock_crew
+        
+        with patch('app.main_crew.create_dynamic_tasks', return_value=mock_crew.tasks):
+            with pytest.raises(TaskCancelled) as exc_info:
+                run_research(topic="Test topic")
+        
+        assert exc_info.value.partial_output == "Собранные данные"
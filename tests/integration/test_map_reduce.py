@@ -0,0 +1,131 @@
+"""
+Integration Tests - Map-Reduce Research
+=======================================
+Интеграционные тесты comprehensive-исследования в режиме map-reduce
+"""
+
+import json
+
+import pytest
+from unittest.mock import Mock, patch
+
+from app.checkpoints import load_checkpoints, save_checkpoint
+from app.crew_registry import get_crew_spec
+from app.map_reduce import (
+    PLAN_CHECKPOINT, parse_subtopics, plan_subtopics, run_map_reduce_research, subtopic_checkpoint_key
+)
+
+
+@pytest.mark.integration
+class TestPlanner:
+    """Тесты планировщика подтем"""
+
+    def test_parse_numbered_list(self):
+        """Тест разбора нумерованного списка с повторами"""
+        text = "1. Рынок\n2) Конкуренты\n- рынок\n\n• Регулирование"
+
+        assert parse_subtopics(text, limit=5) == ["Рынок", "Конкуренты", "Регулирование"]
+
+    def test_parse_respects_limit(self):
+        """Тест ограничения количества подтем"""
+        assert parse_subtopics("A\nB\nC", limit=2) == ["A", "B"]
+
+    def test_empty_plan_falls_back_to_topic(self, mock_llm):
+        """Тест что пустой ответ планировщика дает исходную тему"""
+        mock_llm.invoke.return_value = Mock(content="")
+
+        assert plan_subtopics("Электромобили", "general", "ru", limit=3) == ["Электромобили"]
+
+
+@pytest.mark.integration
+class TestMapReduceExecution:
+    """Тесты выполнения map-reduce исследования"""
+
+    @patch('app.map_reduce.reduce_findings', return_value="Итоговый отчет")
+    @patch('app.map_reduce.research_subtopic')
+    @patch('app.map_reduce.plan_subtopics', return_value=["A", "B", "C"])
+    def test_subtopics_are_reduced_in_plan_order(self, mock_plan, mock_map, mock_reduce):
+        """Тест что результаты всех подтем передаются редьюсеру в порядке плана"""
+        mock_map.side_effect = lambda subtopic, *args: f"result {subtopic}"
+        events = []
+
+        result = run_map_reduce_research("Тема", "general", "ru", progress=lambda meta, force=False: events.append(meta))
+
+        assert result == "Итоговый отчет"
+        findings = mock_reduce.call_args[0][3]
+        assert findings == [("A", "result A"), ("B", "result B"), ("C", "result C")]
+        assert events[-1]["current"] == 85
+
+    @patch('app.map_reduce.reduce_findings', return_value="Итоговый отчет")
+    @patch('app.map_reduce.research_subtopic')
+    @patch('app.map_reduce.plan_subtopics', return_value=["A", "B"])
+    def test_failed_subtopic_is_skipped(self, mock_plan, mock_map, mock_reduce):
+        """Тест что ошибка одной подтемы не прерывает исследование"""
+        def research(subtopic, *args):
+            if subtopic == "A":
+                raise RuntimeError("search failed")
+            return "result B"
+        mock_map.side_effect = research
+
+        run_map_reduce_research("Тема", "general", "ru")
+
+        assert mock_reduce.call_args[0][3] == [("B", "result B")]
+
+    @patch('app.map_reduce.research_subtopic', side_effect=RuntimeError("search failed"))
+    @patch('app.map_reduce.plan_subtopics', return_value=["A"])
+    def test_all_subtopics_failed(self, mock_plan, mock_map):
+        """Тест ошибки, если ни одна подтема не исследована"""
+        with pytest.raises(RuntimeError):
+            run_map_reduce_research("Тема", "general", "ru")
+
+    @patch('app.map_reduce.reduce_findings', return_value="Итоговый отчет")
+    @patch('app.map_reduce.research_subtopic', return_value="result B")
+    @patch('app.map_reduce.plan_subtopics')
+    def test_resume_skips_researched_subtopics(self, mock_plan, mock_map, mock_reduce, fake_redis):
+        """Тест что повторный запуск исследует только оставшиеся подтемы"""
+        save_checkpoint("task-1", PLAN_CHECKPOINT, json.dumps(["A", "B"]))
+        save_checkpoint("task-1", subtopic_checkpoint_key("A"), "result A")
+
+        run_map_reduce_research("Тема", "general", "ru", task_id="task-1")
+
+        mock_plan.assert_not_called()
+        assert [call.args[0] for call in mock_map.call_args_list] == ["B"]
+        assert mock_reduce.call_args[0][3] == [("A", "result A"), ("B", "result B")]
+        assert load_checkpoints("task-1")[subtopic_checkpoint_key("B")] == "result B"
+
+
+@pytest.mark.integration
+class TestSubtopicAgents:
+    """Тесты сборки агентов map и reduce"""
+
+    @patch('app.main_crew.Agent')
+    @patch('app.main_crew.Crew')
+    def test_subtopic_builds_single_agent(self, mock_crew_class, mock_agent_class, mock_llm, mock_tools):
+        """Тест что подтема исследуется одним агентом, без сборки всей команды"""
+        from app.map_reduce import research_subtopic
+
+        with patch('app.map_reduce.Crew') as mock_map_crew, patch('app.map_reduce.Task'):
+            research_subtopic("Рынок", "Тема", "business_analysis", "ru")
+
+        assert mock_agent_class.call_count == 1
+        assert mock_agent_class.call_args.kwargs["role"] == get_crew_spec("business_analysis").agents[0].role
+        mock_crew_class.assert_not_called()
+        assert mock_map_crew.call_args.kwargs["agents"] == [mock_agent_class.return_value]
+
+    @patch('app.main_crew.Agent')
+    def test_planner_and_synthesizer_use_analysis_model(self, mock_agent_class, mock_tools):
+        """Тест что планировщик и сведение подтем идут на модель comprehensive-анализа, а не на быструю"""
+        from app import main_crew
+        from app.map_reduce import reduce_findings
+
+        with patch('app.main_crew.get_llm') as get_llm, \
+             patch('app.map_reduce.Crew'), patch('app.map_reduce.Task'), \
+             patch.object(main_crew.settings, "model_routing_enabled", True), \
+             patch.object(main_crew.settings, "gemini_fast_model", "flash"), \
+             patch.object(main_crew.settings, "gemini_deep_model", "pro"):
+            get_llm.return_value.invoke.return_value = Mock(content="A\nB")
+            plan_subtopics("Тема", "general", "ru", limit=2)
+            reduce_findings("Тема", "general", "ru", [("A", "result A")])
+
+        assert [call.args[0] for call in get_llm.call_args_list] == ["pro", "pro"]
+        assert mock_agent_class.call_args.kwargs["role"] == get_crew_spec("general").agents[-1].role
@@ -122,11 +122,9 @@ class TestResearchEndpoint:
 class TestResultEndpoint:
     """Тесты эндпоинта получения результатов"""
     
-    def test_get_result_pending(self, client, mock_celery, helpers):
+    def test_get_result_pending(self, client, fake_redis):
         """Тест получения результата PENDING задачи"""
         task_id = "test-task-pending"
-        mock_result = helpers.create_mock_task_result("PENDING", None)
-        mock_celery.AsyncResult.return_value = mock_result
         
         response = client.get(f"/result/{task_id}")
         
@@ -135,11 +133,22 @@ class TestResultEndpoint:
         assert data["status"] == "PENDING"
         assert data["progress"] == 0
     
-    def test_get_result_success(self, client, mock_celery, helpers):
+    def test_get_result_progress(self, client, fake_redis, helpers):
+        """Тест получения прогресса выполняющейся задачи"""
+        task_id = "test-task-progress"
+        helpers.store_task_meta(fake_redis, task_id, "PROGRESS", {"current": 25, "total": 100})
+        
+        response = client.get(f"/result/{task_id}")
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "PROGRESS"
+        assert data["progress"] == 25
+    
+    def test_get_result_success(self, client, fake_redis, helpers):
         """Тест получения успешного результата"""
         task_id = "test-task-success"
-        mock_result = helpers.create_mock_task_result("SUCCESS", helpers.create_sample_crew_response())
-        mock_celery.AsyncResult.return_value = mock_result
+        helpers.store_task_meta(fake_redis, task_id, "SUCCESS", helpers.create_sample_crew_response())
         
         response = client.get(f"/result/{task_id}")
         
@@ -148,13 +157,16 @@ class TestResultEndpoint:
         assert data["status"] == "SUCCESS"
         assert data["progress"] == 100
         assert data["result"] is not None
+        assert data["processing_time"] == 45.67
     
-    def test_get_result_failure(self, client, mock_celery, helpers):
+    def test_get_result_failure(self, client, fake_redis, helpers):
         """Тест получения результата с ошибкой"""
         task_id = "test-task-failure"
-        mock_result = helpers.create_mock_task_result("FAILURE", None)
-        mock_result.info = "Test error message"
-        mock_celery.AsyncResult.return_value = mock_result
+        helpers.store_task_meta(fake_redis, task_id, "FAILURE", {
+            "exc_type": "ValueError",
+            "exc_message": ["Test error message"],
+            "exc_module": "builtins"
+        })
         
         response = client.get(f"/result/{task_id}")
         
@@ -163,12 +175,12 @@ class TestResultEndpoint:
         assert data["status"] == "FAILURE"
         assert data["error"] == "Test error message"
     
-    def test_get_result_nonexistent_task(self, client, mock_celery):
-        """Тест получения результата несуществующей задачи"""
+    def test_get_result_backend_error(self, client):
+        """Тест ошибки чтения result backend"""
         task_id = "nonexistent-task"
-        mock_celery.AsyncResult.side_effect = Exception("Task not found")
         
-        response = client.get(f"/result/{task_id}")
+        with patch('app.api.read_task_meta', side_effect=Exception("Backend unavailable")):
+            response = client.get(f"/result/{task_id}")
         
         assert response.status_code == 500
 
@@ -177,8 +189,8 @@ class TestResultEndpoint:
 class TestTaskManagement:
     """Тесты управления задачами"""
     
-    def test_cancel_task(self, client, mock_celery):
-        """Тест отмены задачи"""
+    def test_cancel_task(self, client, mock_celery, fake_redis):
+        """Тест кооперативной отмены задачи"""
         task_id = "test-task-to-cancel"
         
         response = client.delete(f"/task/{task_id}")
@@ -186,7 +198,15 @@ class TestTaskManagement:
         assert response.status_code == 200
         data = response.json()
         assert data["status"] == "cancelled"
-        mock_celery.control.revoke.assert_called_once_with(task_id, terminate=True)
+        assert fake_redis.exists(f"cancel:{task_id}")
+        mock_celery.control.revoke.assert_called_once_with(task_id, terminate=False)
+    
+    def test_cancel_task_terminate(self, client, mock_celery, fake_redis):
+        """Тест принудительной отмены задачи"""
+        response = client.delete("/task/test-task-to-cancel", params={"terminate": "true"})
+        
+        assert response.status_code == 200
+        mock_celery.control.revoke.assert_called_once_with("test-task-to-cancel", terminate=True)
     
     def test_list_active_tasks(self, client, mock_celery):
         """Тест получения списка активных задач"""
@@ -0,0 +1,140 @@
+"""
+Unit Tests - Batch Research
+===========================
+Тесты POST /research/batch и сводного прогресса пакета
+"""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from app.batches import BATCH_PREFIX
+from app.coalescing import canonical_request_key
+from app.result_store import save_result
+from app.tasks import PRIORITY_LEVELS
+
+
+@pytest.fixture
+def mock_group():
+    """Мок celery.group в API"""
+    with patch('app.api.group') as mock:
+        yield mock
+
+
+def batch_items(*topics):
+    return [{"topic": topic, "crew_type": "general", "language": "ru", "depth": "standard"} for topic in topics]
+
+
+@pytest.mark.unit
+class TestBatchSubmission:
+    """Тесты постановки пакета в очередь"""
+
+    def test_batch_enqueued_as_one_group(self, client, mock_celery, mock_group, fake_redis):
+        """Тест что новые задачи пакета отправляются одной группой"""
+        from app import api
+
+        response = client.post("/research/batch", json={"items": batch_items("Тема номер один", "Тема номер два")})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 2
+        assert data["enqueued"] == 2
+        assert data["batch_id"].startswith("batch_")
+
+        signatures = mock_group.call_args[0][0]
+        assert len(signatures) == 2
+        mock_group.return_value.apply_async.assert_called_once_with(task_id=data["batch_id"])
+        assert api.research_task.signature.call_args.kwargs["priority"] == PRIORITY_LEVELS["low"]
+        api.research_task.apply_async.assert_not_called()
+
+    def test_duplicates_within_batch_share_task(self, client, mock_celery, mock_group, fake_redis):
+        """Тест что одинаковые запросы пакета выполняются одной задачей"""
+        data = client.post(
+            "/research/batch",
+            json={"items": batch_items("Рынок ИИ 2024", "  рынок ии   2024 ", "Другая тема")}
+        ).json()
+
+        assert data["enqueued"] == 2
+        assert data["duplicates"] == 1
+        first, duplicate, _ = data["items"]
+        assert duplicate["task_id"] == first["task_id"]
+        assert duplicate["duplicate_of"] == 0
+
+    def test_cached_results_are_not_enqueued(self, client, mock_celery, mock_group, fake_redis, helpers):
+        """Тест что свежие сохраненные результаты не ставятся в очередь"""
+        item = batch_items("Уже исследованная тема")[0]
+        save_result(canonical_request_key(**item), "task-done", helpers.create_sample_crew_response(), ttl=60)
+
+        data = client.post("/research/batch", json={"items": [item]}).json()
+
+        assert data["cached"] == 1
+        assert data["enqueued"] == 0
+        assert data["items"][0]["task_id"] == "task-done"
+        mock_group.assert_not_called()
+
+    def test_batch_size_limit(self, client, mock_celery, mock_group, fake_redis):
+        """Тест ограничения размера пакета"""
+        with patch('app.api.settings.batch_max_items', 1):
+            response = client.post("/research/batch", json={"items": batch_items("Тема номер один", "Тема номер два")})
+
+        assert response.status_code == 400
+        mock_group.assert_not_called()
+
+    def test_group_failure_releases_inflight(self, client, mock_celery, mock_group, fake_redis):
+        """Тест что при ошибке отправки группы регистрация задач снимается"""
+        mock_group.return_value.apply_async.side_effect = ConnectionError("broker down")
+
+        response = client.post("/research/batch", json={"items": batch_items("Тема номер один")})
+
+        assert response.status_code == 500
+        assert not fake_redis.keys("inflight:*")
+
+
+@pytest.mark.unit
+class TestBatchProgress:
+    """Тесты сводного прогресса и результатов пакета"""
+
+    def test_aggregate_progress(self, client, mock_celery, mock_group, fake_redis, helpers):
+        """Тест сводного прогресса по состояниям задач"""
+        batch = client.post("/research/batch", json={"items": batch_items("Тема номер один", "Тема номер два")}).json()
+        first, second = (item["task_id"] for item in batch["items"])
+        helpers.store_task_meta(fake_redis, first, "SUCCESS", helpers.create_sample_crew_response())
+        helpers.store_task_meta(fake_redis, second, "PROGRESS", {"current": 50})
+
+        data = client.get(f"/research/batch/{batch['batch_id']}").json()
+
+        assert data["status"] == "running"
+        assert data["progress"] == 75
+        assert data["completed"] == 1
+        assert data["states"] == {"SUCCESS": 1, "PROGRESS": 1}
+        assert "result" not in data["items"][0]
+
+    def test_combined_result(self, client, mock_celery, mock_group, fake_redis, helpers):
+        """Тест сводных результатов завершенного пакета"""
+        batch = client.post("/research/batch", json={"items": batch_items("Тема номер один", "Тема номер два")}).json()
+        first, second = (item["task_id"] for item in batch["items"])
+        helpers.store_task_meta(fake_redis, first, "SUCCESS", helpers.create_sample_crew_response())
+        helpers.store_task_meta(
+            fake_redis, second, "FAILURE",
+            {"exc_type": "RuntimeError", "exc_message": ["LLM недоступна"]}
+        )
+
+        data = client.get(f"/research/batch/{batch['batch_id']}/result").json()
+
+        assert data["status"] == "completed"
+        assert data["items"][0]["result"]["status"] == "completed"
+        assert data["items"][1]["error"] == "LLM недоступна"
+
+    def test_unknown_batch(self, client, fake_redis):
+        """Тест несуществующего пакета"""
+        response = client.get("/research/batch/batch_missing")
+
+        assert response.status_code == 404
+
+    def test_batch_record_is_saved(self, client, mock_celery, mock_group, fake_redis):
+        """Тест что состав пакета сохраняется в Redis"""
+        batch = client.post("/research/batch", json={"items": batch_items("Тема номер один")}).json()
+
+        record = json.loads(fake_redis.get(f"{BATCH_PREFIX}{batch['batch_id']}"))
+        assert [item["task_id"] for item in record["items"]] == [batch["items"][0]["task_id"]]
@@ -0,0 +1,154 @@
+"""
+Unit Tests - Report Blob Store
+==============================
+Тесты хранилища больших отчетов и эндпоинта /result/{task_id}/report
+"""
+
+import json
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+
+from app.blob_store import blob_path, load_report, offload_report, prune_blobs, put_blob, read_blob
+from app.coalescing import canonical_request_key
+from app.config import settings
+from app.result_store import save_result
+
+
+@pytest.fixture
+def blob_dir(tmp_path, monkeypatch):
+    """Хранилище blob во временном каталоге с маленьким порогом"""
+    monkeypatch.setattr(settings, "blob_store_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "blob_store_threshold", 100)
+    monkeypatch.setattr(settings, "blob_store_enabled", True)
+    return tmp_path
+
+
+@pytest.mark.unit
+class TestBlobStore:
+    """Тесты content-addressed хранилища"""
+
+    def test_put_and_read(self, blob_dir):
+        """Тест что данные хранятся сжатыми и читаются без изменений"""
+        data = ("# Отчет\n" + "строка отчета\n" * 1000).encode("utf-8")
+
+        digest = put_blob(data)
+
+        assert read_blob(digest) == data
+        assert blob_path(digest).stat().st_size < len(data)
+
+    def test_same_content_stored_once(self, blob_dir):
+        """Тест что одинаковые отчеты хранятся в одном blob"""
+        assert put_blob(b"report" * 100) == put_blob(b"report" * 100)
+        assert len(list(blob_dir.rglob("*.gz"))) == 1
+
+    def test_small_report_stays_inline(self, blob_dir, helpers):
+        """Тест что короткий отчет остается в результате задачи"""
+        response = helpers.create_sample_crew_response()
+
+        assert offload_report(response) == response
+
+    def test_large_report_is_offloaded(self, blob_dir, helpers):
+        """Тест что большой отчет заменяется ссылкой"""
+        response = {**helpers.create_sample_crew_response(), "result": "Анализ рынка. " * 100}
+
+        offloaded = offload_report(response)
+
+        assert offloaded["result"] is None
+        assert offloaded["report_ref"]["size"] == len(response["result"].encode("utf-8"))
+        assert load_report(offloaded)["result"] == response["result"]
+
+    def test_prune_removes_expired_blobs(self, blob_dir):
+        """Тест что очистка удаляет только blob старше max_age"""
+        old = put_blob(b"old report" * 100)
+        fresh = put_blob(b"fresh report" * 100)
+        expired = time.time() - 3600
+        os.utime(blob_path(old), (expired, expired))
+
+        assert prune_blobs(max_age=60) == 1
+        assert not blob_path(old).exists()
+        assert blob_path(fresh).exists()
+
+    def test_rewrite_extends_blob_life(self, blob_dir):
+        """Тест что повторная запись того же отчета продлевает жизнь blob"""
+        digest = put_blob(b"report" * 100)
+        expired = time.time() - 3600
+        os.utime(blob_path(digest), (expired, expired))
+
+        put_blob(b"report" * 100)
+
+        assert prune_blobs(max_age=60) == 0
+
+
+@pytest.mark.unit
+class TestReportEndpoints:
+    """Тесты выдачи вынесенных отчетов через API"""
+
+    def test_report_is_streamed(self, client, fake_redis, blob_dir, helpers):
+        """Тест что /report отдает распакованный отчет"""
+        report = "# Отчет\n" + "Вывод исследования. " * 200
+        result = offload_report({**helpers.create_sample_crew_response(), "result": report})
+        helpers.store_task_meta(fake_redis, "task-big", "SUCCESS", result)
+
+        response = client.get("/result/task-big/report")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/markdown")
+        assert response.text == report
+
+    def test_result_inlines_report(self, client, fake_redis, blob_dir, helpers):
+        """Тест что /result подставляет отчет, а include_report=false оставляет ссылку"""
+        report = "Вывод исследования. " * 200
+        result = offload_report({**helpers.create_sample_crew_response(), "result": report})
+        helpers.store_task_meta(fake_redis, "task-big", "SUCCESS", result)
+
+        assert client.get("/result/task-big").json()["result"]["result"] == report
+
+        data = client.get("/result/task-big", params={"include_report": "false"}).json()
+        assert data["result"]["result"] is None
+        assert data["result"]["report_ref"]["digest"] == result["report_ref"]["digest"]
+
+    def test_cached_submission_inlines_report(self, client, mock_celery, fake_redis, blob_dir, helpers,
+                                              sample_research_data):
+        """Тест что сохраненный результат POST /research содержит отчет, а не пустой result"""
+        report = "Вывод исследования. " * 200
+        request_data = sample_research_data["basic_request"]
+        result = offload_report({**helpers.create_sample_crew_response(), "result": report})
+        save_result(canonical_request_key(**request_data), "task-big", result, ttl=60)
+
+        data = client.post("/research", json=request_data).json()
+
+        assert data["cached"] is True
+        assert data["result"]["result"] == report
+
+    def test_batch_result_inlines_report(self, client, mock_celery, fake_redis, blob_dir, helpers):
+        """Тест что результаты пакета содержат вынесенные отчеты"""
+        report = "Вывод исследования. " * 200
+        item = {"topic": "Уже исследованная тема", "crew_type": "general", "language": "ru", "depth": "standard"}
+        result = offload_report({**helpers.create_sample_crew_response(), "result": report})
+        save_result(canonical_request_key(**item), "task-big", result, ttl=60)
+
+        with patch('app.api.group'):
+            batch_id = client.post("/research/batch", json={"items": [item]}).json()["batch_id"]
+        data = client.get(f"/research/batch/{batch_id}/result").json()
+
+        assert data["items"][0]["result"]["result"] == report
+
+    def test_stream_final_event_inlines_report(self, client, fake_redis, blob_dir, helpers):
+        """Тест что финальное событие SSE содержит вынесенный отчет"""
+        report = "Вывод исследования. " * 200
+        result = offload_report({**helpers.create_sample_crew_response(), "result": report})
+        helpers.store_task_meta(fake_redis, "task-big", "SUCCESS", result)
+
+        body = client.get("/result/task-big/stream").text
+
+        event = json.loads(body.split("data: ", 1)[1].split("\n", 1)[0])
+        assert event["result"]["result"] == report
+
+    def test_report_of_unfinished_task(self, client, fake_redis):
+        """Тест что для незавершенной задачи отчета нет"""
+        response = client.get("/result/task-pending/report")
+
+        assert response.status_code == 404
@@ -0,0 +1,106 @@
+"""
+Unit Tests - Response Caches
+============================
+Тесты Redis-кешей ответов LLM и результатов поиска
+"""
+
+import pytest
+from langchain_core.outputs import Generation
+
+from app.cache import (
+    QueryMemo,
+    RedisLLMCache,
+    SearchCache,
+    get_cache_stats,
+    normalize_query,
+    query_memo,
+    search_scope,
+)
+
+
+@pytest.mark.unit
+class TestRedisLLMCache:
+    """Тесты кеша ответов LLM"""
+
+    def test_miss_then_hit(self, fake_redis):
+        """Тест промаха и последующего попадания"""
+        cache = RedisLLMCache(ttl=60, max_entries=10)
+
+        assert cache.lookup("prompt", "gemini-pro:0.1") is None
+        cache.update("prompt", "gemini-pro:0.1", [Generation(text="answer")])
+
+        cached = cache.lookup("prompt", "gemini-pro:0.1")
+        assert cached[0].text == "answer"
+        assert cache.stats.hits == 1
+        assert cache.stats.misses == 1
+
+    def test_key_depends_on_model_parameters(self, fake_redis):
+        """Тест что другая модель или temperature не попадают в кеш"""
+        cache = RedisLLMCache(ttl=60, max_entries=10)
+        cache.update("prompt", "gemini-pro:0.1", [Generation(text="answer")])
+
+        assert cache.lookup("prompt", "gemini-pro:0.7") is None
+        assert cache.lookup("other prompt", "gemini-pro:0.1") is None
+
+    def test_entries_expire(self, fake_redis):
+        """Тест что записи сохраняются с TTL"""
+        cache = RedisLLMCache(ttl=60, max_entries=10)
+        cache.update("prompt", "llm", [Generation(text="answer")])
+
+        key = cache._key("prompt", "llm")
+        assert 0 < fake_redis.ttl(key) <= 60
+
+    def test_eviction_keeps_size_bounded(self, fake_redis):
+        """Тест вытеснения самых давно использованных записей"""
+        cache = RedisLLMCache(ttl=60, max_entries=2)
+
+        for i in range(3):
+            cache.update(f"prompt-{i}", "llm", [Generation(text=str(i))])
+
+        assert fake_redis.zcard(cache.index_key) == 2
+        assert cache.lookup("prompt-0", "llm") is None
+        assert cache.lookup("prompt-2", "llm")[0].text == "2"
+
+    def test_stats_are_shared_through_redis(self, fake_redis):
+        """Тест агрегированной статистики кешей"""
+        cache = RedisLLMCache(ttl=60, max_entries=10)
+        cache.lookup("prompt", "llm")
+        cache.update("prompt", "llm", [Generation(text="answer")])
+        cache.lookup("prompt", "llm")
+
+        stats = get_cache_stats()
+        assert stats["llm-cache"] == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+
+
+@pytest.mark.unit
+class TestSearchCaches:
+    """Тесты кешей поисковых запросов"""
+
+    def test_normalize_query(self):
+        """Тест нормализации поискового запроса"""
+        assert normalize_query("  Рынок   электромобилей 2024? ") == "рынок электромобилей 2024"
+
+    def test_search_cache_uses_normalized_key(self, fake_redis):
+        """Тест что похожие запросы попадают в одну запись"""
+        cache = SearchCache(ttl=60)
+        cache.set("Electric cars market", "results")
+
+        assert cache.get("electric   cars market?") == "results"
+        assert cache.stats.hits == 1
+
+    def test_query_memo_is_scoped_to_kickoff(self, fake_redis):
+        """Тест что мемо очищается после запуска команды"""
+        with search_scope() as memo:
+            memo.set("query", "results")
+            assert query_memo.get("QUERY") == "results"
+
+        assert query_memo.get("query") is None
+
+    def test_query_memo_counts_hits_and_misses(self, fake_redis):
+        """Тест счетчиков мемо"""
+        memo = QueryMemo()
+        memo.get("query")
+        memo.set("query", "results")
+        memo.get("query")
+
+        assert memo.stats.as_dict() == {"hits": 1, "misses": 1, "hit_rate": 0.5}
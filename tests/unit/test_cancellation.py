@@ -0,0 +1,77 @@
+"""
+Unit Tests - Cooperative Cancellation
+=====================================
+Тесты флага отмены, контрольных точек и результата отмененной задачи
+"""
+
+import pytest
+
+from app.cancellation import (
+    CancellationToken, TaskCancelled, cancel_scope, check_cancelled, checkpoint, request_cancel
+)
+
+
+@pytest.mark.unit
+class TestCancellationCheckpoints:
+    """Тесты контрольных точек отмены"""
+
+    def test_checkpoint_outside_scope(self, fake_redis):
+        """Тест что вне задачи контрольная точка ничего не делает"""
+        request_cancel("task-1", ttl=60)
+
+        check_cancelled()
+
+    def test_checkpoint_raises_after_cancel(self, fake_redis):
+        """Тест что шаг агента после отмены прерывает задачу"""
+        steps = []
+        on_step = checkpoint(steps.append)
+
+        with cancel_scope(CancellationToken("task-1")):
+            on_step("step-1")
+            request_cancel("task-1", ttl=60)
+            with pytest.raises(TaskCancelled):
+                on_step("step-2")
+
+        assert steps == ["step-1", "step-2"]
+
+    def test_cancelled_token_does_not_poll_redis(self, fake_redis):
+        """Тест что отмена запоминается токеном"""
+        token = CancellationToken("task-1")
+        request_cancel("task-1", ttl=60)
+        with pytest.raises(TaskCancelled):
+            token.check()
+
+        fake_redis.flushall()
+        with pytest.raises(TaskCancelled):
+            token.check()
+
+    def test_redis_errors_do_not_cancel(self, monkeypatch):
+        """Тест что недоступный Redis не прерывает исследование"""
+        import redis
+        from app import cancellation
+
+        def unavailable(task_id):
+            raise redis.ConnectionError("down")
+
+        monkeypatch.setattr(cancellation, "is_cancel_requested", unavailable)
+
+        CancellationToken("task-1").check()
+
+
+@pytest.mark.unit
+class TestCancelledResult:
+    """Тесты выдачи результата отмененной задачи"""
+
+    def test_partial_result_of_revoked_task(self, client, fake_redis, helpers):
+        """Тест что /result отдает частичный результат отмененной задачи"""
+        helpers.store_task_meta(fake_redis, "task-cancelled", "REVOKED", {
+            "status": "cancelled",
+            "result": "## Исследование рынка\nЧастичные выводы",
+            "message": "Исследование отменено"
+        })
+
+        data = client.get("/result/task-cancelled").json()
+
+        assert data["status"] == "REVOKED"
+        assert data["result"]["status"] == "cancelled"
+        assert data["result"]["result"].startswith("## Исследование рынка")
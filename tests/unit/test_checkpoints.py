@@ -0,0 +1,37 @@
+"""
+Unit Tests - Crew Checkpoints
+=============================
+Тесты хранилища контрольных точек исследований
+"""
+
+import pytest
+
+from app.checkpoints import CHECKPOINT_PREFIX, clear_checkpoints, load_checkpoints, save_checkpoint
+from app.config import settings
+
+
+@pytest.mark.unit
+class TestCheckpointStore:
+    """Тесты сохранения и загрузки контрольных точек"""
+
+    def test_save_and_load(self, fake_redis):
+        """Тест что результаты шагов сохраняются по task_id"""
+        save_checkpoint("task-1", "task:0", "Собранные данные")
+        save_checkpoint("task-1", "task:1", "Анализ")
+
+        assert load_checkpoints("task-1") == {"task:0": "Собранные данные", "task:1": "Анализ"}
+        assert load_checkpoints("task-2") == {}
+
+    def test_checkpoints_expire(self, fake_redis):
+        """Тест что контрольные точки хранятся ограниченное время"""
+        save_checkpoint("task-1", "task:0", "Собранные данные")
+
+        assert 0 < fake_redis.ttl(f"{CHECKPOINT_PREFIX}task-1") <= settings.checkpoint_ttl
+
+    def test_clear(self, fake_redis):
+        """Тест удаления контрольных точек завершенной задачи"""
+        save_checkpoint("task-1", "task:0", "Собранные данные")
+
+        clear_checkpoints("task-1")
+
+        assert load_checkpoints("task-1") == {}
@@ -0,0 +1,190 @@
+"""
+Unit Tests - LLM Circuit Breaker
+================================
+Тесты общего предохранителя вызовов LLM и переключения на резервную модель
+"""
+
+import time
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import pytest
+
+from app import circuit_breaker
+from app.circuit_breaker import (
+    PERMIT_CLOSED, PERMIT_PROBE, CircuitBreaker, CircuitOpenError, get_circuit_breaker, protected
+)
+
+
+class ServiceUnavailable(Exception):
+    """Имя совпадает с google.api_core.exceptions.ServiceUnavailable (503)"""
+
+
+@pytest.fixture
+def breaker(fake_redis):
+    return CircuitBreaker(
+        "test", error_threshold=0.5, slow_call_threshold=10, slow_call_rate=0.5,
+        min_calls=4, window=60, open_duration=30
+    )
+
+
+def fail(breaker, count):
+    for _ in range(count):
+        breaker.record(PERMIT_CLOSED, success=False, latency=0.1)
+
+
+@pytest.mark.unit
+class TestCircuitBreaker:
+    """Тесты переходов состояния"""
+
+    def test_closed_by_default(self, breaker):
+        """Тест что без ошибок цепь замкнута"""
+        assert breaker.allow() == PERMIT_CLOSED
+        assert breaker.status()["state"] == "closed"
+
+    def test_opens_on_error_rate(self, breaker):
+        """Тест что цепь размыкается при доле ошибок выше порога"""
+        breaker.record(PERMIT_CLOSED, success=True, latency=0.1)
+        fail(breaker, 3)
+
+        assert breaker.allow() is None
+        assert breaker.status()["state"] == "open"
+
+    def test_min_calls_required(self, breaker):
+        """Тест что единичные ошибки не размыкают цепь"""
+        fail(breaker, 3)
+
+        assert breaker.allow() == PERMIT_CLOSED
+
+    def test_opens_on_slow_calls(self, breaker):
+        """Тест что цепь размыкается при доле медленных ответов выше порога"""
+        for _ in range(4):
+            breaker.record(PERMIT_CLOSED, success=True, latency=30)
+
+        assert breaker.allow() is None
+
+    def test_shared_between_workers(self, breaker):
+        """Тест что состояние видят все процессы (общий Redis)"""
+        fail(breaker, 4)
+        other_worker = CircuitBreaker(
+            "test", error_threshold=0.5, slow_call_threshold=10, slow_call_rate=0.5,
+            min_calls=4, window=60, open_duration=30
+        )
+
+        assert other_worker.allow() is None
+
+    def test_half_open_single_probe(self, breaker, fake_redis):
+        """Тест что после open_duration пропускается один пробный запрос"""
+        fail(breaker, 4)
+        fake_redis.hset(breaker.state_key, "opened_at", 0)
+
+        assert breaker.allow() == PERMIT_PROBE
+        assert breaker.allow() is None
+        assert breaker.status()["state"] == "half_open"
+
+    def test_probe_success_closes(self, breaker, fake_redis):
+        """Тест что успешный пробный запрос замыкает цепь и сбрасывает окно"""
+        fail(breaker, 4)
+        fake_redis.hset(breaker.state_key, "opened_at", 0)
+        breaker.record(breaker.allow(), success=True, latency=0.1)
+
+        assert breaker.allow() == PERMIT_CLOSED
+        assert breaker.status()["window"]["errors"] == 0
+
+    def test_probe_failure_reopens(self, breaker, fake_redis):
+        """Тест что неудачный пробный запрос снова размыкает цепь"""
+        fail(breaker, 4)
+        fake_redis.hset(breaker.state_key, "opened_at", 0)
+        breaker.record(breaker.allow(), success=False, latency=0.1)
+
+        assert breaker.allow() is None
+        assert breaker.status()["state"] == "open"
+
+
+class FakeChatModel:
+    model = "gemini-test"
+
+    def __init__(self, error=None):
+        self.error = error
+        self.calls = 0
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return SimpleNamespace(generations=[], model="primary")
+
+
+@pytest.mark.unit
+class TestProtectedModel:
+    """Тесты обертки чат-модели"""
+
+    def test_open_circuit_fails_fast(self, breaker):
+        """Тест что без резервной модели разомкнутая цепь сразу дает ошибку"""
+        fail(breaker, 4)
+        model = protected(FakeChatModel)()
+
+        with patch("app.circuit_breaker.get_circuit_breaker", return_value=breaker):
+            with pytest.raises(CircuitOpenError):
+                model._generate([])
+
+        assert model.calls == 0
+
+    def test_open_circuit_routes_to_fallback(self, breaker):
+        """Тест что разомкнутая цепь переключает вызовы на резервную модель"""
+        fail(breaker, 4)
+        fallback_model = SimpleNamespace(_generate=lambda *args, **kwargs: SimpleNamespace(model="fallback"))
+        model = protected(FakeChatModel, lambda: fallback_model)()
+
+        with patch("app.circuit_breaker.get_circuit_breaker", return_value=breaker):
+            result = model._generate([])
+
+        assert result.model == "fallback"
+        assert model.calls == 0
+
+    def test_provider_errors_counted(self, breaker):
+        """Тест что ошибки провайдера размыкают цепь, а ошибки запроса - нет"""
+        with patch("app.circuit_breaker.get_circuit_breaker", return_value=breaker):
+            for _ in range(4):
+                with pytest.raises(ValueError):
+                    protected(FakeChatModel)(error=ValueError("bad prompt"))._generate([])
+            assert breaker.allow() == PERMIT_CLOSED
+
+            for _ in range(4):
+                with pytest.raises(ServiceUnavailable):
+                    protected(FakeChatModel)(error=ServiceUnavailable())._generate([])
+            assert breaker.allow() is None
+
+    def test_breaker_per_model(self, fake_redis):
+        """Тест что цепь размыкается только для деградировавшей модели"""
+        with patch.dict(circuit_breaker._circuit_breakers, clear=True), \
+             patch.object(circuit_breaker.settings, "circuit_breaker_enabled", True), \
+             patch.object(circuit_breaker.settings, "circuit_min_calls", 4):
+            fail(get_circuit_breaker("gemini-pro"), 4)
+
+            assert get_circuit_breaker("gemini-pro").allow() is None
+            assert get_circuit_breaker("gemini-flash").allow() == PERMIT_CLOSED
+            assert get_circuit_breaker("gemini-pro").name == "gemini:gemini-pro"
+
+    def test_model_routed_to_its_breaker(self, fake_redis):
+        """Тест что вызов модели учитывается в предохранителе этой модели"""
+        with patch.dict(circuit_breaker._circuit_breakers, clear=True), \
+             patch.object(circuit_breaker.settings, "circuit_breaker_enabled", True):
+            protected(FakeChatModel)()._generate([])
+
+            assert get_circuit_breaker("gemini-test").window_counts()["calls"] == 1
+            assert get_circuit_breaker("other").window_counts()["calls"] == 0
+
+    def test_quota_wait_not_counted_as_latency(self, breaker):
+        """Тест что предохранитель под лимитером не считает ожидание квоты медленным ответом"""
+        from app.rate_limit import rate_limited
+
+        limiter = Mock(acquire=lambda tokens: time.sleep(0.2))
+        model = rate_limited(protected(FakeChatModel))()
+
+        with patch("app.rate_limit.get_rate_limiter", return_value=limiter), \
+             patch("app.circuit_breaker.get_circuit_breaker", return_value=breaker), \
+             patch.object(breaker, "record", wraps=breaker.record) as record:
+            model._generate([SimpleNamespace(content="вопрос")])
+
+        assert record.call_args.kwargs["latency"] < 0.2
@@ -0,0 +1,70 @@
+"""
+Unit Tests - Request Coalescing
+===============================
+Тесты объединения одинаковых запросов на исследование
+"""
+
+import pytest
+
+from app.coalescing import (
+    INFLIGHT_PREFIX,
+    canonical_request_key,
+    claim_inflight,
+    release_inflight,
+)
+
+
+@pytest.mark.unit
+class TestCanonicalKey:
+    """Тесты канонического ключа запроса"""
+
+    def test_key_ignores_case_and_whitespace(self):
+        """Тест что регистр и пробелы в теме не влияют на ключ"""
+        first = canonical_request_key("Рынок  электромобилей ", "general", "ru", "standard")
+        second = canonical_request_key("рынок электромобилей", "general", "ru", "standard")
+
+        assert first == second
+
+    def test_key_depends_on_parameters(self):
+        """Тест что параметры исследования входят в ключ"""
+        base = canonical_request_key("Topic", "general", "ru", "standard")
+
+        assert base != canonical_request_key("Topic", "tech_research", "ru", "standard")
+        assert base != canonical_request_key("Topic", "general", "en", "standard")
+        assert base != canonical_request_key("Topic", "general", "ru", "basic")
+
+
+@pytest.mark.unit
+class TestInflightRegistry:
+    """Тесты реестра выполняемых задач"""
+
+    def test_first_claim_wins(self, fake_redis):
+        """Тест что повторный запрос получает ID первой задачи"""
+        assert claim_inflight("key", "task-1", ttl=60) is None
+        assert claim_inflight("key", "task-2", ttl=60) == "task-1"
+
+    def test_release_only_by_owner(self, fake_redis):
+        """Тест что регистрацию снимает только владелец"""
+        claim_inflight("key", "task-1", ttl=60)
+
+        assert release_inflight("key", "task-2") is False
+        assert release_inflight("key", "task-1") is True
+        assert claim_inflight("key", "task-2", ttl=60) is None
+
+
+@pytest.mark.unit
+class TestResearchCoalescing:
+    """Тесты объединения запросов в POST /research"""
+
+    def test_duplicate_request_returns_existing_task(self, client, mock_celery, fake_redis, sample_research_data):
+        """Тест что дубликат не ставит новую задачу в очередь"""
+        request_data = sample_research_data["basic_request"]
+
+        first = client.post("/research", json=request_data).json()
+        second = client.post("/research", json=request_data).json()
+
+        assert first["coalesced"] is False
+        assert second["coalesced"] is True
+        assert second["task_id"] == fake_redis.get(
+            f"{INFLIGHT_PREFIX}{canonical_request_key(**request_data)}"
+        )
@@ -0,0 +1,74 @@
+"""
+Unit Tests - Crew Registry
+==========================
+Тесты реестра команд и шаблонов промптов
+"""
+
+import pytest
+
+from app.crew_registry import PromptTemplate, get_crew_info, get_crew_registry, get_crew_spec, get_crew_types
+
+
+@pytest.mark.unit
+class TestPromptTemplate:
+    """Тесты предкомпилированных шаблонов"""
+
+    def test_render_substitutes_fields(self):
+        """Тест подстановки значений и нормализации отступов"""
+        template = PromptTemplate("""
+            Анализ: {topic}
+            Язык: {language}
+        """)
+
+        assert template.render({"topic": "Рынок {EV}", "language": "ru"}) == "Анализ: Рынок {EV}\nЯзык: ru"
+        assert template.fields == {"topic", "language"}
+
+    def test_unknown_field_is_rejected(self):
+        """Тест что опечатка в плейсхолдере обнаруживается при загрузке"""
+        with pytest.raises(ValueError):
+            PromptTemplate("Анализ: {topik}")
+
+
+@pytest.mark.unit
+class TestCrewRegistry:
+    """Тесты реестра команд"""
+
+    def test_registry_is_built_once(self):
+        """Тест что реестр собирается один раз на процесс"""
+        assert get_crew_registry() is get_crew_registry()
+
+    def test_unknown_crew_type_falls_back_to_general(self):
+        """Тест что неизвестный тип дает универсальную команду"""
+        assert get_crew_spec("invalid_type").crew_type == "general"
+
+    def test_categories(self):
+        """Тест разделения стандартных и showcase команд"""
+        assert "business_analysis" in get_crew_types("standard")
+        assert get_crew_types("showcase") == ["swot_analysis", "tech_review", "investment_advisor"]
+
+    def test_task_dependencies_refer_to_earlier_tasks(self):
+        """Тест что задачи зависят только от предыдущих задач"""
+        for spec in get_crew_registry().values():
+            for index, deps in spec.dependencies.items():
+                assert index < len(spec.tasks)
+                assert all(dep < index for dep in deps)
+
+    def test_render_tasks(self):
+        """Тест подстановки параметров запроса в задачи"""
+        tasks = get_crew_spec("business_analysis").render_tasks("Электромобили", "en", "basic")
+
+        assert len(tasks) == 3
+        assert tasks[0]["description"].startswith("Проведите краткий анализ основных аспектов рынка по теме: Электромобили")
+        assert "Результат на языке: en" in tasks[2]["description"]
+
+    def test_crew_info_for_api(self):
+        """Тест что метаданные API берутся из определений"""
+        info = get_crew_info("showcase")["investment_advisor"]
+
+        assert info["name"] == "Инвестиционный Советник"
+        assert info["category"] == "showcase"
+        assert len(info["agents"]) == 3
+
+        # Изменение копии не затрагивает реестр
+        info["name"] = "changed"
+        assert get_crew_info("showcase")["investment_advisor"]["name"] == "Инвестиционный Советник"
@@ -0,0 +1,94 @@
+"""
+Unit Tests - Worker Heartbeats
+==============================
+Тесты heartbeats воркеров и быстрого кешируемого /health
+"""
+
+import time
+
+import pytest
+
+from app.heartbeat import HEARTBEATS_KEY, process_tree_memory_mb, read_heartbeats, remove_heartbeat, write_heartbeat
+
+
+@pytest.mark.unit
+class TestHeartbeats:
+    """Тесты записи и чтения heartbeats"""
+
+    def test_write_and_read(self, fake_redis):
+        """Тест что записанный heartbeat возвращается с нагрузкой и памятью"""
+        write_heartbeat("worker1", active_tasks=2, concurrency=4)
+
+        heartbeats = read_heartbeats()
+
+        assert len(heartbeats) == 1
+        assert heartbeats[0]["hostname"] == "worker1"
+        assert heartbeats[0]["active_tasks"] == 2
+        assert heartbeats[0]["concurrency"] == 4
+        assert heartbeats[0]["memory_mb"] > 0
+        assert "load" in heartbeats[0]
+
+    def test_stale_heartbeat_ignored(self, fake_redis):
+        """Тест что воркер без свежего heartbeat не считается живым"""
+        write_heartbeat("worker1", active_tasks=0)
+        fake_redis.zadd(HEARTBEATS_KEY, {"worker1": time.time() - 3600})
+
+        assert read_heartbeats() == []
+
+    def test_remove_heartbeat(self, fake_redis):
+        """Тест что остановленный воркер удаляет свой heartbeat"""
+        write_heartbeat("worker1", active_tasks=0)
+        remove_heartbeat("worker1")
+
+        assert read_heartbeats() == []
+        assert fake_redis.zcard(HEARTBEATS_KEY) == 0
+
+    def test_process_tree_memory(self):
+        """Тест что память процесса воркера положительна"""
+        assert process_tree_memory_mb() > 0
+
+
+@pytest.mark.unit
+class TestHeartbeatHealth:
+    """Тесты /health по heartbeats"""
+
+    def test_health_from_heartbeats(self, client, mock_celery, fake_redis):
+        """Тест что /health считает статус по heartbeats без брокера и inspect()"""
+        write_heartbeat("worker1", active_tasks=1)
+        write_heartbeat("worker2", active_tasks=2)
+
+        data = client.get("/health").json()
+
+        assert data["status"] == "healthy"
+        assert data["components"]["celery"] == "healthy"
+        assert data["active_tasks"] == 3
+        assert {worker["hostname"] for worker in data["workers"]} == {"worker1", "worker2"}
+        mock_celery.control.inspect.assert_not_called()
+        mock_celery.broker_connection.assert_not_called()
+
+    def test_no_workers(self, client, mock_celery, fake_redis):
+        """Тест статуса без живых воркеров"""
+        data = client.get("/health").json()
+
+        assert data["status"] == "healthy"
+        assert data["components"]["celery"] == "no_workers"
+
+    def test_health_cached(self, client, mock_celery, fake_redis):
+        """Тест что повторная проба в пределах TTL не обращается к Redis"""
+        client.get("/health")
+        write_heartbeat("worker1", active_tasks=1)
+
+        data = client.get("/health").json()
+
+        assert data["components"]["celery"] == "no_workers"
+
+    def test_deep_check_bypasses_cache(self, client, mock_celery, fake_redis):
+        """Тест что deep=true выполняет полную проверку"""
+        mock_celery.control.inspect.return_value.active.return_value = {"worker1": [{"id": "t1"}]}
+        client.get("/health")
+
+        data = client.get("/health", params={"deep": True}).json()
+
+        assert data["components"]["celery"] == "healthy"
+        assert data["active_tasks"] == 1
+        mock_celery.broker_connection.assert_called_once()
@@ -0,0 +1,222 @@
+"""
+Unit Tests - Resilient LLM Calls
+================================
+Тесты дедлайнов, хеджирования и повторов вызовов LLM
+"""
+
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from app import llm_resilience
+from app.llm_resilience import (
+    LLMDeadlineExceeded, STATS_KEY, call_llm, call_timeout, hedged_call, is_transient, llm_stats, quota_wait,
+    request_timeout, task_deadline
+)
+
+
+class ResourceExhausted(Exception):
+    """Имя совпадает с google.api_core.exceptions.ResourceExhausted (429)"""
+
+
+@pytest.fixture(autouse=True)
+def resilience_settings(fake_redis):
+    llm_resilience._hedge_delay = None
+    with patch.object(llm_resilience.settings, "llm_rate_limit_enabled", False), \
+         patch.object(llm_resilience.settings, "llm_max_retries", 2), \
+         patch.object(llm_resilience.settings, "llm_call_timeout", 5), \
+         patch.object(llm_resilience.settings, "llm_hedge_delay", 0.05), \
+         patch.object(llm_resilience.settings, "llm_hedging_enabled", True):
+        yield
+    llm_resilience._hedge_delay = None
+
+
+def counters(fake_redis):
+    return {field: int(value) for field, value in fake_redis.hgetall(STATS_KEY).items()}
+
+
+@pytest.mark.unit
+class TestHedging:
+    """Тесты дублирующих запросов"""
+
+    def test_fast_call_not_hedged(self, fake_redis):
+        """Тест что быстрый ответ не порождает хедж"""
+        result, winner = hedged_call(lambda: "ok", timeout=1, delay=0.5)
+
+        assert result == "ok"
+        assert winner.hedge is False
+        assert "hedges" not in counters(fake_redis)
+
+    def test_slow_primary_hedged(self, fake_redis):
+        """Тест что при медленном первом запросе побеждает дублирующий"""
+        calls = []
+        release = threading.Event()
+
+        def call():
+            calls.append(1)
+            if len(calls) == 1:
+                release.wait(2)
+                return "slow"
+            return "fast"
+
+        result, winner = hedged_call(call, timeout=2, delay=0.05)
+        release.set()
+
+        assert result == "fast"
+        assert winner.hedge is True
+        assert counters(fake_redis)["hedges"] == 1
+
+    def test_deadline_exceeded(self):
+        """Тест что зависший вызов прерывается по дедлайну"""
+        release = threading.Event()
+
+        with pytest.raises(LLMDeadlineExceeded):
+            hedged_call(lambda: release.wait(2), timeout=0.1, delay=None)
+        release.set()
+
+    def test_deadline_abandons_pending_attempts(self):
+        """Тест что брошенные по дедлайну попытки передаются вызывающему"""
+        release = threading.Event()
+
+        with pytest.raises(LLMDeadlineExceeded) as exc_info:
+            hedged_call(lambda: release.wait(2), timeout=0.1, delay=None)
+        release.set()
+
+        assert len(exc_info.value.abandoned) == 1
+
+    def test_quota_wait_excluded_from_deadline(self):
+        """Тест что ожидание квоты лимитера не расходует дедлайн и не входит в задержку"""
+        def call():
+            with quota_wait():
+                time.sleep(0.3)
+            return "ok"
+
+        result, winner = hedged_call(call, timeout=0.2, delay=None)
+
+        assert result == "ok"
+        assert winner.latency < 0.2
+
+    def test_request_timeout_follows_attempt_deadline(self):
+        """Тест что таймаут запроса к провайдеру равен остатку дедлайна попытки"""
+        result, _ = hedged_call(request_timeout, timeout=3, delay=None)
+
+        assert 2 < result <= 3
+
+    def test_no_hedge_while_quota_exhausted(self, fake_redis):
+        """Тест что хедж не отправляется, пока запросы ждут квоту"""
+        release = threading.Event()
+
+        with patch("app.llm_resilience.quota_available", return_value=False):
+            with pytest.raises(LLMDeadlineExceeded):
+                hedged_call(lambda: release.wait(2), timeout=0.2, delay=0.05)
+        release.set()
+
+        assert "hedges" not in counters(fake_redis)
+
+
+@pytest.mark.unit
+class TestRetries:
+    """Тесты повторов и дедлайна задачи"""
+
+    def test_transient_error_retried(self, fake_redis):
+        """Тест что 429 повторяется с jitter-задержкой"""
+        attempts = []
+
+        def call():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise ResourceExhausted("quota")
+            return "ok"
+
+        with patch("app.llm_resilience.time.sleep") as sleep:
+            assert call_llm(call) == "ok"
+
+        assert sleep.call_count == 2
+        assert all(0 <= args[0] <= 2 for args, _ in sleep.call_args_list)
+        assert counters(fake_redis)["retries"] == 2
+        assert counters(fake_redis)["calls"] == 1
+
+    def test_permanent_error_not_retried(self, fake_redis):
+        """Тест что ошибка запроса не повторяется"""
+        def call():
+            raise ValueError("bad request")
+
+        with pytest.raises(ValueError):
+            call_llm(call)
+
+        assert counters(fake_redis)["failures"] == 1
+        assert "retries" not in counters(fake_redis)
+
+    def test_retries_exhausted(self, fake_redis):
+        """Тест что после LLM_MAX_RETRIES повторов ошибка пробрасывается"""
+        def call():
+            raise ResourceExhausted("quota")
+
+        with patch("app.llm_resilience.time.sleep"), pytest.raises(ResourceExhausted):
+            call_llm(call)
+
+        assert counters(fake_redis)["retries"] == 2
+
+    def test_retry_waits_for_abandoned_attempt(self, fake_redis):
+        """Тест что повтор после дедлайна не отправляется, пока выполняется брошенная попытка"""
+        events = []
+        slow = threading.Event()
+
+        def call():
+            events.append("start")
+            if len(events) == 1:
+                slow.wait(0.3)
+            events.append("end")
+            return "ok"
+
+        with patch.object(llm_resilience.settings, "llm_call_timeout", 0.1), \
+             patch.object(llm_resilience.settings, "llm_hedging_enabled", False), \
+             patch("app.llm_resilience.time.sleep"):
+            assert call_llm(call) == "ok"
+
+        assert events == ["start", "end", "start", "end"]
+        assert counters(fake_redis)["deadline_exceeded"] == 1
+
+    def test_call_timeout_bounded_by_task_budget(self):
+        """Тест что дедлайн вызова не выходит за бюджет задачи"""
+        assert call_timeout() == 5
+
+        with task_deadline(time.time() + 1):
+            assert call_timeout() <= 1
+
+        with task_deadline(time.time() - 1), pytest.raises(LLMDeadlineExceeded):
+            call_timeout()
+
+    def test_is_transient(self):
+        """Тест классификации ошибок"""
+        assert is_transient(ResourceExhausted())
+        assert is_transient(TimeoutError())
+        assert not is_transient(ValueError())
+
+
+@pytest.mark.unit
+class TestLLMStats:
+    """Тесты статистики вызовов"""
+
+    def test_latency_recorded(self, client, fake_redis):
+        """Тест что задержка каждого вызова попадает в перцентили"""
+        for _ in range(3):
+            call_llm(lambda: "ok")
+
+        stats = llm_stats()
+        assert stats["counters"]["calls"] == 3
+        assert stats["latency"]["samples"] == 3
+
+        data = client.get("/llm/stats").json()
+        assert data["counters"]["calls"] == 3
+
+    def test_circuits_follow_routing(self, client, fake_redis):
+        """Тест что без маршрутизации моделей показывается только цепь GEMINI_MODEL"""
+        with patch.object(llm_resilience.settings, "circuit_breaker_enabled", True), \
+             patch.object(llm_resilience.settings, "model_routing_enabled", False), \
+             patch.object(llm_resilience.settings, "gemini_fast_model", "flash"):
+            data = client.get("/llm/stats").json()
+
+        assert list(data["circuits"]) == [llm_resilience.settings.gemini_model]
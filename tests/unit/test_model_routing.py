@@ -0,0 +1,92 @@
+"""
+Unit Tests - Model Routing
+==========================
+Тесты выбора модели по классу агента и глубине исследования
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from app.config import settings
+from app.crew_registry import get_crew_spec
+from app.model_routing import FALLBACK_ROLE, PLANNER_ROLE, agent_models, routed_models, select_model
+
+
+@pytest.fixture
+def routing():
+    with patch.object(settings, "model_routing_enabled", True), \
+         patch.object(settings, "gemini_model", "standard"), \
+         patch.object(settings, "gemini_fast_model", "flash"), \
+         patch.object(settings, "gemini_deep_model", "pro"):
+        yield
+
+
+@pytest.mark.unit
+class TestModelRouting:
+    """Тесты маршрутизации моделей"""
+
+    def test_fast_agents_use_fast_model(self, routing):
+        """Тест что агент оформления всегда получает быструю модель"""
+        for depth in ("basic", "standard", "comprehensive"):
+            assert select_model("fast", depth) == "flash"
+
+    def test_depth_selects_analysis_model(self, routing):
+        """Тест что модель аналитика зависит от глубины"""
+        assert select_model("default", "basic") == "flash"
+        assert select_model("default", "standard") == "standard"
+        assert select_model("default", "comprehensive") == "pro"
+
+    def test_unset_model_falls_back_to_default(self, routing):
+        """Тест что незаданная модель класса заменяется на GEMINI_MODEL"""
+        with patch.object(settings, "gemini_deep_model", ""):
+            assert select_model("default", "comprehensive") == "standard"
+
+    def test_routing_disabled(self, routing):
+        """Тест что без маршрутизации все агенты используют GEMINI_MODEL"""
+        with patch.object(settings, "model_routing_enabled", False):
+            assert select_model("fast", "basic") == "standard"
+
+    def test_agent_models_for_result(self, routing):
+        """Тест что модели агентов команды записываются по ролям"""
+        with patch.object(settings, "map_reduce_enabled", False), \
+             patch.object(settings, "gemini_fallback_model", ""):
+            assert agent_models("general", "comprehensive") == {
+                "Старший исследователь": "pro",
+                "Технический писатель": "flash"
+            }
+
+    def test_map_reduce_synthesizer_uses_analysis_model(self, routing):
+        """Тест что в map-reduce последний агент сводит подтемы на аналитической модели"""
+        with patch.object(settings, "map_reduce_enabled", True):
+            assert agent_models("general", "comprehensive")["Технический писатель"] == "pro"
+            assert agent_models("general", "standard")["Технический писатель"] == "flash"
+
+    def test_map_reduce_lists_only_running_agents(self, routing):
+        """Тест что в map-reduce карта моделей содержит только запускаемых агентов"""
+        with patch.object(settings, "map_reduce_enabled", True):
+            assert agent_models("tech_research", "comprehensive") == {
+                "Старший технический исследователь": "pro",
+                PLANNER_ROLE: "pro",
+                "DevOps инженер": "pro"
+            }
+
+    def test_fallback_model_listed_when_configured(self, routing):
+        """Тест что резервная модель попадает в карту моделей, только если задана"""
+        with patch.object(settings, "gemini_fallback_model", ""):
+            assert FALLBACK_ROLE not in agent_models("general", "standard")
+        with patch.object(settings, "gemini_fallback_model", "backup"):
+            assert agent_models("general", "standard")[FALLBACK_ROLE] == "backup"
+
+    def test_routed_models(self, routing):
+        """Тест что без маршрутизации используется только GEMINI_MODEL"""
+        assert routed_models() == ["flash", "pro", "standard"]
+        with patch.object(settings, "model_routing_enabled", False):
+            assert routed_models() == ["standard"]
+
+    def test_writer_is_fast_tier(self):
+        """Тест что технический писатель в реестре помечен как агент оформления"""
+        roles = {agent.role: agent.model_tier for agent in get_crew_spec("general").agents}
+
+        assert roles["Технический писатель"] == "fast"
+        assert roles["Старший исследователь"] == "default"
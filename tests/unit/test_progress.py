@@ -0,0 +1,185 @@
+"""
+Unit Tests - Task Progress Stream
+=================================
+Тесты публикации прогресса и SSE-эндпоинта /result/{task_id}/stream
+"""
+
+import asyncio
+import json
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from app.config import settings
+from app.progress import CrewProgressTracker, ProgressThrottle, progress_channel, publish_progress
+
+
+def parse_sse(body: str) -> list:
+    """Разбирает поток text/event-stream в список событий"""
+    events = []
+    for chunk in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in chunk.splitlines() if not line.startswith(":"))
+        if "data" in lines:
+            events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+@pytest.mark.unit
+class TestProgressPublishing:
+    """Тесты публикации событий воркером"""
+
+    def test_publish_progress_event(self, fake_redis):
+        """Тест формата публикуемого события"""
+        pubsub = fake_redis.pubsub()
+        pubsub.subscribe(progress_channel("task-1"))
+        pubsub.get_message(timeout=1)
+
+        publish_progress("task-1", "PROGRESS", {"current": 40, "status": "Анализ"})
+
+        message = pubsub.get_message(timeout=1)
+        event = json.loads(message["data"])
+        assert event["state"] == "PROGRESS"
+        assert event["progress"] == 40
+        assert event["status"] == "Анализ"
+
+
+@pytest.mark.unit
+class TestResultStream:
+    """Тесты SSE-стрима прогресса"""
+
+    def test_stream_finished_task(self, client, fake_redis, helpers):
+        """Тест что для завершенной задачи поток сразу отдает результат"""
+        helpers.store_task_meta(fake_redis, "task-done", "SUCCESS", helpers.create_sample_crew_response())
+
+        response = client.get("/result/task-done/stream")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = parse_sse(response.text)
+        assert len(events) == 1
+        assert events[0][0] == "success"
+        assert events[0][1]["result"]["status"] == "completed"
+
+    def test_stream_pushes_progress_until_completion(self, client, fake_redis, helpers):
+        """Тест что события воркера доставляются до финального состояния"""
+        def worker():
+            time.sleep(0.3)
+            publish_progress("task-live", "PROGRESS", {"current": 50})
+            helpers.store_task_meta(fake_redis, "task-live", "SUCCESS", helpers.create_sample_crew_response())
+            publish_progress("task-live", "SUCCESS", {"current": 100})
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        response = client.get("/result/task-live/stream")
+        thread.join()
+
+        states = [event["state"] for _, event in parse_sse(response.text)]
+        assert states == ["PENDING", "PROGRESS", "SUCCESS"]
+
+    def test_stream_limit(self, client, fake_redis):
+        """Тест что сверх SSE_MAX_STREAMS поток не открывается"""
+        with patch("app.api._active_streams", settings.sse_max_streams):
+            response = client.get("/result/task-live/stream")
+
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "5"
+
+    def test_stream_slot_reserved_before_iteration(self, fake_redis):
+        """Тест что слот занимается при проверке и освобождается, даже если тело не читалось"""
+        from fastapi import HTTPException
+        from app import api
+
+        async def scenario():
+            first = await api.stream_result("task-live", None)
+            with pytest.raises(HTTPException) as exc_info:
+                await api.stream_result("task-live", None)
+            assert exc_info.value.status_code == 503
+
+            async def receive():
+                return {"type": "http.disconnect"}
+
+            async def send(message):
+                raise OSError("соединение закрыто")
+
+            with pytest.raises(Exception):  # OSError (в ExceptionGroup у anyio)
+                await first({"type": "http"}, receive, send)
+
+        with patch("app.api._active_streams", 0), patch.object(settings, "sse_max_streams", 1):
+            asyncio.run(scenario())
+            assert api._active_streams == 0
+
+
+class FakeTask:
+    """Минимальная задача CrewAI для трекера прогресса"""
+
+    def __init__(self, description, role):
+        self.description = description
+        self.agent = type("FakeAgent", (), {"role": role})()
+
+
+class FakeTaskOutput:
+    """Минимальный TaskOutput CrewAI"""
+
+    def __init__(self, description):
+        self.description = description
+
+
+@pytest.mark.unit
+class TestCrewProgressTracker:
+    """Тесты преобразования callbacks CrewAI в прогресс"""
+
+    def setup_method(self):
+        self.events = []
+        self.tracker = CrewProgressTracker(
+            lambda meta, force=False: self.events.append((meta, force)),
+            [FakeTask("Сбор данных", "Исследователь"), FakeTask("Отчет", "Аналитик")]
+        )
+
+    def test_steps_advance_progress(self):
+        """Тест что шаги агента увеличивают прогресс внутри доли задачи"""
+        on_step = self.tracker.step_callback_for("Исследователь")
+        on_step([("action", "observation")])
+        on_step([("action", "observation")])
+
+        first, second = self.events[0][0], self.events[1][0]
+        assert 25 < first["current"] < second["current"] < 57
+        assert second["agent"] == "Исследователь"
+        assert second["status"] == "Исследователь: шаг 2"
+
+    def test_task_completion_records_timings(self):
+        """Тест что завершение задачи отправляется принудительно и с таймингами"""
+        self.tracker.step_callback_for("Исследователь")("step")
+        self.tracker.on_task_complete(FakeTaskOutput("Сбор данных"))
+
+        meta, force = self.events[-1]
+        assert force is True
+        assert meta["current"] == 57
+        assert meta["tasks_completed"] == 1
+        assert meta["timings"][0]["agent"] == "Исследователь"
+        assert meta["timings"][0]["steps"] == 1
+
+    def test_all_tasks_reach_end(self):
+        """Тест что после всех задач прогресс равен верхней границе"""
+        self.tracker.on_task_complete(FakeTaskOutput("Сбор данных"))
+        self.tracker.on_task_complete(FakeTaskOutput("Отчет"))
+
+        assert self.events[-1][0]["current"] == 90
+
+
+@pytest.mark.unit
+class TestProgressThrottle:
+    """Тесты ограничения частоты обновлений прогресса"""
+
+    def test_throttle_skips_frequent_updates(self):
+        """Тест что частые события пропускаются, а принудительные - нет"""
+        sent = []
+        throttle = ProgressThrottle(sent.append, min_interval=60)
+
+        throttle({"current": 30, "timings": [1]})
+        throttle({"current": 35})
+        throttle({"current": 57}, force=True)
+
+        assert [meta["current"] for meta in sent] == [30, 57]
+        assert throttle.last["timings"] == [1]
@@ -0,0 +1,131 @@
+"""
+Unit Tests - Gemini Rate Limiter
+================================
+Тесты общего token bucket лимитера запросов к LLM
+"""
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from app.cancellation import CancellationToken, TaskCancelled, cancel_scope
+from app.rate_limit import RateLimiter, estimate_tokens, rate_limited
+
+
+@pytest.fixture
+def limiter(fake_redis):
+    return RateLimiter("test", requests_per_minute=60, tokens_per_minute=6000)
+
+
+@pytest.mark.unit
+class TestRateLimiter:
+    """Тесты token bucket в Redis"""
+
+    def test_acquire_within_quota(self, limiter):
+        """Тест что запросы в пределах квоты не ждут"""
+        with patch("app.rate_limit.time.sleep") as sleep:
+            for _ in range(10):
+                limiter.acquire(100)
+
+        sleep.assert_not_called()
+        assert limiter.stats()["acquired"] == 10
+
+    def test_request_quota_exhausted(self, limiter):
+        """Тест что после исчерпания квоты запросов новый запрос ждет"""
+        for _ in range(60):
+            limiter.acquire(1)
+
+        assert 0 < limiter.current_wait() <= 1.1
+
+    def test_token_quota_exhausted(self, limiter):
+        """Тест что квота токенов ограничивает независимо от числа запросов"""
+        limiter.acquire(6000)
+
+        assert limiter.current_wait() == 0
+        limiter.charge(600)
+        assert limiter.current_wait() == pytest.approx(6, abs=0.5)
+
+    def test_acquire_waits_for_quota(self, limiter, fake_redis):
+        """Тест что запрос ждет освобождения квоты, а не падает"""
+        limiter.acquire(6000)
+
+        # Пока запрос "спит", квота восстанавливается
+        with patch("app.rate_limit.time.sleep", side_effect=lambda _: fake_redis.delete(*limiter.keys)) as sleep:
+            limiter.acquire(100)
+
+        sleep.assert_called_once()
+        stats = limiter.stats()
+        assert stats["acquired"] == 2
+        assert stats["throttled"] == 1
+
+    def test_oversized_request_clamped(self, limiter):
+        """Тест что запрос больше минутной квоты не ждет бесконечно"""
+        with patch("app.rate_limit.time.sleep") as sleep:
+            limiter.acquire(10 ** 6)
+
+        sleep.assert_not_called()
+
+    def test_cancelled_while_waiting(self, limiter):
+        """Тест что ожидающая квоту задача остается отменяемой"""
+        limiter.acquire(6000)
+        token = CancellationToken("task-1")
+        token.cancelled = True
+
+        with cancel_scope(token), pytest.raises(TaskCancelled):
+            limiter.acquire(100)
+
+    def test_redis_unavailable_fails_open(self):
+        """Тест что без Redis запрос не блокируется"""
+        limiter = RateLimiter("test", requests_per_minute=1, tokens_per_minute=1)
+
+        with patch("app.rate_limit.get_redis", side_effect=__import__("redis").ConnectionError("down")):
+            assert limiter.acquire(100) >= 0
+
+
+class FakeChatModel:
+    def __init__(self):
+        self.calls = 0
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls += 1
+        return SimpleNamespace(generations=[SimpleNamespace(text="x" * 400)])
+
+
+@pytest.mark.unit
+class TestRateLimitedModel:
+    """Тесты обертки чат-модели"""
+
+    def test_generate_goes_through_limiter(self, limiter):
+        """Тест что вызов модели берет квоту и списывает токены ответа"""
+        model = rate_limited(FakeChatModel)()
+        messages = [SimpleNamespace(content="y" * 800)]
+
+        with patch("app.rate_limit.get_rate_limiter", return_value=limiter), \
+             patch.object(limiter, "charge", wraps=limiter.charge) as charge:
+            model._generate(messages)
+
+        assert model.calls == 1
+        assert limiter.stats()["acquired"] == 1
+        charge.assert_called_once_with(100)
+
+    def test_estimate_tokens(self):
+        """Тест оценки токенов по длине текста"""
+        assert estimate_tokens("") == 1
+        assert estimate_tokens("a" * 400) == 100
+
+
+@pytest.mark.unit
+class TestRateLimitEndpoint:
+    """Тесты эндпоинта статистики лимита"""
+
+    def test_stats(self, client, limiter):
+        """Тест что эндпоинт отдает текущее ожидание и статистику"""
+        limiter.acquire(10)
+
+        with patch("app.rate_limit.get_rate_limiter", return_value=limiter):
+            data = client.get("/llm/rate-limit").json()
+
+        assert data["enabled"] is True
+        assert data["acquired"] == 1
+        assert data["current_wait_seconds"] == 0
@@ -0,0 +1,64 @@
+"""
+Unit Tests - Research Result Store
+==================================
+Тесты хранилища завершенных исследований и cache hit в POST /research
+"""
+
+import time
+
+import pytest
+
+from app.coalescing import canonical_request_key
+from app.result_store import get_fresh_result, save_result
+
+
+@pytest.mark.unit
+class TestResultStore:
+    """Тесты хранилища результатов"""
+
+    def test_fresh_result_is_returned(self, fake_redis, helpers):
+        """Тест получения свежего результата"""
+        save_result("key", "task-1", helpers.create_sample_crew_response(), ttl=60)
+
+        record = get_fresh_result("key", max_age=60)
+        assert record["task_id"] == "task-1"
+        assert record["result"]["status"] == "completed"
+
+    def test_stale_result_is_ignored(self, fake_redis, helpers, monkeypatch):
+        """Тест что результат старше окна свежести не возвращается"""
+        save_result("key", "task-1", helpers.create_sample_crew_response(), ttl=600)
+
+        monkeypatch.setattr(time, "time", lambda: 10**10)
+        assert get_fresh_result("key", max_age=60) is None
+
+    def test_missing_result(self, fake_redis):
+        """Тест отсутствующего результата"""
+        assert get_fresh_result("missing", max_age=60) is None
+
+
+@pytest.mark.unit
+class TestResearchCacheHits:
+    """Тесты повторного использования результатов в POST /research"""
+
+    def test_fresh_result_returns_success(self, client, mock_celery, fake_redis, helpers, sample_research_data):
+        """Тест что свежий результат возвращается без постановки задачи"""
+        request_data = sample_research_data["basic_request"]
+        save_result(canonical_request_key(**request_data), "task-done", helpers.create_sample_crew_response(), ttl=60)
+
+        data = client.post("/research", json=request_data).json()
+
+        assert data["status"] == "SUCCESS"
+        assert data["cached"] is True
+        assert data["task_id"] == "task-done"
+        assert data["result"]["status"] == "completed"
+
+    def test_force_refresh_bypasses_store(self, client, mock_celery, fake_redis, helpers, sample_research_data):
+        """Тест что force_refresh запускает исследование заново"""
+        request_data = sample_research_data["basic_request"]
+        save_result(canonical_request_key(**request_data), "task-done", helpers.create_sample_crew_response(), ttl=60)
+
+        data = client.post("/research", json={**request_data, "force_refresh": True}).json()
+
+        assert data["status"] == "PENDING"
+        assert data["cached"] is False
+        assert data["task_id"] != "task-done"
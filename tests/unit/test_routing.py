@@ -0,0 +1,56 @@
+"""
+Unit Tests - Queue Routing
+==========================
+Тесты распределения исследований по очередям и приоритетов
+"""
+
+import pytest
+
+from app import api
+from app.config import settings
+from app.tasks import PRIORITY_LEVELS, route_task
+
+
+@pytest.mark.unit
+class TestQueueRouting:
+    """Тесты роутера Celery"""
+
+    def route(self, **kwargs):
+        return route_task('app.tasks.research_task', (), kwargs, {})
+
+    def test_short_research_goes_to_fast_queue(self):
+        """Тест что basic/standard исследования стандартных команд идут в быструю очередь"""
+        assert self.route(crew_type="general", depth="basic") == {'queue': settings.research_fast_queue}
+        assert self.route(crew_type="seo_content", depth="standard") == {'queue': settings.research_fast_queue}
+
+    def test_comprehensive_research_goes_to_heavy_queue(self):
+        """Тест что comprehensive исследования идут в очередь тяжелых задач"""
+        assert self.route(crew_type="general", depth="comprehensive") == {'queue': settings.research_heavy_queue}
+
+    def test_showcase_crews_go_to_heavy_queue(self):
+        """Тест что showcase команды идут в очередь тяжелых задач"""
+        assert self.route(crew_type="investment_advisor", depth="basic") == {'queue': settings.research_heavy_queue}
+
+    def test_other_tasks_use_default_queue(self):
+        """Тест что служебные задачи не перенаправляются"""
+        assert route_task('app.tasks.health_check', (), {}, {}) is None
+
+
+@pytest.mark.unit
+class TestResearchPriority:
+    """Тесты приоритета запроса"""
+
+    def test_priority_is_passed_to_broker(self, client, mock_celery, sample_research_data):
+        """Тест что приоритет запроса передается в apply_async"""
+        request_data = {**sample_research_data["basic_request"], "priority": "high"}
+
+        response = client.post("/research", json=request_data)
+
+        assert response.status_code == 200
+        assert api.research_task.apply_async.call_args.kwargs["priority"] == PRIORITY_LEVELS["high"]
+
+    def test_invalid_priority_rejected(self, client, mock_celery, sample_research_data):
+        """Тест валидации значения приоритета"""
+        request_data = {**sample_research_data["basic_request"], "priority": "urgent"}
+
+        assert client.post("/research", json=request_data).status_code == 422
@@ -0,0 +1,68 @@
+"""
+Unit Tests - Report Sections
+============================
+Тесты промежуточных результатов агентов и /result/{task_id}/sections
+"""
+
+import json
+import sys
+import types
+from unittest.mock import patch
+
+import pytest
+
+from app.progress import progress_channel
+from app.sections import SECTION_STATE, save_section
+
+
+@pytest.mark.unit
+class TestSections:
+    """Тесты сохранения и выдачи разделов отчета"""
+
+    def test_sections_in_task_order(self, client, fake_redis, helpers):
+        """Тест что разделы отдаются в порядке задач команды"""
+        helpers.store_task_meta(fake_redis, "task-1", "PROGRESS", {"current": 60})
+        save_section("task-1", 1, "Бизнес-аналитик", "Анализ рынка", agent="Бизнес-аналитик")
+        save_section("task-1", 0, "Исследователь", "Собранные данные", agent="Исследователь")
+
+        data = client.get("/result/task-1/sections").json()
+
+        assert data["status"] == "PROGRESS"
+        assert data["completed"] == 2
+        assert [section["output"] for section in data["sections"]] == ["Собранные данные", "Анализ рынка"]
+
+    def test_no_sections_yet(self, client, fake_redis):
+        """Тест задачи без готовых разделов"""
+        data = client.get("/result/task-new/sections").json()
+
+        assert data["status"] == "PENDING"
+        assert data["sections"] == []
+
+    def test_section_is_published(self, fake_redis):
+        """Тест SSE-уведомления о готовом разделе (без текста раздела)"""
+        pubsub = fake_redis.pubsub()
+        pubsub.subscribe(progress_channel("task-1"))
+        pubsub.get_message(timeout=1)
+
+        save_section("task-1", 0, "Исследователь", "Собранные данные")
+
+        event = json.loads(pubsub.get_message(timeout=1)["data"])
+        assert event["state"] == SECTION_STATE
+        assert event["section"]["index"] == 0
+        assert "output" not in event["section"]
+
+    def test_sections_cleared_on_success(self, fake_redis):
+        """Тест что после успешного завершения разделы удаляются (отчет уже в результате задачи)"""
+        from app.tasks import research_task
+
+        def run_research(topic, crew_type, language, depth, progress=None, task_id=None):
+            save_section(task_id, 0, "Исследователь", "Собранные данные")
+            return "Отчет"
+
+        main_crew = types.SimpleNamespace(run_research=run_research)
+        with patch.dict(sys.modules, {"app.main_crew": main_crew}), \
+             patch.object(research_task, "update_state"):
+            result = research_task.apply(kwargs={"topic": "Тема"}, task_id="task-done").get()
+
+        assert result["result"] == "Отчет"
+        assert not fake_redis.exists("sections:task-done")
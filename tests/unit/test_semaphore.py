@@ -0,0 +1,130 @@
+"""
+Unit Tests - Distributed Semaphore
+==================================
+Тесты общего семафора запросов к Serper
+"""
+
+from unittest.mock import patch
+
+import pytest
+import redis
+
+from app.cancellation import CancellationToken, TaskCancelled, cancel_scope
+from app.semaphore import DistributedSemaphore
+
+
+@pytest.fixture
+def semaphore(fake_redis):
+    return DistributedSemaphore("test", limit=2, lease_ttl=30, timeout=1)
+
+
+@pytest.mark.unit
+class TestDistributedSemaphore:
+    """Тесты захвата и освобождения слотов"""
+
+    def test_limit_enforced(self, semaphore):
+        """Тест что слотов не больше limit"""
+        assert semaphore._try_acquire("a") == -1
+        assert semaphore._try_acquire("b") == -1
+        assert semaphore._try_acquire("c") == 0
+        assert semaphore.stats()["in_flight"] == 2
+        assert semaphore.stats()["queued"] == 1
+
+    def test_fifo_queue(self, semaphore):
+        """Тест что освободившийся слот получает первый в очереди, а не последний пришедший"""
+        semaphore._try_acquire("a")
+        semaphore._try_acquire("b")
+        assert semaphore._try_acquire("first") == 0
+        assert semaphore._try_acquire("second") == 1
+
+        semaphore.release("a")
+
+        assert semaphore._try_acquire("second") == 1
+        assert semaphore._try_acquire("first") == -1
+        assert semaphore._try_acquire("second") == 0
+
+    def test_expired_lease_released(self, semaphore, fake_redis):
+        """Тест что аренда упавшего процесса освобождается по истечении"""
+        semaphore._try_acquire("a")
+        semaphore._try_acquire("b")
+        fake_redis.zadd(semaphore.holders_key, {"a": 0})
+
+        assert semaphore._try_acquire("c") == -1
+
+    def test_stale_waiter_dropped(self, semaphore, fake_redis):
+        """Тест что ушедший ожидающий не блокирует очередь"""
+        semaphore._try_acquire("a")
+        semaphore._try_acquire("b")
+        semaphore._try_acquire("gone")
+        semaphore._try_acquire("next")
+        fake_redis.zadd(semaphore.keys[2], {"gone": 0})
+        semaphore.release("a")
+
+        assert semaphore._try_acquire("next") == -1
+
+    def test_slot_records_wait(self, semaphore):
+        """Тест что время ожидания каждого вызова сохраняется"""
+        with semaphore.slot():
+            assert semaphore.stats()["in_flight"] == 1
+
+        stats = semaphore.stats()
+        assert stats["in_flight"] == 0
+        assert stats["acquired"] == 1
+        assert stats["max_wait_seconds"] >= 0
+
+    def test_acquire_waits_for_release(self, semaphore):
+        """Тест что вызов ждет освобождения слота"""
+        semaphore._try_acquire("a")
+        semaphore._try_acquire("b")
+
+        with patch("app.semaphore.time.sleep", side_effect=lambda _: semaphore.release("a")) as sleep:
+            lease_id = semaphore.acquire()
+
+        sleep.assert_called_once()
+        assert lease_id is not None
+
+    def test_timeout(self, semaphore):
+        """Тест что без свободного слота вызов завершается по таймауту и покидает очередь"""
+        semaphore.timeout = 0
+        semaphore._try_acquire("a")
+        semaphore._try_acquire("b")
+
+        with pytest.raises(TimeoutError):
+            semaphore.acquire()
+        assert semaphore.stats()["queued"] == 0
+
+    def test_cancelled_while_waiting(self, semaphore):
+        """Тест что ожидающая слот задача остается отменяемой"""
+        semaphore._try_acquire("a")
+        semaphore._try_acquire("b")
+        token = CancellationToken("task-1")
+        token.cancelled = True
+
+        with cancel_scope(token), pytest.raises(TaskCancelled):
+            semaphore.acquire()
+        assert semaphore.stats()["queued"] == 0
+
+    def test_redis_unavailable_fails_open(self):
+        """Тест что без Redis запрос не блокируется"""
+        semaphore = DistributedSemaphore("test", limit=1, lease_ttl=30, timeout=1)
+
+        with patch("app.semaphore.get_redis", side_effect=redis.ConnectionError("down")):
+            with semaphore.slot():
+                pass
+
+
+@pytest.mark.unit
+class TestSemaphoreEndpoint:
+    """Тесты эндпоинта статистики семафора"""
+
+    def test_stats(self, client, semaphore):
+        """Тест что эндпоинт отдает занятые слоты и ожидания"""
+        lease_id = semaphore.acquire()
+
+        with patch("app.semaphore.get_search_semaphore", return_value=semaphore):
+            data = client.get("/search/concurrency").json()
+
+        assert data["enabled"] is True
+        assert data["limit"] == 2
+        assert data["in_flight"] == 1
+        semaphore.release(lease_id)
@@ -0,0 +1,133 @@
+"""
+Unit Tests - Task State Index
+=============================
+Тесты индекса состояния задач из событий Celery и его использования в /tasks и /health
+"""
+
+import time
+from unittest.mock import patch
+
+import pytest
+
+from app.config import settings
+from app.task_index import (
+    STALE_MARGIN, TaskIndexWriter, alive_workers, count_by_state, index_is_live, list_tasks
+)
+
+
+def task_event(event_type, task_id, timestamp, **fields):
+    return {"type": event_type, "uuid": task_id, "timestamp": timestamp, "hostname": "worker1", **fields}
+
+
+@pytest.mark.unit
+class TestTaskIndexWriter:
+    """Тесты обновления индекса событиями"""
+
+    def test_task_moves_between_states(self, fake_redis):
+        """Тест что задача находится только в sorted set текущего состояния"""
+        writer = TaskIndexWriter(fake_redis)
+        now = time.time()
+
+        writer.on_event(task_event("task-received", "t1", now, name="app.tasks.research_task"))
+        writer.on_event(task_event("task-started", "t1", now + 1))
+
+        assert count_by_state(["RECEIVED", "STARTED"]) == {"RECEIVED": 0, "STARTED": 1}
+        [task] = list_tasks(["STARTED"])
+        assert task["id"] == "t1"
+        assert task["name"] == "app.tasks.research_task"
+        assert task["hostname"] == "worker1"
+
+    def test_late_event_does_not_reopen_finished_task(self, fake_redis):
+        """Тест что опоздавшее событие не возвращает завершенную задачу в работу"""
+        writer = TaskIndexWriter(fake_redis)
+        now = time.time()
+
+        writer.on_event(task_event("task-succeeded", "t1", now, runtime=12.5))
+        writer.on_event(task_event("task-started", "t1", now - 10))
+
+        assert count_by_state(["STARTED", "SUCCESS"]) == {"STARTED": 0, "SUCCESS": 1}
+
+    def test_lost_tasks_are_trimmed(self, fake_redis):
+        """Тест что задачи без события завершения не остаются в работе навсегда"""
+        writer = TaskIndexWriter(fake_redis)
+        now = time.time()
+        lost = now - settings.celery_task_timeout - STALE_MARGIN - 1
+
+        writer.on_event(task_event("task-started", "lost", lost))
+        writer.on_event(task_event("task-sent", "lost-queued", lost))
+        writer.on_event(task_event("task-started", "running", now))
+        writer.trim_stale(now)
+
+        assert count_by_state(["PENDING", "STARTED"]) == {"PENDING": 0, "STARTED": 1}
+        assert [task["id"] for task in list_tasks(["STARTED"])] == ["running"]
+
+    def test_cancelled_task_leaves_started(self, fake_redis):
+        """Тест что кооперативно отмененная задача сразу уходит из STARTED (Ignore не шлет событий)"""
+        from app.cancellation import request_cancel
+        from app.tasks import research_task
+
+        writer = TaskIndexWriter(fake_redis)
+        writer.on_event(task_event("task-started", "t-cancel", time.time()))
+        request_cancel("t-cancel", ttl=60)
+
+        def send_event(event_type, **fields):
+            writer.on_event(task_event(event_type, "t-cancel", time.time(), **fields))
+
+        with patch.object(research_task, "update_state"), \
+             patch.object(research_task, "send_event", side_effect=send_event):
+            research_task.apply(kwargs={"topic": "Тема"}, task_id="t-cancel")
+
+        assert count_by_state(["STARTED", "REVOKED"]) == {"STARTED": 0, "REVOKED": 1}
+
+    def test_workers_heartbeat(self, fake_redis):
+        """Тест учета живых воркеров"""
+        writer = TaskIndexWriter(fake_redis)
+
+        writer.on_event({"type": "worker-heartbeat", "hostname": "worker1", "timestamp": time.time()})
+        writer.on_event({"type": "worker-heartbeat", "hostname": "worker2", "timestamp": time.time() - 600})
+
+        assert alive_workers() == ["worker1"]
+        assert index_is_live()
+
+
+@pytest.mark.unit
+class TestTaskIndexEndpoints:
+    """Тесты чтения индекса в API"""
+
+    def test_tasks_from_index(self, client, mock_celery, fake_redis):
+        """Тест что /tasks читает индекс без inspect()"""
+        writer = TaskIndexWriter(fake_redis)
+        now = time.time()
+        writer.on_event(task_event("task-started", "t1", now, name="app.tasks.research_task"))
+        writer.on_event(task_event("task-sent", "t2", now))
+
+        data = client.get("/tasks").json()
+
+        assert data["source"] == "index"
+        assert data["total_active"] == 1
+        assert data["total_scheduled"] == 1
+        assert data["active_tasks"][0]["id"] == "t1"
+        mock_celery.control.inspect.assert_not_called()
+
+    def test_health_from_index(self, client, mock_celery, fake_redis):
+        """Тест что полная проверка /health берет воркеров и счетчики из индекса"""
+        writer = TaskIndexWriter(fake_redis)
+        writer.on_event({"type": "worker-heartbeat", "hostname": "worker1", "timestamp": time.time()})
+        writer.on_event(task_event("task-succeeded", "t1", time.time()))
+
+        data = client.get("/health", params={"deep": True}).json()
+
+        assert data["components"]["celery"] == "healthy"
+        assert data["completed_tasks"] == 1
+        mock_celery.control.inspect.assert_not_called()
+
+    def test_stale_index_falls_back_to_inspect(self, client, mock_celery, fake_redis):
+        """Тест что без потребителя событий используется inspect()"""
+        mock_celery.control.inspect.return_value.active.return_value = {"worker1": [{"id": "t1"}]}
+        mock_celery.control.inspect.return_value.scheduled.return_value = {}
+
+        data = client.get("/tasks").json()
+
+        assert data["source"] == "inspect"
+        assert data["total_active"] == 1
+        assert data["active_tasks"][0]["hostname"] == "worker1"